@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks du pipeline de veille
+================================
+Mesure, sur un corpus synthétique déterministe (corpus.py), le temps et le
+pic mémoire de chaque étape du pipeline (parsing feedparser, parse_entry,
+clean_html, extract_image, categorize_articles, auto_tag_article,
+update_veille_json) ainsi que d'une exécution de bout en bout, puis compare
+les résultats à une baseline JSON enregistrée : toute régression au-delà
+de la tolérance fait échouer le script (code de sortie 1), tout comme
+l'absence de baseline hors --save-baseline (code 2).
+
+Le corpus est produit flux par flux ; les grandes tailles (1M entrées)
+restent possibles mais demandent plusieurs Go de RAM pour le veille.json.
+
+Usage:
+    python3 bench.py                          # Tailles 100, 1000, 10000
+    python3 bench.py --sizes 100 1000000      # Tailles au choix
+    python3 bench.py --save-baseline          # Enregistrer la baseline
+    python3 bench.py --tolerance 0.10         # Échec au-delà de +10%
+"""
+
+import argparse
+import json
+import logging
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+import feedparser
+
+from veille import pipeline
+from corpus import ENTRIES_PER_FEED, iter_feeds
+
+# ─────────────────────────────────────────────
+# Configuration
+# ─────────────────────────────────────────────
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+BASELINE_FILE = SCRIPT_DIR / "bench_baseline.json"
+SEED_VEILLE_JSON = SCRIPT_DIR.parents[1] / "src" / "data" / "veille.json"
+CONFIG_FILE = SCRIPT_DIR / "sources.json"
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_REPEAT = 3
+
+# Régression tolérée (ratio) et écart absolu en dessous duquel on ignore le bruit
+DEFAULT_TOLERANCE = 0.20
+MIN_DELTA_SECONDS = 0.005
+MIN_DELTA_KB = 256
+
+STAGES = [
+    "feedparser", "parse_entry", "clean_html", "extract_image",
+    "categorize_articles", "auto_tag_article", "update_veille_json", "end_to_end",
+]
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────
+# Mesures
+# ─────────────────────────────────────────────
+
+class Probe:
+    """Accumule le temps (ou le pic mémoire, avec tracemalloc) par étape."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.seconds = {}
+        self.peak_kb = {}
+
+    def run(self, stage, fn, *args, **kwargs):
+        if self.trace_memory:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            result = fn(*args, **kwargs)
+            peak = (tracemalloc.get_traced_memory()[1] - before) / 1024
+            self.peak_kb[stage] = max(self.peak_kb.get(stage, 0), peak)
+        else:
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self.seconds[stage] = self.seconds.get(stage, 0) + time.perf_counter() - start
+        return result
+
+
+@contextmanager
+def isolated_paths():
+    """Redirige les fichiers d'état du pipeline vers un répertoire temporaire."""
+    saved = {name: getattr(pipeline, name) for name in (
+        "VEILLE_JSON", "HISTORY_FILES", "HISTORY_DB", "NEARDUP_DB", "SEEN_FILTER_FILE", "VERSION_DIR", "DELTA_DIR", "SHARD_DIR"
+    )}
+    tmp = Path(tempfile.mkdtemp(prefix="veille-bench-"))
+    try:
+        pipeline.VEILLE_JSON = tmp / "veille.json"
+        pipeline.HISTORY_FILES = ()
+        pipeline.HISTORY_DB = tmp / "veille_history.db"
+        pipeline.NEARDUP_DB = tmp / "veille_neardup.db"
+        pipeline.SEEN_FILTER_FILE = tmp / "veille_seen.bloom"
+        pipeline.VERSION_DIR = tmp / "versions"
+        pipeline.DELTA_DIR = pipeline.VERSION_DIR / "deltas"
+        pipeline.SHARD_DIR = tmp / "shards"
+        shutil.copyfile(SEED_VEILLE_JSON, pipeline.VEILLE_JSON)
+        yield tmp
+    finally:
+        for name, value in saved.items():
+            setattr(pipeline, name, value)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run_stages(size, topics_config, tag_rules, probe):
+    """Exécute chaque étape isolément, flux par flux, sur le corpus."""
+    matcher = pipeline.build_topic_matcher(topics_config)
+    tagger = pipeline.TagEngine(tag_rules)
+    categorized = {topic: [] for topic in topics_config}
+
+    for name, body in iter_feeds(size):
+        feed = probe.run("feedparser", feedparser.parse, body, sanitize_html=False)
+        entries = feed.entries
+        articles = probe.run("parse_entry", lambda: [
+            a for a in (pipeline.parse_entry(e, name, "en") for e in entries) if a
+        ])
+        probe.run("clean_html", lambda: [
+            pipeline.clean_html(e.get("summary", "")) for e in entries
+        ])
+        probe.run("extract_image", lambda: [pipeline.extract_image(e) for e in entries])
+        batch = probe.run("categorize_articles", pipeline.categorize_articles,
+                          articles, topics_config, matcher)
+        probe.run("auto_tag_article", lambda: [
+            pipeline.auto_tag_article(a, "MFA", tagger) for a in articles
+        ])
+        for topic, matched in batch.items():
+            categorized[topic].extend(matched)
+
+    with isolated_paths():
+        probe.run("update_veille_json", pipeline.update_veille_json,
+                  categorized, topics_config, apply=True, tagger=pipeline.TagEngine(tag_rules))
+
+
+def run_end_to_end(size, topics_config, tag_rules, probe):
+    """Exécution complète, comme la CLI : parsing, catégorisation et écriture au fil de l'eau."""
+    def end_to_end():
+        matcher = pipeline.build_topic_matcher(topics_config)
+        updater = pipeline.VeilleUpdater(topics_config, apply=True, tagger=pipeline.TagEngine(tag_rules))
+        try:
+            for name, body in iter_feeds(size):
+                articles, _, _ = pipeline.parse_feed_bytes(body, {}, name, "en")
+                for topic, matched in pipeline.categorize_articles(articles, topics_config, matcher).items():
+                    updater.add(topic, matched)
+            return updater.finish()
+        finally:
+            updater.close()
+
+    with isolated_paths():
+        probe.run("end_to_end", end_to_end)
+
+
+def bench_size(size, topics_config, tag_rules, repeat):
+    """Meilleur temps sur `repeat` passes, puis une passe sous tracemalloc."""
+    best = {}
+    for _ in range(repeat):
+        probe = Probe()
+        run_stages(size, topics_config, tag_rules, probe)
+        run_end_to_end(size, topics_config, tag_rules, probe)
+        for stage, seconds in probe.seconds.items():
+            best[stage] = min(best.get(stage, seconds), seconds)
+
+    probe = Probe(trace_memory=True)
+    tracemalloc.start()
+    try:
+        run_stages(size, topics_config, tag_rules, probe)
+        run_end_to_end(size, topics_config, tag_rules, probe)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        stage: {"seconds": round(best[stage], 6), "peak_kb": round(probe.peak_kb[stage], 1)}
+        for stage in STAGES
+    }
+
+# ─────────────────────────────────────────────
+# Baseline
+# ─────────────────────────────────────────────
+
+def load_baseline(path):
+    """Charge la baseline enregistrée, ou None si absente."""
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    """Enregistre les résultats comme nouvelle baseline."""
+    data = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "entries_per_feed": ENTRIES_PER_FEED,
+        "results": results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def compare(results, baseline, tolerance):
+    """Compare aux valeurs de la baseline ; retourne la liste des régressions."""
+    regressions = []
+    for size, stages in results.items():
+        reference = baseline["results"].get(size, {})
+        for stage, current in stages.items():
+            ref = reference.get(stage)
+            if not ref:
+                continue
+            for metric, min_delta in (("seconds", MIN_DELTA_SECONDS), ("peak_kb", MIN_DELTA_KB)):
+                before, after = ref[metric], current[metric]
+                if after > before * (1 + tolerance) and after - before > min_delta:
+                    regressions.append((size, stage, metric, before, after))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    """Affiche un tableau des mesures (et l'écart à la baseline)."""
+    for size, stages in results.items():
+        reference = (baseline or {}).get("results", {}).get(size, {})
+        print(f"\n📏 {int(size):,} entrées")
+        print(f"  {'étape':<22}{'temps (s)':>12}{'pic (Ko)':>12}{'Δ temps':>10}{'Δ mém.':>10}")
+        for stage, current in stages.items():
+            line = f"  {stage:<22}{current['seconds']:>12.4f}{current['peak_kb']:>12.0f}"
+            ref = reference.get(stage)
+            if ref:
+                for metric in ("seconds", "peak_kb"):
+                    delta = (current[metric] / ref[metric] - 1) * 100 if ref[metric] else 0
+                    line += f"{delta:>+9.0f}%"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du pipeline de veille")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"Tailles de corpus en entrées (défaut: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Passes chronométrées par taille, meilleur temps retenu (défaut: {DEFAULT_REPEAT})')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE,
+                        help=f'Fichier de baseline (défaut: {BASELINE_FILE.name})')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Enregistrer les résultats comme nouvelle baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Régression tolérée, en ratio (défaut: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--output', type=Path, help='Écrire aussi les résultats bruts en JSON')
+    args = parser.parse_args()
+
+    # Sans baseline, rien à comparer : échouer avant de lancer les mesures
+    baseline = load_baseline(args.baseline)
+    if baseline is None and not args.save_baseline:
+        print(f"❌ Pas de baseline ({args.baseline}) : lancer d'abord avec --save-baseline")
+        return 2
+
+    # Les logs du pipeline fausseraient les mesures
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    topics_config = config["topics"]
+    tag_rules = config.get("tag_rules", pipeline.DEFAULT_TAG_RULES)
+
+    results = {}
+    for size in args.sizes:
+        print(f"⏱ {size:,} entrées...", flush=True)
+        results[str(size)] = bench_size(size, topics_config, tag_rules, args.repeat)
+
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\n💾 Baseline enregistrée: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} RÉGRESSION(S) au-delà de +{args.tolerance:.0%}:")
+        for size, stage, metric, before, after in regressions:
+            print(f"  {int(size):>9,} entrées  {stage:<22}{metric:<9}{before:>12.4f} -> {after:.4f}")
+        return 1
+
+    print(f"\n✅ Aucune régression au-delà de +{args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Corpus RSS/Atom synthétique
+===========================
+Génère de façon déterministe (graine fixe) des flux RSS 2.0 et Atom
+réalistes pour les benchmarks et le serveur de flux local : résumés HTML
+avec paragraphes, liens, images et entités, catégories, dates, et des
+mots-clés des topics / règles de tags pour exercer le filtrage.
+
+Le vocabulaire (quelques milliers de pseudo-mots tirés selon une loi de
+Zipf) rend deux articles tirés au hasard aussi différents que deux vrais
+articles ; une petite part des entrées sont des reprises d'un article
+récent sous une autre URL (titre retouché), comme un communiqué repris
+par plusieurs sources, pour exercer la détection des quasi-doublons.
+
+Usage:
+    python3 corpus.py 1000 --out /tmp/corpus   # 1000 entrées -> fichiers .xml
+"""
+
+import argparse
+import random
+from itertools import accumulate
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+ENTRIES_PER_FEED = 50
+START_DATE = datetime(2026, 1, 31, 12, 0, 0)
+
+WORDS = (
+    "security cloud network attack breach vulnerability patch update vendor "
+    "customer identity access token session policy compliance enterprise server "
+    "report survey market platform tool product release research threat actor "
+    "ransomware phishing malware campaign exploit flaw government regulation "
+    "sécurité réseau entreprise faille attaque rapport outil nouveau annonce "
+    "the a of to and in for with on by from as is are was were new launch"
+).split()
+
+KEYWORDS = [
+    "MFA", "multi-factor authentication", "2FA", "passkey", "FIDO2", "WebAuthn",
+    "zero trust", "ZTNA", "SASE", "micro-segmentation", "least privilege",
+    "SIEM", "SOC", "Splunk", "Sentinel", "Wazuh", "threat detection",
+    "incident response", "log management", "CVE-2025-1234", "AWS", "Azure",
+]
+
+CATEGORIES = [
+    "Security", "Cloud", "Identity", "Vulnerabilities", "Research", "News",
+    "Enterprise", "Government", "Malware", "Zero Trust",
+]
+
+ENTITIES = ["&amp;", "&lt;", "&gt;", "&quot;", "&#39;", "&nbsp;", "&eacute;", "&#8217;", "&mdash;"]
+
+# Pseudo-mots ajoutés aux mots réels (syllabes tirées avec une graine fixe)
+VOCABULARY_SIZE = 5000
+SYLLABLES = "ba ce di fo gu ka le mi no pu ra se ti vo zu tra pro sec net lo xa qui".split()
+
+# Part des entrées reprenant un article récent sous une autre URL
+REPOST_RATE = 0.03
+REPOST_WINDOW = 200
+
+
+def _build_vocabulary(size, seed=7):
+    rng = random.Random(seed)
+    vocabulary = list(dict.fromkeys(WORDS))
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            vocabulary.append(word)
+    return vocabulary
+
+
+VOCABULARY = _build_vocabulary(VOCABULARY_SIZE)
+# Loi de Zipf : le mot de rang r a un poids 1/r (les mots réels en tête)
+ZIPF_WEIGHTS = list(accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+
+def _sentence(rng, min_words=6, max_words=18):
+    words = rng.choices(VOCABULARY, cum_weights=ZIPF_WEIGHTS, k=rng.randint(min_words, max_words))
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), rng.choice(KEYWORDS))
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words)), rng.choice(ENTITIES))
+    return " ".join(words).capitalize() + "."
+
+
+def _summary_html(rng, index):
+    """Résumé HTML réaliste (certains flux embarquent l'article complet)."""
+    paragraphs = rng.choice([1, 2, 3, 5, 8, 40])
+    parts = []
+    if rng.random() < 0.5:
+        attr = rng.choice(["src", "data-src"])
+        parts.append(f'<img {attr}="https://img.example.com/{index}.jpg" alt="illustration" width="640">')
+    for _ in range(paragraphs):
+        text = " ".join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+        if rng.random() < 0.4:
+            text += f' <a href="https://example.com/ref/{rng.randint(1, 10**6)}">Read more</a>'
+        parts.append(f"<p>{text}</p>")
+    return "\n".join(parts)
+
+
+def _entry(rng, index, start, recent=None):
+    """Entrée numéro `index` ; `recent` (liste des dernières entrées) active les reprises."""
+    link = f"https://news{index % 97}.example.com/{2026 - index // 5000}/article-{index}?utm_source=rss"
+    if recent and rng.random() < REPOST_RATE:
+        # Reprise : même texte, titre légèrement retouché, autre source
+        original = rng.choice(recent)
+        entry = dict(original, link=link, title=f"{original['title']} ({rng.choice(['update', 'report', 'via AFP'])})")
+    else:
+        entry = {
+            "title": _sentence(rng, 4, 10).rstrip("."),
+            "link": link,
+            "summary": _summary_html(rng, index),
+            "tags": rng.sample(CATEGORIES, rng.randint(0, 4)),
+        }
+    entry["published"] = start - timedelta(minutes=37 * index)
+    if recent is not None:
+        recent.append(entry)
+        if len(recent) > REPOST_WINDOW:
+            del recent[0]
+    return entry
+
+
+def generate_entries(count, seed=42, start=None):
+    """Génère `count` entrées (dicts) triées de la plus récente à la plus ancienne."""
+    rng = random.Random(seed)
+    start = start or START_DATE
+    recent = []
+    return [_entry(rng, index, start, recent) for index in range(count)]
+
+
+def render_rss(entries, title="Synthetic feed"):
+    """Sérialise des entrées en RSS 2.0 (octets UTF-8)."""
+    items = []
+    for e in entries:
+        categories = "".join(f"<category>{escape(t)}</category>" for t in e["tags"])
+        items.append(
+            "<item>"
+            f"<title>{escape(e['title'])}</title>"
+            f"<link>{escape(e['link'])}</link>"
+            f"<guid>{escape(e['link'])}</guid>"
+            f"<pubDate>{format_datetime(e['published'])}</pubDate>"
+            f"<description>{escape(e['summary'])}</description>"
+            f"{categories}"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss version="2.0"><channel>'
+        f"<title>{escape(title)}</title><link>https://example.com/</link>"
+        "<description>Synthetic corpus</description><ttl>60</ttl>"
+        + "".join(items) +
+        "</channel></rss>"
+    ).encode("utf-8")
+
+
+def render_atom(entries, title="Synthetic feed"):
+    """Sérialise des entrées en Atom 1.0 (octets UTF-8)."""
+    items = []
+    for e in entries:
+        categories = "".join(f'<category term="{escape(t)}"/>' for t in e["tags"])
+        stamp = e["published"].strftime("%Y-%m-%dT%H:%M:%SZ")
+        items.append(
+            "<entry>"
+            f"<title>{escape(e['title'])}</title>"
+            f'<link href="{escape(e["link"])}"/>'
+            f"<id>{escape(e['link'])}</id>"
+            f"<updated>{stamp}</updated>"
+            f'<summary type="html">{escape(e["summary"])}</summary>'
+            f"{categories}"
+            "</entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>{escape(title)}</title><id>urn:synthetic</id>"
+        "<updated>2026-01-31T12:00:00Z</updated>"
+        + "".join(items) +
+        "</feed>"
+    ).encode("utf-8")
+
+
+def iter_feeds(total_entries, entries_per_feed=ENTRIES_PER_FEED, seed=42):
+    """Produit le corpus flux par flux : (nom, octets), sans tout garder en mémoire.
+
+    Un flux sur trois est en Atom, les autres en RSS 2.0. Le contenu est
+    identique à celui de generate_feeds pour une même graine.
+    """
+    rng = random.Random(seed)
+    recent = []
+    for number, offset in enumerate(range(0, total_entries, entries_per_feed)):
+        stop = min(offset + entries_per_feed, total_entries)
+        chunk = [_entry(rng, index, START_DATE, recent) for index in range(offset, stop)]
+        render = render_atom if number % 3 == 2 else render_rss
+        yield f"feed-{number:05d}", render(chunk, title=f"Synthetic feed {number}")
+
+
+def generate_feeds(total_entries, entries_per_feed=ENTRIES_PER_FEED, seed=42):
+    """Découpe un corpus en flux ; retourne une liste de (nom, octets)."""
+    return list(iter_feeds(total_entries, entries_per_feed, seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère un corpus RSS/Atom synthétique")
+    parser.add_argument('entries', type=int, help="Nombre total d'entrées")
+    parser.add_argument('--out', type=Path, required=True, help='Répertoire de sortie')
+    parser.add_argument('--per-feed', type=int, default=ENTRIES_PER_FEED,
+                        help=f'Entrées par flux (défaut: {ENTRIES_PER_FEED})')
+    parser.add_argument('--seed', type=int, default=42, help='Graine (défaut: 42)')
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for name, body in iter_feeds(args.entries, args.per_feed, args.seed):
+        (args.out / f"{name}.xml").write_bytes(body)
+    print(f"{args.entries} entrées écrites dans {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serveur de flux local (tests de charge hors ligne)
+==================================================
+Sert le corpus synthétique (corpus.py) à des milliers d'URL locales, avec
+injection de latence, limite de débit, réponses au goutte-à-goutte, 304
+(ETag / Last-Modified), erreurs 5xx et XML malformé. Les défauts sont
+attribués par flux à partir de la graine : deux exécutions identiques
+servent exactement les mêmes réponses.
+
+Usage:
+    python3 feed_server.py --feeds 2000 --write-sources /tmp/sources.json
+    python3 rss.py --sources /tmp/sources.json --dry-run --engine async
+    python3 feed_server.py --feeds 2000 --latency 80 --load-test threads async
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from corpus import iter_feeds
+
+# ─────────────────────────────────────────────
+# Configuration
+# ─────────────────────────────────────────────
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+CONFIG_FILE = SCRIPT_DIR / "sources.json"
+
+DEFAULT_PORT = 8765
+DEFAULT_FEEDS = 1000
+DEFAULT_ENTRIES_PER_FEED = 20
+
+# Taille des morceaux envoyés (limite de débit, goutte-à-goutte)
+CHUNK_SIZE = 16 * 1024
+DRIP_CHUNK_SIZE = 512
+
+# Date de dernière modification annoncée pour tout le corpus
+LAST_MODIFIED = formatdate(1767225600, usegmt=True)
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────
+# Corpus et défauts
+# ─────────────────────────────────────────────
+
+def assign_fault(seed, number, error_rate, malformed_rate, drip_rate):
+    """Défaut d'un flux : None, 'error', 'malformed' ou 'drip' (déterministe)."""
+    draw = random.Random(seed * 1000003 + number).random()
+    if draw < error_rate:
+        return "error"
+    if draw < error_rate + malformed_rate:
+        return "malformed"
+    if draw < error_rate + malformed_rate + drip_rate:
+        return "drip"
+    return None
+
+
+def malform(body):
+    """Tronque le XML au milieu d'une balise, comme une réponse coupée."""
+    return body[:len(body) // 2] + b"<title>&broken <<"
+
+
+class FeedCorpus:
+    """Flux servis, indexés par chemin (/feed-00042.xml)."""
+
+    def __init__(self, feeds, entries_per_feed, seed=42, error_rate=0.0, malformed_rate=0.0,
+                 drip_rate=0.0):
+        self.feeds = {}
+        for number, (name, body) in enumerate(iter_feeds(feeds * entries_per_feed,
+                                                         entries_per_feed, seed)):
+            fault = assign_fault(seed, number, error_rate, malformed_rate, drip_rate)
+            if fault == "malformed":
+                body = malform(body)
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            jitter = random.Random(seed * 1000003 + number + 1).uniform(-1, 1)
+            self.feeds[f"/{name}.xml"] = {
+                "name": name, "body": body, "etag": etag, "fault": fault, "jitter": jitter,
+            }
+
+    def faults(self):
+        """Nombre de flux par type de défaut."""
+        counts = {}
+        for feed in self.feeds.values():
+            counts[feed["fault"] or "ok"] = counts.get(feed["fault"] or "ok", 0) + 1
+        return counts
+
+    def sources(self, base_url):
+        """Configuration des sources (topics et règles réels, flux locaux)."""
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        config["rss_feeds"] = {
+            "synthetic": [
+                {"name": feed["name"], "url": base_url + path, "lang": "en"}
+                for path, feed in self.feeds.items()
+            ]
+        }
+        return config
+
+# ─────────────────────────────────────────────
+# Serveur HTTP
+# ─────────────────────────────────────────────
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def do_GET(self):
+        server = self.server
+        started = time.perf_counter()
+        feed = server.corpus.feeds.get(self.path)
+        status = self.respond(feed)
+        server.record(self.path, status, time.perf_counter() - started)
+
+    def respond(self, feed):
+        """Envoie la réponse d'un flux ; retourne le code HTTP."""
+        server = self.server
+        if feed is None:
+            self.send_error(404)
+            return 404
+
+        if server.latency:
+            time.sleep(max(0.0, server.latency * (1 + server.jitter * feed["jitter"])))
+
+        if feed["fault"] == "error":
+            status = (500, 502, 503)[int(feed["etag"][1:3], 16) % 3]
+            self.send_error(status)
+            return status
+
+        if self.headers.get("If-None-Match") == feed["etag"]:
+            self.send_response(304)
+            self.send_header("ETag", feed["etag"])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return 304
+
+        body = feed["body"]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", feed["etag"])
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+
+        try:
+            if feed["fault"] == "drip":
+                for offset in range(0, len(body), DRIP_CHUNK_SIZE):
+                    self.wfile.write(body[offset:offset + DRIP_CHUNK_SIZE])
+                    self.wfile.flush()
+                    time.sleep(server.drip_delay)
+            elif server.bandwidth:
+                for offset in range(0, len(body), CHUNK_SIZE):
+                    self.wfile.write(body[offset:offset + CHUNK_SIZE])
+                    time.sleep(CHUNK_SIZE / server.bandwidth)
+            else:
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        return 200
+
+
+class FeedServer(ThreadingHTTPServer):
+    """Serveur multi-thread qui enregistre la durée de chaque réponse."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, corpus, host="127.0.0.1", port=DEFAULT_PORT, latency=0.0, jitter=0.0,
+                 bandwidth=0, drip_delay=0.05):
+        super().__init__((host, port), FeedRequestHandler)
+        self.corpus = corpus
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.drip_delay = drip_delay
+        self.lock = threading.Lock()
+        self.requests = []
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, path, status, seconds):
+        with self.lock:
+            self.requests.append((path, status, seconds))
+
+    def reset(self):
+        """Vide les mesures enregistrées ; retourne les précédentes."""
+        with self.lock:
+            requests, self.requests = self.requests, []
+        return requests
+
+    def start(self):
+        """Démarre le serveur dans un thread d'arrière-plan."""
+        thread = threading.Thread(target=self.serve_forever, name="feed-server", daemon=True)
+        thread.start()
+        return thread
+
+# ─────────────────────────────────────────────
+# Test de charge
+# ─────────────────────────────────────────────
+
+def percentile(values, fraction):
+    """Percentile par rang le plus proche (valeurs déjà triées)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def load_test(server, engines, parse_processes=0):
+    """Exécute le fetch de chaque moteur sur tout le corpus : à froid puis en 304."""
+    from veille import pipeline
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Les logs par flux fausseraient les mesures
+    logging.getLogger().setLevel(logging.WARNING)
+    feeds = server.corpus.sources(server.base_url)["rss_feeds"]["synthetic"]
+    parse_pool = ProcessPoolExecutor(max_workers=parse_processes) if parse_processes else None
+
+    results = []
+    try:
+        for engine in engines:
+            feed_state = {}
+            for phase in ("froid", "304"):
+                server.reset()
+                started = time.perf_counter()
+                articles = sum(len(batch) for batch in pipeline.stream_feeds(
+                    feeds, feed_state, engine=engine, parse_pool=parse_pool
+                ))
+                wall = time.perf_counter() - started
+                requests = server.reset()
+                latencies = sorted(seconds for _, _, seconds in requests)
+                statuses = {}
+                for _, status, _ in requests:
+                    statuses[status] = statuses.get(status, 0) + 1
+                bytes_served = sum(
+                    len(server.corpus.feeds[path]["body"])
+                    for path, status, _ in requests if status == 200
+                )
+                results.append({
+                    "engine": engine,
+                    "phase": phase,
+                    "feeds": len(feeds),
+                    "articles": articles,
+                    "wall_seconds": round(wall, 3),
+                    "feeds_per_second": round(len(feeds) / wall, 1),
+                    "mb_per_second": round(bytes_served / wall / 1e6, 2),
+                    "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+                    "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+                    "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+                    "max_ms": round((latencies[-1] if latencies else 0) * 1000, 1),
+                    "statuses": statuses,
+                })
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+    return results
+
+
+def print_load_test(results):
+    """Affiche débit et latences (côté serveur) par moteur et par phase."""
+    print(f"\n{'moteur':<9}{'phase':<7}{'durée (s)':>10}{'flux/s':>9}{'Mo/s':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}  codes")
+    for r in results:
+        codes = " ".join(f"{code}:{count}" for code, count in sorted(r["statuses"].items()))
+        print(f"{r['engine']:<9}{r['phase']:<7}{r['wall_seconds']:>10.2f}{r['feeds_per_second']:>9.1f}"
+              f"{r['mb_per_second']:>8.2f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+              f"{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}  {codes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de flux local avec injection de défauts")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Port d\'écoute (défaut: {DEFAULT_PORT}, 0: port libre)')
+    parser.add_argument('--feeds', type=int, default=DEFAULT_FEEDS,
+                        help=f'Nombre de flux servis (défaut: {DEFAULT_FEEDS})')
+    parser.add_argument('--per-feed', type=int, default=DEFAULT_ENTRIES_PER_FEED,
+                        help=f'Entrées par flux (défaut: {DEFAULT_ENTRIES_PER_FEED})')
+    parser.add_argument('--seed', type=int, default=42, help='Graine (défaut: 42)')
+    parser.add_argument('--latency', type=float, default=0, metavar='MS',
+                        help='Latence ajoutée avant chaque réponse, en ms')
+    parser.add_argument('--jitter', type=float, default=0.5,
+                        help='Variation de la latence, en ratio (défaut: 0.5)')
+    parser.add_argument('--bandwidth', type=float, default=0, metavar='KO/S',
+                        help='Débit max par réponse, en Ko/s (défaut: illimité)')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Part des flux répondant 500/502/503')
+    parser.add_argument('--malformed-rate', type=float, default=0,
+                        help='Part des flux servant un XML tronqué')
+    parser.add_argument('--drip-rate', type=float, default=0,
+                        help='Part des flux envoyés au goutte-à-goutte')
+    parser.add_argument('--drip-delay', type=float, default=50, metavar='MS',
+                        help=f'Pause entre morceaux de {DRIP_CHUNK_SIZE} octets (défaut: 50 ms)')
+    parser.add_argument('--write-sources', type=Path, metavar='FICHIER',
+                        help='Écrire une config des sources pointant sur le serveur (rss.py --sources)')
+    parser.add_argument('--load-test', nargs='+', choices=['threads', 'async'], metavar='MOTEUR',
+                        help='Mesurer le fetch des moteurs indiqués puis quitter')
+    parser.add_argument('--parse-processes', type=int, default=0, metavar='N',
+                        help='Parsing dans N processus pendant le test de charge')
+    parser.add_argument('--output', type=Path, help='Écrire les résultats du test de charge en JSON')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    corpus = FeedCorpus(args.feeds, args.per_feed, args.seed, args.error_rate,
+                        args.malformed_rate, args.drip_rate)
+    server = FeedServer(corpus, port=args.port, latency=args.latency / 1000, jitter=args.jitter,
+                        bandwidth=args.bandwidth * 1024, drip_delay=args.drip_delay / 1000)
+    faults = ", ".join(f"{k}: {v}" for k, v in sorted(corpus.faults().items()))
+    logger.info(f"📡 {len(corpus.feeds)} flux sur {server.base_url} ({faults})")
+
+    if args.write_sources:
+        with open(args.write_sources, 'w', encoding='utf-8') as f:
+            json.dump(corpus.sources(server.base_url), f, indent=2, ensure_ascii=False)
+        logger.info(f"📝 Sources écrites: {args.write_sources}")
+
+    if args.load_test:
+        server.start()
+        try:
+            results = load_test(server, args.load_test, args.parse_processes)
+        finally:
+            server.shutdown()
+        print_load_test(results)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        return 0
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
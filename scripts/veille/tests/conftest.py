@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""Tests du package veille : python3 -m pytest tests (depuis scripts/veille)."""
+
+import sys
+from pathlib import Path
+
+# Le package veille est importé depuis scripts/veille, comme par rss.py
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
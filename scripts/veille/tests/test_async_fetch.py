@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""async_fetch : moteur asyncio, isolation des erreurs de traitement par flux."""
+
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from veille import pipeline
+from veille.metrics import REGISTRY
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>{name}</title>
+<item><title>Article {name}</title><link>https://example.com/{name}/1</link>
+<description>Texte de {name}</description><pubDate>Mon, 12 Oct 2026 08:00:00 GMT</pubDate></item>
+</channel></rss>
+"""
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = RSS.format(name=self.path.strip("/")).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def feeds():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    REGISTRY.reset()
+    yield [{"name": name, "url": f"{base}/{name}", "lang": "en"} for name in ("a", "b", "c")]
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetches_all_feeds(feeds):
+    articles = pipeline.fetch_feeds_async(feeds)
+    assert sorted(a["link"] for a in articles) == [f"https://example.com/{n}/1" for n in "abc"]
+
+
+def test_processing_error_only_drops_its_feed(feeds, monkeypatch):
+    process_feed = pipeline.process_feed
+
+    def failing(feed_info, *args, **kwargs):
+        if feed_info["name"] == "b":
+            raise BrokenProcessPool("pool de parsing interrompu")
+        return process_feed(feed_info, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "process_feed", failing)
+    articles = pipeline.fetch_feeds_async(feeds)
+
+    assert sorted(a["link"] for a in articles) == ["https://example.com/a/1", "https://example.com/c/1"]
+    assert REGISTRY.summary()["feeds"]["b"]["veille_feed_fetch_total|status=parse_error"] == 1
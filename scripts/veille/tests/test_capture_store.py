@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""capture_store : corps adressés par contenu, exécutions, rétention ; --dry-run sans écriture."""
+
+import json
+
+import pytest
+
+from veille import pipeline
+from veille.capture_store import CaptureStore
+
+FEED = {"name": "f", "url": "https://example.com/feed", "lang": "en"}
+
+
+def capture_run(store, body, headers=None, status="ok", digest=None):
+    store.begin()
+    store.record(FEED, body, headers or {"etag": "x"}, status, digest)
+    return store.save()
+
+
+def test_same_second_runs_resolve_in_creation_order(tmp_path):
+    store = CaptureStore(tmp_path)
+    ids = [capture_run(store, f"<rss>{i}</rss>".encode()) for i in range(5)]
+    assert store.run_ids() == ids
+    assert store.resolve("latest") == ids[-1]
+    assert store.resolve("latest~1") == ids[-2]
+
+
+@pytest.mark.parametrize("ref", ["latest~", "latest~x", "latest~-1", "latest~5"])
+def test_malformed_or_unknown_latest_ref_is_unknown(tmp_path, ref):
+    store = CaptureStore(tmp_path)
+    capture_run(store, b"<rss>a</rss>")
+    with pytest.raises(KeyError):
+        store.resolve(ref)
+
+
+def test_unchanged_feeds_point_to_the_captured_body(tmp_path):
+    store = CaptureStore(tmp_path)
+    first = capture_run(store, b"<rss>a</rss>")
+    digest = store.manifest(first)["feeds"][0]["body"]
+    second = capture_run(store, None, headers={}, status="not_modified", digest=digest)
+
+    assert len(list((tmp_path / "objects").glob("*/*"))) == 1
+    (feed, body), = store.iter_bodies(second)
+    assert body == b"<rss>a</rss>"
+    # Les en-têtes du 304 sont repris de la capture précédente
+    assert feed["headers"] == {"etag": "x"}
+
+
+def test_prune_keeps_bodies_of_kept_runs(tmp_path):
+    store = CaptureStore(tmp_path, max_runs=2)
+    for i in range(4):
+        capture_run(store, f"<rss>{i}</rss>".encode())
+    assert len(store.run_ids()) == 2
+    assert len(list((tmp_path / "objects").glob("*/*"))) == 2
+    assert [body for _, body in store.iter_bodies("latest")] == [b"<rss>3</rss>"]
+
+
+def test_dry_run_creates_no_state_files(tmp_path, monkeypatch):
+    veille_json = tmp_path / "veille.json"
+    veille_json.write_text(json.dumps({"veilles": [{"title": "MFA", "articles": []}]}), encoding="utf-8")
+    monkeypatch.setattr(pipeline, "VEILLE_JSON", veille_json)
+    monkeypatch.setattr(pipeline, "HISTORY_DB", tmp_path / "history.db")
+    monkeypatch.setattr(pipeline, "NEARDUP_DB", tmp_path / "neardup.db")
+    monkeypatch.setattr(pipeline, "SEEN_FILTER_FILE", tmp_path / "seen.bloom")
+    monkeypatch.setattr(pipeline, "HISTORY_FILES", ())
+
+    updater = pipeline.VeilleUpdater({"MFA": {"veille_index": 0, "keywords": ["mfa"]}}, dry_run=True)
+    article = {"title": "MFA news", "link": "https://example.com/a", "description": "",
+               "source": "test", "date": "2024-01-01"}
+    assert updater.add("MFA", [article]) == 1
+    updater.finish()
+    updater.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["veille.json"]
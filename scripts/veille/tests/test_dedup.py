@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Déduplication de VeilleUpdater : historique, préfiltre, URL du veille.json."""
+
+import json
+
+import pytest
+
+from veille import pipeline
+
+TOPICS = {"MFA": {"veille_index": 0, "keywords": ["mfa"]}}
+PUBLISHED = "https://example.com/published"
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    veille_json = tmp_path / "veille.json"
+    veille_json.write_text(json.dumps({"veilles": [{"title": "MFA", "articles": [
+        {"title": "Déjà publié", "link": PUBLISHED, "tags": []}
+    ]}]}), encoding="utf-8")
+    monkeypatch.setattr(pipeline, "VEILLE_JSON", veille_json)
+    monkeypatch.setattr(pipeline, "HISTORY_DB", tmp_path / "history.db")
+    monkeypatch.setattr(pipeline, "NEARDUP_DB", tmp_path / "neardup.db")
+    monkeypatch.setattr(pipeline, "SEEN_FILTER_FILE", tmp_path / "seen.bloom")
+    monkeypatch.setattr(pipeline, "HISTORY_FILES", ())
+    return tmp_path
+
+
+def article(link, title="MFA news"):
+    return {"title": title, "link": link, "description": "", "source": "test", "date": "2024-01-01"}
+
+
+def test_urls_already_in_veille_json_are_skipped(state):
+    # Historique vidé (rétention) : le veille.json suffit à écarter l'article
+    history = pipeline.load_history()
+    history.set_meta("seen_filter_generation", "x")
+    history.commit()
+    history.close()
+
+    updater = pipeline.VeilleUpdater(TOPICS, dry_run=True)
+    try:
+        assert updater.add("MFA", [article(PUBLISHED + "/?utm_source=rss")]) == 0
+        assert updater.add("MFA", [article("https://example.com/new")]) == 1
+        assert updater.add("MFA", [article("http://www.example.com/new/")]) == 0
+    finally:
+        updater.close()
+
+
+def test_legacy_raw_link_ids_still_match(state):
+    legacy_link = "http://www.example.com/old/?utm_source=x"
+    history = pipeline.load_history()
+    history.add(pipeline.url_hash(legacy_link))
+    history.set_meta("seen_filter_generation", "x")
+    history.commit()
+    history.close()
+
+    updater = pipeline.VeilleUpdater(TOPICS, dry_run=True)
+    try:
+        assert pipeline.article_id(article(legacy_link)) != pipeline.url_hash(legacy_link)
+        assert updater.add("MFA", [article(legacy_link)]) == 0
+    finally:
+        updater.close()
+
+
+def test_bloom_filter_is_only_written_when_changed(state):
+    updater = pipeline.VeilleUpdater(TOPICS)
+    updater.add("MFA", [article("https://example.com/one")])
+    pipeline.save_history(updater.history, updater.seen)
+    mtime = pipeline.SEEN_FILTER_FILE.stat().st_mtime_ns
+
+    pipeline.save_history(updater.history, updater.seen)
+    assert pipeline.SEEN_FILTER_FILE.stat().st_mtime_ns == mtime
+    updater.close()
+
+    # Relu avec la même génération : pas de reconstruction
+    history = pipeline.load_history()
+    seen = pipeline.load_seen_filter(history, {"veilles": []})
+    assert not seen.dirty
+    history.close()
+
+
+def test_resident_updater_writes_bloom_filter_on_close(state):
+    updater = pipeline.VeilleUpdater(TOPICS, resident=True)
+    updater.add("MFA", [article("https://example.com/one")])
+    pipeline.save_history(updater.history, updater.seen, defer_seen=True)
+    assert not pipeline.SEEN_FILTER_FILE.exists()
+    updater.close()
+
+    history = pipeline.load_history()
+    seen = pipeline.load_seen_filter(history, {"veilles": []})
+    assert not seen.dirty and pipeline.article_id(article("https://example.com/one")) in seen
+    history.close()
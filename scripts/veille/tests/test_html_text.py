@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""html_text : nettoyage HTML -> texte en une passe, troncature, première image."""
+
+import random
+import re
+from html import unescape
+
+from veille.html_text import extract_html, html_to_text
+
+TOKENS = ["mfa", "zero", "trust", "é", "x", " ", "  ", "\n", "\t",
+          "&amp;", "&nbsp;", "&#233;", "&lt;", "&gt;", "&quot;", "&eacute;",
+          "<b>", "</b>", "<a href=\"https://x.org/?a=1&amp;b=2\">", "</a>", "<span class='c'>",
+          "</span>", "<!-- note -->", "<br/>"]
+
+
+def reference_text(html):
+    """Texte attendu d'un fragment sans balise de bloc ni script."""
+    text = re.sub(r'<!--.*?-->', '', html, flags=re.S)
+    text = re.sub(r'<br/?>', ' ', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    return " ".join(unescape(text).split())
+
+
+def test_matches_reference_on_random_fragments():
+    rng = random.Random(7)
+    for _ in range(5000):
+        html = "".join(rng.choice(TOKENS) for _ in range(rng.randint(0, 30)))
+        expected = reference_text(html)
+        assert html_to_text(html) == expected, html
+        max_len = rng.randint(5, 40)
+        truncated = expected if len(expected) <= max_len else expected[:max_len - 3] + "..."
+        assert html_to_text(html, max_len) == truncated, (html, max_len)
+
+
+def test_decodes_all_entities():
+    assert html_to_text("caf&eacute; &rsquo;x&rsquo; &#x2014; &hellip;") == "café ’x’ — …"
+
+
+def test_block_tags_separate_words_inline_tags_do_not():
+    assert html_to_text("<p>one</p><p>two</p>") == "one two"
+    assert html_to_text("<li>a</li><li>b</li>") == "a b"
+    assert html_to_text("multi<b>factor</b>") == "multifactor"
+
+
+def test_skips_script_style_and_comments():
+    html = "<style>p{}</style>a<script>var x = '<p>no</p>';</script> b<!-- c --> d"
+    assert html_to_text(html) == "a b d"
+    assert html_to_text("text <!-- unterminated") == "text"
+
+
+def test_truncation_keeps_length_and_ellipsis():
+    text = html_to_text("<p>" + "word " * 10000 + "</p>", max_len=500)
+    assert len(text) == 500
+    assert text.endswith("...")
+    assert html_to_text("short", max_len=500) == "short"
+    assert html_to_text("exactly5", max_len=8) == "exactly5"
+
+
+def test_empty_input():
+    assert html_to_text("") == ""
+    assert html_to_text("<div></div>") == ""
+
+
+def test_extract_returns_text_and_first_image():
+    html = '<p>Intro <img src="https://cdn.example/a.png"> text</p><img src="https://cdn.example/b.png">'
+    assert extract_html(html) == ("Intro text", "https://cdn.example/a.png")
+
+
+def test_lazy_images_skip_data_placeholders():
+    html = '<img src="data:image/gif;base64,R0lGOD" data-src="/img/lazy.jpg">'
+    assert extract_html(html, base_url="https://blog.example/post/")[1] == "https://blog.example/img/lazy.jpg"
+
+
+def test_srcset_picks_largest_candidate():
+    html = '<img srcset="s.jpg 320w, l.jpg 1024w, m.jpg 640w">'
+    assert extract_html(html)[1] == "l.jpg"
+
+
+def test_rejects_non_http_image_urls():
+    html = '<img src="javascript:alert(1)"><img src="https://ok.example/i.png">'
+    assert extract_html(html)[1] == "https://ok.example/i.png"
+
+
+def test_malformed_image_url_is_skipped():
+    html = '<p>Texte</p><img src="http://[bad/a.png"><img src="/ok.png">'
+    assert extract_html(html, base_url="https://blog.example/") == ("Texte", "https://blog.example/ok.png")
+    assert extract_html('<img src="http://[bad/a.png">')[1] == ""
+
+
+def test_image_after_truncation_is_still_found():
+    html = "<p>" + "word " * 1000 + '</p><img src="https://cdn.example/late.png">'
+    text, image = extract_html(html, max_len=50)
+    assert len(text) == 50
+    assert image == "https://cdn.example/late.png"
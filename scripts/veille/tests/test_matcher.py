@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""KeywordMatcher : équivalence avec l'ancienne recherche mot-clé par mot-clé."""
+
+import random
+import re
+
+from veille.matcher import KeywordMatcher
+
+KEYWORDS = {
+    "MFA": ["MFA", "2FA", "multi-factor", "authentification forte", "otp"],
+    "ZTNA": ["ZTNA", "zero trust", "sase", "microsegmentation"],
+    "SIEM": ["SIEM", "SOC", "log management", "xdr", "threat detection"],
+}
+ALPHABET = "abcdefmorstz2_-. é"
+
+
+def regex_labels(text, keywords_by_label, whole_word_max_len=4):
+    """Ancienne implémentation : un re.search / `in` par mot-clé."""
+    found = set()
+    for label, keywords in keywords_by_label.items():
+        for keyword in keywords:
+            kw = keyword.lower()
+            if len(kw) <= whole_word_max_len:
+                if re.search(r'\b' + re.escape(kw) + r'\b', text):
+                    found.add(label)
+                    break
+            elif kw in text:
+                found.add(label)
+                break
+    return found
+
+
+def random_text(rng):
+    """Bruit aléatoire parsemé de mots-clés, coupés ou collés à d'autres mots."""
+    keywords = [kw.lower() for kws in KEYWORDS.values() for kw in kws]
+    parts = []
+    for _ in range(rng.randint(0, 8)):
+        if rng.random() < 0.4:
+            kw = rng.choice(keywords)
+            if rng.random() < 0.2:
+                kw = kw[:rng.randint(1, len(kw))]
+            parts.append(kw)
+        else:
+            parts.append("".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 6))))
+    return "".join(parts)
+
+
+def test_matches_regex_on_random_texts():
+    matcher = KeywordMatcher(KEYWORDS)
+    rng = random.Random(20240101)
+    for _ in range(20000):
+        text = random_text(rng)
+        assert matcher.match(text) == regex_labels(text, KEYWORDS), text
+
+
+def test_short_keywords_need_word_boundaries():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.match("enable mfa now") == {"MFA"}
+    assert matcher.match("mfa") == {"MFA"}
+    assert matcher.match("mfa_token") == set()
+    assert matcher.match("smfa-") == set()
+    assert matcher.match("(soc)") == {"SIEM"}
+
+
+def test_long_keywords_match_as_substrings():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.match("antizero trustworthy") == {"ZTNA"}
+    assert matcher.match("multi-factors") == {"MFA"}
+
+
+def test_overlapping_keywords_use_failure_links():
+    matcher = KeywordMatcher({"a": ["abcd"], "b": ["bcx"], "c": ["cxyz"]}, whole_word_max_len=0)
+    assert matcher.match("abcxyz") == {"b", "c"}
+    assert matcher.match("xabcd") == {"a"}
+
+
+def test_empty_inputs():
+    assert KeywordMatcher({"a": [""]}).match("anything") == set()
+    assert KeywordMatcher(KEYWORDS).match("") == set()
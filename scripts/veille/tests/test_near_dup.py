@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""near_dup : signatures MinHash, seuil de similarité et index LSH."""
+
+import random
+
+from veille.near_dup import NearDuplicateIndex, minhash, normalize_tokens, similarity
+
+WORDS = [f"mot{i}" for i in range(1000)]
+
+
+def text_of(words):
+    return " ".join(words)
+
+
+def test_normalize_tokens_drops_accents_case_and_stopwords():
+    assert normalize_tokens("Sécurité, SÉCURITÉ et la Faille!") == {"securite", "faille"}
+
+
+def test_short_texts_have_no_signature():
+    assert minhash("one two three") is None
+    assert minhash("one two three four five six") is not None
+
+
+def test_signature_is_stable_and_order_independent():
+    assert minhash("a1 b2 c3 d4 e5 f6 g7") == minhash("g7 f6 e5 d4 c3 b2 a1")
+
+
+def test_similarity_estimates_jaccard():
+    rng = random.Random(3)
+    for shared in (0, 10, 20, 30, 40):
+        words = rng.sample(WORDS, 80 - shared)
+        a, b = words[:40], words[40 - shared:]
+        jaccard = shared / (80 - shared)
+        estimate = similarity(minhash(text_of(a)), minhash(text_of(b)))
+        assert abs(estimate - jaccard) < 0.2, (shared, estimate, jaccard)
+
+
+def test_index_finds_near_duplicates_above_threshold():
+    index = NearDuplicateIndex(":memory:", threshold=0.6)
+    original = WORDS[:30]
+    index.add("orig", minhash(text_of(original)), "https://a.example/1")
+
+    # Un mot remplacé sur 30 : Jaccard 29/31
+    match = index.find(minhash(text_of(original[:-1] + ["autre"])))
+    assert match is not None and match[:2] == ("orig", "https://a.example/1")
+    assert match[2] >= 0.6
+
+    # Texte sans rapport
+    assert index.find(minhash(text_of(WORDS[500:530]))) is None
+
+
+def test_threshold_is_enforced_on_band_candidates():
+    rng = random.Random(11)
+    index = NearDuplicateIndex(":memory:", threshold=0.6)
+    base = WORDS[:40]
+    index.add("base", minhash(text_of(base)))
+    for _ in range(200):
+        # Environ un tiers des mots en commun : candidats possibles, jamais retenus
+        other = rng.sample(base, 20) + rng.sample(WORDS[100:], 40)
+        match = index.find(minhash(text_of(other)))
+        assert match is None or match[2] >= 0.6
+
+
+def test_strict_threshold_only_matches_identical_signatures():
+    index = NearDuplicateIndex(":memory:", threshold=1.0)
+    index.add("orig", minhash(text_of(WORDS[:30])))
+    assert index.find(minhash(text_of(WORDS[:30])))[2] == 1.0
+    match = index.find(minhash(text_of(WORDS[:29] + ["autre"])))
+    assert match is None or match[2] == 1.0
+
+
+def test_evict_keeps_max_entries():
+    index = NearDuplicateIndex(":memory:", max_entries=5)
+    for i in range(8):
+        index.add(f"id{i}", minhash(text_of(WORDS[i * 10:i * 10 + 10])))
+    assert index.evict() == 3
+    assert len(index) == 5
+    # Les bandes des signatures évincées sont supprimées avec elles
+    assert index.find(minhash(text_of(WORDS[0:10]))) is None
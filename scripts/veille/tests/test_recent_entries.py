@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""recent_entries : filtre --max-age, arrêt anticipé sur les flux triés, entrées sans date."""
+
+import time
+
+from veille.pipeline import recent_entries
+
+CUTOFF = 1_000_000
+
+
+def entry(name, stamp=None):
+    return {"id": name, "published_parsed": time.gmtime(stamp) if stamp is not None else None}
+
+
+def ids(entries):
+    return [e["id"] for e in entries]
+
+
+def test_ordered_feed_stops_at_first_old_entry():
+    entries = [entry("a", CUTOFF + 30), entry("b", CUTOFF + 20), entry("c", CUTOFF - 10),
+               entry("d", CUTOFF - 20), entry("e"), entry("f", CUTOFF + 50)]
+    kept, too_old = recent_entries(entries, CUTOFF)
+    # La suite est réputée plus ancienne, même sans date ou mal placée
+    assert ids(kept) == ["a", "b"]
+    assert too_old == 4
+
+
+def test_unordered_feed_is_scanned_to_the_end():
+    entries = [entry("a", CUTOFF + 10), entry("b", CUTOFF + 30), entry("c", CUTOFF - 10),
+               entry("d", CUTOFF - 20), entry("e", CUTOFF + 5)]
+    kept, too_old = recent_entries(entries, CUTOFF)
+    assert ids(kept) == ["a", "b", "e"]
+    assert too_old == 2
+
+
+def test_undated_entries_before_the_stop_are_kept():
+    entries = [entry("a"), entry("b", CUTOFF + 20), entry("c"), entry("d", CUTOFF + 10),
+               entry("e", CUTOFF - 10), entry("f", CUTOFF - 20)]
+    kept, too_old = recent_entries(entries, CUTOFF)
+    assert ids(kept) == ["a", "b", "c", "d"]
+    assert too_old == 2
+
+
+def test_too_few_dated_entries_do_not_stop_early():
+    entries = [entry("a", CUTOFF + 10), entry("b", CUTOFF - 10), entry("c"), entry("d", CUTOFF + 5)]
+    kept, too_old = recent_entries(entries, CUTOFF)
+    assert ids(kept) == ["a", "c", "d"]
+    assert too_old == 1
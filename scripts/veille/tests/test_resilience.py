@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""resilience : disjoncteur, délais de reprise, échéances, tailles max."""
+
+import gzip
+import io
+import random
+import socket
+import urllib.error
+import zlib
+
+import pytest
+
+from veille import resilience
+from veille.resilience import (
+    CircuitBreaker, Deadline, DeadlineExceeded, FeedTooLarge, FetchGuard, backoff_delay,
+    decompress_limited, is_transient, read_limited,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+class UpperBound:
+    """rng dont uniform() retourne la borne haute (pire cas de la gigue)."""
+
+    def uniform(self, low, high):
+        return high
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience, "time", fake)
+    return fake
+
+
+def http_error(code):
+    return urllib.error.HTTPError("https://example.com/feed", code, "err", {}, None)
+
+
+# ── Disjoncteur ──────────────────────────────
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+    assert breaker.failure("u") == 0
+    assert breaker.failure("u") == 0
+    assert breaker.allow("u")
+    assert breaker.failure("u") == 60
+    assert not breaker.allow("u")
+    assert breaker.open_until("u") == clock.now + 60
+
+
+def test_breaker_half_open_trial_after_cooldown(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    breaker.failure("u")
+    clock.now += 59
+    assert not breaker.allow("u")
+    clock.now += 1
+    # Refroidissement écoulé : un essai est autorisé
+    assert breaker.allow("u")
+
+    # Essai en échec : rouvert pour un refroidissement doublé
+    assert breaker.failure("u") == 120
+    assert not breaker.allow("u")
+    clock.now += 120
+    assert breaker.allow("u")
+
+    # Essai réussi : refermé, compteur remis à zéro
+    breaker.success("u")
+    assert breaker.failure("u") == 60
+
+
+def test_breaker_cooldown_is_capped(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=60, max_cooldown=300)
+    cooldowns = [breaker.failure("u") for _ in range(6)]
+    assert cooldowns == [60, 120, 240, 300, 300, 300]
+
+
+def test_breaker_state_is_persisted(tmp_path, clock):
+    path = tmp_path / "breaker.json"
+    breaker = CircuitBreaker(path, threshold=1, cooldown=60)
+    breaker.failure("u", "HTTP 503")
+    breaker.save()
+    reloaded = CircuitBreaker(path, threshold=1, cooldown=60)
+    assert not reloaded.allow("u")
+    assert reloaded.states["u"]["error"] == "HTTP 503"
+
+
+# ── Reprises ─────────────────────────────────
+
+def test_backoff_is_exponential_and_capped():
+    delays = [backoff_delay(attempt, base=1.0, cap=15.0, rng=UpperBound()) for attempt in range(1, 7)]
+    assert delays == [1.0, 2.0, 4.0, 8.0, 15.0, 15.0]
+
+
+def test_backoff_uses_full_jitter():
+    rng = random.Random(5)
+    for attempt in range(1, 10):
+        assert 0 <= backoff_delay(attempt, base=1.0, cap=15.0, rng=rng) <= min(15.0, 2 ** (attempt - 1))
+
+
+def test_transient_errors():
+    assert is_transient(http_error(503))
+    assert is_transient(http_error(429))
+    assert not is_transient(http_error(404))
+    assert is_transient(urllib.error.URLError("down"))
+    assert is_transient(socket.timeout())
+    assert is_transient(ConnectionResetError())
+    assert not is_transient(FeedTooLarge())
+    assert not is_transient(DeadlineExceeded())
+    assert not is_transient(ValueError())
+
+
+def test_retry_delay_respects_retries_and_deadline(clock):
+    guard = FetchGuard(retries=2, rng=UpperBound())
+    deadline = Deadline(60)
+    assert guard.retry_delay(1, http_error(503), deadline) == 1.0
+    assert guard.retry_delay(2, http_error(503), deadline) == 2.0
+    assert guard.retry_delay(3, http_error(503), deadline) is None
+    assert guard.retry_delay(1, http_error(404), deadline) is None
+    # Pas de reprise qui finirait après l'échéance
+    assert guard.retry_delay(2, http_error(503), Deadline(1.5)) is None
+
+
+# ── Échéances et tailles ─────────────────────
+
+def test_feed_deadline_is_bounded_by_run_deadline(clock):
+    guard = FetchGuard(run_seconds=30, feed_seconds=60)
+    assert guard.feed_deadline().remaining() == 30
+    assert FetchGuard(run_seconds=None, feed_seconds=60).feed_deadline().remaining() == 60
+    clock.now += 31
+    with pytest.raises(DeadlineExceeded):
+        guard.feed_deadline().check()
+
+
+class FakeResponse:
+    def __init__(self, body, headers=None, on_read=None):
+        self.stream = io.BytesIO(body)
+        self.headers = headers or {}
+        self.on_read = on_read
+
+    def read1(self, size):
+        if self.on_read:
+            self.on_read()
+        return self.stream.read(min(size, 4))
+
+
+def test_read_limited_enforces_size_and_deadline(clock):
+    assert read_limited(FakeResponse(b"0123456789"), max_bytes=10) == b"0123456789"
+    with pytest.raises(FeedTooLarge):
+        read_limited(FakeResponse(b"0123456789"), max_bytes=9)
+    with pytest.raises(FeedTooLarge):
+        read_limited(FakeResponse(b"", {"Content-Length": "100"}), max_bytes=10)
+
+    def drip():
+        clock.now += 1
+
+    with pytest.raises(DeadlineExceeded):
+        read_limited(FakeResponse(b"x" * 40, on_read=drip), deadline=Deadline(5))
+
+
+def test_decompress_limited():
+    data = b"<rss>" + b"a" * 1000 + b"</rss>"
+    assert decompress_limited(gzip.compress(data), "gzip") == data
+    assert decompress_limited(zlib.compress(data), "deflate") == data
+    raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    assert decompress_limited(raw.compress(data) + raw.flush(), "deflate") == data
+    assert decompress_limited(data, "") == data
+    # Bombe de compression : 10 Mo de zéros en quelques Ko
+    with pytest.raises(FeedTooLarge):
+        decompress_limited(gzip.compress(b"\0" * 10_000_000), "gzip", max_bytes=1_000_000)
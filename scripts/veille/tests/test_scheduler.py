@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""scheduler : intervalles adaptatifs par flux et persistance."""
+
+import time
+
+from veille import pipeline
+from veille.resilience import CircuitBreaker, Deadline, FetchGuard
+from veille.scheduler import (
+    DEFAULT_INTERVAL, MAX_INTERVAL, MIN_INTERVAL, FeedScheduler, feed_hints, mean_gap,
+    next_interval,
+)
+
+FEED = {"name": "f", "url": "https://example.com/feed"}
+
+
+def test_interval_follows_publication_rate():
+    assert next_interval(3600, "ok", True, gap=2 * 3600) == 3600
+    assert next_interval(3600, "ok", True, gap=None) == 3600
+
+
+def test_unchanged_and_errors_back_off():
+    assert next_interval(3600, "not_modified", False) == 3600 * 1.5
+    assert next_interval(3600, "ok", False) == 3600 * 1.5
+    assert next_interval(3600, "error", False) == 3600 * 2
+
+
+def test_interval_is_bounded():
+    assert next_interval(3600, "ok", True, gap=60) == MIN_INTERVAL
+    assert next_interval(MAX_INTERVAL, "error", False) == MAX_INTERVAL
+    assert next_interval(600, "ok", True, gap=60, min_interval=900, max_interval=1200) == 900
+
+
+def test_feed_hint_is_a_minimum():
+    assert next_interval(3600, "ok", True, gap=600, hint=7200) == 7200
+    assert next_interval(3600, "ok", True, gap=4 * 3600, hint=600) == 2 * 3600
+
+
+def test_feed_hints():
+    assert feed_hints({"ttl": "30"}) == 1800
+    assert feed_hints({"sy_updateperiod": "daily", "sy_updatefrequency": "4"}) == 86400 / 4
+    assert feed_hints({"ttl": "60", "sy_updateperiod": "daily"}) == 86400
+    assert feed_hints({"ttl": "soon", "sy_updateperiod": "hourly", "sy_updatefrequency": "x"}) == 3600
+    assert feed_hints({}) is None
+
+
+def test_mean_gap():
+    assert mean_gap([0, 100, 200, 300]) == 100
+    assert mean_gap([5]) is None
+    assert mean_gap([7, 7, 7]) is None
+    assert mean_gap(list(range(0, 2000, 100)), limit=3) == 100
+
+
+def test_new_feeds_are_due_and_removed_feeds_forgotten(tmp_path):
+    scheduler = FeedScheduler(tmp_path / "schedule.json")
+    scheduler.sync([FEED, {"name": "g", "url": "https://example.com/g"}])
+    assert [feed["name"] for feed in scheduler.due()] == ["f", "g"]
+    scheduler.sync([FEED])
+    assert list(scheduler.entries) == [FEED["url"]]
+
+
+def test_record_reschedules_with_jitter_and_persists(tmp_path):
+    path = tmp_path / "schedule.json"
+    scheduler = FeedScheduler(path, jitter=0.1)
+    scheduler.sync([FEED])
+    started = time.time()
+    poll = {"status": "ok", "at": started + 1, "newest": started, "gap": 4 * 3600}
+    interval = scheduler.record(FEED["url"], poll, started)
+    assert 2 * 3600 * 0.9 <= interval <= 2 * 3600 * 1.1
+    assert scheduler.due() == []
+    scheduler.save()
+
+    reloaded = FeedScheduler(path)
+    reloaded.sync([FEED])
+    assert reloaded.entries[FEED["url"]]["interval"] == 2 * 3600
+    assert reloaded.entries[FEED["url"]]["newest"] == started
+
+
+def test_missing_or_stale_poll_counts_as_error(tmp_path):
+    scheduler = FeedScheduler(tmp_path / "schedule.json", jitter=0)
+    scheduler.sync([FEED])
+    started = time.time()
+    assert scheduler.record(FEED["url"], None, started) == DEFAULT_INTERVAL * 2
+    stale = {"status": "ok", "at": started - 10, "newest": started}
+    assert scheduler.record(FEED["url"], stale, started) == DEFAULT_INTERVAL * 4
+    assert scheduler.entries[FEED["url"]]["status"] == "error"
+
+
+def test_skipped_polls_keep_the_interval(tmp_path):
+    scheduler = FeedScheduler(tmp_path / "schedule.json", jitter=0)
+    scheduler.sync([FEED])
+    started = time.time()
+    for status in ("circuit_open", "deadline"):
+        assert scheduler.record(FEED["url"], {"status": status, "at": started + 1}, started) == DEFAULT_INTERVAL
+        assert scheduler.entries[FEED["url"]]["status"] == status
+
+
+def test_feeds_skipped_by_the_guard_are_not_backed_off(tmp_path):
+    feed = dict(FEED, lang="en")
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    breaker.failure(feed["url"], "503")
+    scheduler = FeedScheduler(tmp_path / "schedule.json", jitter=0)
+    scheduler.sync([feed])
+    started = time.time()
+    feed_state = {feed["url"]: {"etag": "x"}}
+
+    assert pipeline.fetch_feed(feed, feed_state, guard=FetchGuard(breaker)) == []
+    assert feed_state[feed["url"]]["etag"] == "x"
+    assert scheduler.record(feed["url"], feed_state[feed["url"]]["poll"], started) == DEFAULT_INTERVAL
+
+    guard = FetchGuard()
+    guard.run_deadline = Deadline(-1)
+    assert pipeline.fetch_feed(feed, feed_state, guard=guard) == []
+    assert feed_state[feed["url"]]["poll"]["status"] == "deadline"
+    assert scheduler.record(feed["url"], feed_state[feed["url"]]["poll"], started) == DEFAULT_INTERVAL
+
+
+def test_older_entries_do_not_count_as_new(tmp_path):
+    scheduler = FeedScheduler(tmp_path / "schedule.json", jitter=0)
+    scheduler.sync([FEED])
+    started = time.time()
+    scheduler.record(FEED["url"], {"status": "ok", "at": started + 1, "newest": 1000.0}, started)
+    interval = scheduler.record(FEED["url"], {"status": "ok", "at": started + 2, "newest": 500.0}, started)
+    assert interval == DEFAULT_INTERVAL * 1.5
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""TagEngine : équivalence avec l'ancien auto_tag_article et cache par règle."""
+
+import random
+
+from veille.pipeline import DEFAULT_TAG_RULES
+from veille.tagger import TagEngine
+
+
+def substring_tags(text, tag_rules):
+    """Ancienne implémentation : `kw in texte` pour chaque mot-clé de chaque règle."""
+    return [tag for tag, keywords in tag_rules.items() if any(kw.lower() in text for kw in keywords)]
+
+
+def random_text(rng):
+    keywords = [kw.lower() for kws in DEFAULT_TAG_RULES.values() for kw in kws]
+    words = [rng.choice(keywords)[:rng.randint(1, 12)] if rng.random() < 0.5
+             else "".join(rng.choice("aeinorst -é") for _ in range(rng.randint(1, 5)))
+             for _ in range(rng.randint(0, 10))]
+    return "".join(words)
+
+
+def test_matches_substring_rules_on_random_texts():
+    engine = TagEngine(DEFAULT_TAG_RULES)
+    rng = random.Random(42)
+    for _ in range(20000):
+        text = random_text(rng)
+        assert engine.match(text) == substring_tags(text, DEFAULT_TAG_RULES), text
+
+
+def test_cached_result_is_reused():
+    engine = TagEngine(DEFAULT_TAG_RULES)
+    first = engine.match("new cloud breach report")
+    assert engine.match("new cloud breach report") == first
+    assert (engine.hits, engine.misses) == (1, 1)
+
+
+def test_changed_rules_only_reevaluate_new_rules():
+    cache = TagEngine({"Cloud": ["cloud"], "Failles": ["breach"]}).cache
+    TagEngine({"Cloud": ["cloud"], "Failles": ["breach"]}, cache).match("cloud breach")
+
+    engine = TagEngine({"Cloud": ["cloud"], "Failles": ["hack"]}, cache)
+    assert engine.match("cloud breach") == ["Cloud"]
+    assert engine.misses == 1
+
+
+def test_cache_is_bounded():
+    engine = TagEngine(DEFAULT_TAG_RULES, max_entries=3)
+    for i in range(10):
+        engine.match(f"text {i}")
+    assert len(engine.export_cache()["entries"]) == 3
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""build_topic_index : postings et ordre chronologique des pages de la veille."""
+
+from veille.pipeline import build_topic_index
+
+
+def test_postings_follow_date_order():
+    articles = [
+        {"date": "3 Mars 2025", "tags": ["mfa"], "source": "a"},
+        {"date": "", "tags": ["mfa", "sso"], "source": "b"},
+        {"date": "12 Octobre 2026", "tags": ["mfa"], "source": "a"},
+        {"date": "1er Janvier 2026", "tags": ["sso"], "source": "b"},
+    ]
+    index = build_topic_index(articles)
+
+    assert index["by_date"] == [2, 3, 0, 1]
+    assert index["postings"] == {"mfa": [2, 0, 1], "sso": [3, 1]}
+    assert index["facets"] == {"tags": {"mfa": 3, "sso": 2}, "sources": {"a": 2, "b": 2}}
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""url_filter : URL canoniques et préfiltre de Bloom."""
+
+from veille.url_filter import BloomFilter, canonical_url
+
+
+def test_variants_share_one_canonical_form():
+    variants = [
+        "https://example.com/post/42",
+        "http://example.com/post/42",
+        "https://www.example.com/post/42/",
+        "HTTPS://WWW.EXAMPLE.COM:443/post/42#comments",
+        "https://example.com/post/42?utm_source=rss&utm_medium=feed",
+        "https://example.com/post/42?fbclid=abc&gclid=def&_hsenc=x",
+        " https://example.com/post/42 ",
+    ]
+    assert {canonical_url(url) for url in variants} == {"https://example.com/post/42"}
+
+
+def test_tracking_params_are_dropped_and_others_sorted():
+    url = "https://example.com/a?utm_campaign=x&id=7&lang=fr&mc_cid=1&Utm_Term=y"
+    assert canonical_url(url) == "https://example.com/a?id=7&lang=fr"
+    assert canonical_url("https://example.com/a?b=2&a=1") == canonical_url("https://example.com/a?a=1&b=2")
+
+
+def test_meaningful_parts_are_kept():
+    assert canonical_url("https://example.com:8443/a") == "https://example.com:8443/a"
+    assert canonical_url("https://example.com/a?page=") == "https://example.com/a?page="
+    assert canonical_url("https://example.com/A") != canonical_url("https://example.com/a")
+    assert canonical_url("https://example.com") == "https://example.com/"
+
+
+def test_non_http_and_empty_urls():
+    assert canonical_url("") == ""
+    assert canonical_url("   ") == ""
+    assert canonical_url("mailto:someone@example.com ") == "mailto:someone@example.com"
+
+
+def test_bloom_has_no_false_negatives_and_bounded_false_positives():
+    seen = BloomFilter.for_capacity(10000, 0.01)
+    for i in range(10000):
+        seen.add(f"id-{i}")
+    assert all(f"id-{i}" in seen for i in range(10000))
+    false_positives = sum(f"other-{i}" in seen for i in range(20000))
+    assert false_positives / 20000 < 0.02
+    assert seen.count <= seen.capacity
+
+
+def test_bloom_roundtrip_and_dirty_flag(tmp_path):
+    path = tmp_path / "seen.bloom"
+    seen = BloomFilter.for_capacity(100)
+    assert not seen.dirty
+    seen.add("a")
+    assert seen.dirty
+    seen.generation = b"gen1"
+    seen.save(path)
+    assert not seen.dirty
+
+    loaded = BloomFilter.load(path)
+    assert "a" in loaded and "b" not in loaded
+    assert (loaded.count, loaded.generation, loaded.dirty) == (1, b"gen1", False)
+
+
+def test_bloom_load_rejects_missing_or_corrupt_files(tmp_path):
+    assert BloomFilter.load(tmp_path / "missing.bloom") is None
+    (tmp_path / "bad.bloom").write_bytes(b"not a filter")
+    assert BloomFilter.load(tmp_path / "bad.bloom") is None
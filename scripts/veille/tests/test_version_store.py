@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""version_store : versions adressées par contenu, résolution des références."""
+
+import pytest
+
+from veille.version_store import VersionStore
+
+
+def document(*links):
+    return {"veilles": [{"title": "MFA", "articles": [{"link": link} for link in links]}]}
+
+
+def test_same_second_versions_resolve_in_creation_order(tmp_path):
+    store = VersionStore(tmp_path)
+    ids = [store.save(document(f"https://example.com/{i}"))[0] for i in range(5)]
+    assert store.ids() == ids
+    assert store.resolve("latest") == ids[-1]
+    assert store.resolve("latest~4") == ids[0]
+    with pytest.raises(KeyError):
+        store.resolve("latest~5")
+
+
+def test_resolve_reads_no_manifest(tmp_path, monkeypatch):
+    store = VersionStore(tmp_path)
+    version_id = store.save(document("https://example.com/a"))[0]
+    monkeypatch.setattr(store, "manifest", lambda ref: pytest.fail("manifest chargé"))
+    assert store.resolve("latest") == version_id
+    assert store.resolve(version_id[:10]) == version_id
+
+
+@pytest.mark.parametrize("ref", ["latest~", "latest~x", "latest~-1", "latest~ 1"])
+def test_malformed_latest_ref_is_unknown(tmp_path, ref):
+    store = VersionStore(tmp_path)
+    store.save(document("https://example.com/a"))
+    with pytest.raises(KeyError):
+        store.resolve(ref)
+
+
+def test_roundtrip_and_diff(tmp_path):
+    store = VersionStore(tmp_path)
+    first = store.save(document("https://example.com/a", "https://example.com/b"))[0]
+    second = store.save(document("https://example.com/b", "https://example.com/c"))[0]
+    assert store.load(first) == document("https://example.com/a", "https://example.com/b")
+    assert store.diff(first, second) == [{
+        "index": 0,
+        "added": [{"link": "https://example.com/c"}],
+        "removed": [{"link": "https://example.com/a"}],
+    }]
@@ -31,7 +31,7 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 # Remonter jusqu'à la racine du dépôt (portfolio/scripts/veille -> ../../.. )
 ROOT_DIR="$(cd "$SCRIPT_DIR/../../.." && pwd)"
 VENV_DIR="$SCRIPT_DIR/.venv"
-PYTHON_SCRIPT="$SCRIPT_DIR/fetch.py"
+PYTHON_SCRIPT="$SCRIPT_DIR/rss.py"
 LOG_FILE="$SCRIPT_DIR/veille.log"
 
 # ─────────────────────────────────────────────
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Veille automatique par flux RSS (package)
+=========================================
+API : fetch, categorize, update, export (voir api.py). CLI : cli.py,
+lancée par `python3 rss.py` ou `python3 -m veille`.
+
+Importer le package est léger : ni feedparser ni le pipeline ne sont
+chargés avant le premier appel, et le logging n'est pas configuré.
+"""
+
+from .api import categorize, export, fetch, load_config, update
+
+__all__ = ["categorize", "export", "fetch", "load_config", "update"]
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""Point d'entrée `python3 -m veille` (voir cli.py)."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
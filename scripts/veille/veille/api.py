@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API du package veille
+=====================
+Les quatre étapes du pipeline, appelables depuis un autre programme (un
+ordonnanceur par exemple) sans lancer de sous-processus :
+
+    import veille
+
+    feed_state = {}
+    articles = veille.fetch(feed_state=feed_state)   # relevé, aucun fichier écrit
+    categorized = veille.categorize(articles)         # {topic: [articles]}
+    summary, total_new, version = veille.update(categorized)
+    veille.export()                                   # fragments du site
+
+Le pipeline (et feedparser) n'est chargé qu'au premier appel ; le logging
+n'est pas configuré, c'est à l'application hôte de le faire.
+
+`sources` désigne la configuration des sources : chemin d'un fichier JSON,
+dict déjà chargé, ou None pour sources.json.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from .config import MAX_AGE_DAYS, RUN_DEADLINE
+
+
+def load_config(sources=None):
+    """Configuration des sources (topics, règles de tags, flux)."""
+    if isinstance(sources, dict):
+        return sources
+    from .pipeline import load_sources
+    return load_sources(sources)
+
+
+def fetch(feeds=None, sources=None, feed_state=None, engine='threads', max_age=MAX_AGE_DAYS,
+          force=False, deadline=RUN_DEADLINE, guard=None):
+    """Relève des flux et retourne la liste des articles parsés.
+
+    `feeds` : flux à relever ({"name", "url", "lang"}), par défaut tous ceux
+    de `sources`. `feed_state` : état HTTP gardé par l'appelant d'un appel
+    à l'autre (GET conditionnel), mis à jour sur place. `max_age` en jours
+    (0 pour tout garder), `deadline` en secondes (0 pour aucune échéance).
+    `guard` : FetchGuard réutilisé d'un appel à l'autre pour conserver
+    l'état des disjoncteurs (sinon un disjoncteur en mémoire, non persisté).
+    """
+    from . import pipeline
+    from .resilience import CircuitBreaker, FetchGuard
+
+    if feeds is None:
+        feeds = pipeline.sources_feeds(load_config(sources))
+    cutoff = None
+    if max_age:
+        cutoff = (datetime.now() - timedelta(days=max_age)).timestamp()
+    if guard is None:
+        guard = FetchGuard(CircuitBreaker(), run_seconds=deadline or None)
+    else:
+        guard.start_run()
+    articles = []
+    for batch in pipeline.stream_feeds(feeds, feed_state, force, engine, cutoff=cutoff, guard=guard):
+        articles.extend(batch)
+    return articles
+
+
+def categorize(articles, sources=None, topics=None):
+    """Classe des articles par topic ; retourne {topic: [articles]}.
+
+    `topics` restreint le classement à certains topics (ex. ["MFA"]).
+    """
+    from . import pipeline
+
+    topics_config = pipeline.select_topics(load_config(sources), topics)
+    return pipeline.categorize_articles(articles, topics_config)
+
+
+def update(categorized, sources=None, dry_run=False, apply=False, max_articles=None,
+           incremental=False):
+    """Ajoute au veille.json les articles nouveaux de `categorized` (voir categorize).
+
+    Mêmes modes que la CLI : version datée par défaut, `apply` pour écraser
+    veille.json, `dry_run` pour ne rien écrire, `incremental` pour ne
+    versionner que les nouveaux articles.
+    Retourne (résumé par topic, nombre de nouveaux articles, version créée).
+    """
+    from . import pipeline
+
+    config = load_config(sources)
+    tagger = pipeline.build_tagger(config, pipeline.load_tag_cache())
+    result = pipeline.update_veille_json(
+        categorized, pipeline.select_topics(config, list(categorized)),
+        dry_run=dry_run, apply=apply, max_articles=max_articles,
+        tagger=tagger, incremental=incremental
+    )
+    if not dry_run:
+        pipeline.save_tag_cache(tagger)
+    return result
+
+
+def export(data=None, format='shards', dest=None):
+    """Exporte des articles vers le site ou en CSV.
+
+    - `shards` : `data` est un document veille.json (par défaut le fichier
+      courant), découpé en fragments dans `dest` (public/veille/) ;
+      retourne le manifeste ;
+    - `csv` : `data` est le résultat de categorize, un fichier par topic
+      dans `dest` (exports/) ; retourne les chemins écrits.
+    """
+    from . import pipeline
+
+    dest = Path(dest) if dest else None
+    if format == 'shards':
+        return pipeline.export_shards(data if data is not None else pipeline.load_veille_json(), dest)
+    if format == 'csv':
+        return pipeline.export_to_csv(data or {}, dest)
+    raise ValueError(f"Format d'export inconnu: {format}")
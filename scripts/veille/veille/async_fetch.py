@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de fetch asyncio
+=======================
+Télécharge les flux RSS avec un pool de connexions keep-alive partagé
+(aiohttp), limité globalement et par hôte, puis confie les octets reçus
+au parser dans un pool de threads pour ne pas bloquer la boucle.
+Délais, taille max, reprises et disjoncteur suivent le FetchGuard de
+resilience.py, comme le moteur à threads.
+
+Utilisé par le pipeline (pipeline.py) avec l'option --engine async.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .metrics import REGISTRY
+from .resilience import FeedTooLarge, FetchGuard, READ_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────
+# Fetch d'un flux
+# ─────────────────────────────────────────────
+
+async def read_limited(response, max_bytes):
+    """Lit un corps (déjà décompressé par aiohttp) sans dépasser la taille max."""
+    if response.content_length and response.content_length > max_bytes:
+        raise FeedTooLarge(f"{response.content_length} octets annoncés (max {max_bytes})")
+    chunks = []
+    size = 0
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+            raise FeedTooLarge(f"plus de {max_bytes} octets reçus")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def download(session, url, request_headers, guard, deadline):
+    """Un GET avec les délais du guard ; retourne (corps, en-têtes), corps None pour un 304."""
+    remaining = deadline.remaining()
+    timeout = aiohttp.ClientTimeout(
+        total=max(remaining, 0.001) if remaining is not None else None,
+        sock_connect=guard.connect_timeout,
+        sock_read=guard.read_timeout,
+    )
+    async with session.get(url, headers=request_headers, timeout=timeout) as response:
+        if response.status == 304:
+            body = None
+        else:
+            response.raise_for_status()
+            body = await read_limited(response, guard.max_bytes)
+        headers = {k.lower(): v for k, v in response.headers.items()}
+        # aiohttp a déjà décompressé le corps
+        headers.pop("content-encoding", None)
+        headers["content-location"] = str(response.url)
+    return body, headers
+
+
+async def fetch_one(session, executor, feed_info, request_headers, on_response, guard, slots,
+                    on_error=None):
+    """Télécharge un flux (avec reprises) puis appelle `on_response` dans l'executor.
+
+    `on_response(feed_info, body, headers)` reçoit body=None pour un 304 ;
+    `on_error(feed_info, erreur)` est appelé si le téléchargement échoue.
+    L'échéance du flux ne court qu'une fois ses places (`slots`, par hôte
+    puis globale) obtenues : l'attente dans la file ne la consomme pas.
+    """
+    name = feed_info["name"]
+    host_slot, global_slot = slots
+    try:
+        async with host_slot, global_slot:
+            guard.run_deadline.check("exécution")
+            deadline = guard.feed_deadline()
+            started = time.perf_counter()
+            attempt = 0
+            while True:
+                try:
+                    body, headers = await download(session, feed_info["url"], request_headers, guard, deadline)
+                    break
+                except Exception as e:
+                    attempt += 1
+                    delay = guard.retry_delay(attempt, e, deadline)
+                    if delay is None:
+                        raise
+                    REGISTRY.inc("veille_feed_retries_total", feed=name)
+                    logger.info(f"↻ {name}: {e or type(e).__name__}, nouvelle tentative dans {delay:.1f} s")
+                    await asyncio.sleep(delay)
+        REGISTRY.observe("veille_feed_download_seconds", time.perf_counter() - started, feed=name)
+        REGISTRY.inc("veille_feed_bytes_total", len(body or b""), feed=name)
+        guard.breaker.success(feed_info["url"])
+
+    except Exception as e:
+        if isinstance(e, asyncio.TimeoutError):
+            e = TimeoutError("délai dépassé")
+        if on_error is not None:
+            on_error(feed_info, e)
+        else:
+            REGISTRY.inc("veille_feed_fetch_total", feed=name, status="error")
+            logger.error(f"✗ Erreur lors du fetch de {name}: {e}")
+        return []
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, on_response, feed_info, body, headers)
+
+# ─────────────────────────────────────────────
+# Fetch de tous les flux
+# ─────────────────────────────────────────────
+
+async def _fetch_all(feeds, headers_for, on_response, max_connections, max_per_host, parse_workers,
+                     guard, on_error):
+    connector = aiohttp.TCPConnector(limit=max_connections, limit_per_host=max_per_host)
+    global_slot = asyncio.Semaphore(max_connections)
+    host_slots = {}
+
+    def slots_for(url):
+        host = urlsplit(url).hostname
+        if host not in host_slots:
+            host_slots[host] = asyncio.Semaphore(max_per_host)
+        return host_slots[host], global_slot
+
+    results = []
+    with ThreadPoolExecutor(max_workers=parse_workers) as executor:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [
+                fetch_one(session, executor, feed, headers_for(feed), on_response, guard,
+                          slots_for(feed["url"]), on_error)
+                for feed in feeds
+            ]
+            for task in asyncio.as_completed(tasks):
+                results.extend(await task)
+    return results
+
+
+def fetch_all(feeds, headers_for, on_response, max_connections=64, max_per_host=4, parse_workers=8,
+              guard=None, on_error=None):
+    """Récupère tous les flux et retourne la liste concaténée des articles.
+
+    `headers_for(feed_info)` fournit les en-têtes de chaque requête, et
+    `on_response` transforme chaque réponse en liste d'articles. `guard`
+    (resilience.FetchGuard) fixe délais, taille max, reprises et disjoncteur.
+    """
+    return asyncio.run(_fetch_all(
+        feeds, headers_for, on_response,
+        max_connections, max_per_host, parse_workers,
+        guard or FetchGuard(), on_error
+    ))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Captures brutes des flux (rejeu hors ligne)
+===========================================
+Chaque corps reçu est enregistré une seule fois, compressé et nommé par le
+SHA-256 des octets (le même hash que l'état HTTP des flux) : un flux qui
+répond 304 ou renvoie un contenu inchangé pointe vers le corps déjà
+capturé, sans rien réécrire. Une exécution est un manifeste compressé
+listant, par flux, le nom, l'URL, la langue, le statut, la date du relevé,
+la taille, les en-têtes de la réponse et le hash du corps.
+
+`--replay <run>` repasse ces corps dans le parsing, la catégorisation et la
+mise à jour, sans réseau : réglage des mots-clés, des règles de tags ou de
+la déduplication en quelques secondes, et corpus réels pour les benchmarks.
+
+Arborescence :
+    objects/ab/cdef...     corps bruts (zlib)
+    runs/<id>.json.gz      manifestes d'exécution
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+
+from .version_store import resolve_ref
+
+
+class CaptureStore:
+    """Corps bruts des flux et manifestes d'exécution, adressés par contenu."""
+
+    def __init__(self, root, max_runs=None):
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.runs_dir = root / "runs"
+        self.max_runs = max_runs
+        self.lock = threading.Lock()
+        self.feeds = []
+        self.started = datetime.now()
+
+    # ── Corps ────────────────────────────────────
+
+    def _object_path(self, digest):
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def has_body(self, digest):
+        return self._object_path(digest).exists()
+
+    def put_body(self, body, digest=None):
+        """Enregistre un corps s'il est absent ; retourne son hash (SHA-256 hexadécimal)."""
+        digest = digest or hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Nom temporaire propre au thread : deux flux peuvent servir le même corps
+            tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(body))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_body(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    # ── Exécution en cours ───────────────────────
+
+    def begin(self):
+        """Démarre une nouvelle exécution (les relevés précédents non enregistrés sont oubliés)."""
+        with self.lock:
+            self.feeds = []
+            self.started = datetime.now()
+
+    def record(self, feed_info, body, headers, status, digest=None):
+        """Ajoute le relevé d'un flux à l'exécution en cours.
+
+        `body` vaut None pour une réponse 304 ou un contenu inchangé : le
+        relevé pointe alors vers `digest` (hash du dernier contenu connu)
+        si ce corps a déjà été capturé.
+        """
+        if body is not None:
+            digest = self.put_body(body, digest)
+        elif digest and not self.has_body(digest):
+            digest = None
+        entry = {
+            "name": feed_info["name"],
+            "url": feed_info["url"],
+            "lang": feed_info.get("lang", "en"),
+            "status": status,
+            "fetched_at": datetime.now().isoformat(),
+            "bytes": len(body) if body is not None else None,
+            "headers": headers or {},
+            "body": digest,
+        }
+        with self.lock:
+            self.feeds.append(entry)
+
+    def save(self):
+        """Enregistre le manifeste de l'exécution en cours ; retourne son id (None si vide)."""
+        with self.lock:
+            feeds = sorted(self.feeds, key=lambda feed: feed["url"])
+            self.feeds = []
+        if not feeds:
+            return None
+        body = json.dumps(feeds, sort_keys=True).encode()
+        # Microsecondes dans l'id : l'ordre des noms est celui des exécutions
+        run_id = f"{self.started:%Y%m%d-%H%M%S.%f}-{hashlib.sha256(body).hexdigest()[:8]}"
+        manifest = {"id": run_id, "started_at": self.started.isoformat(),
+                    "saved_at": datetime.now().isoformat(), "feeds": feeds}
+
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        path = self.runs_dir / f"{run_id}.json.gz"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        self.prune()
+        return run_id
+
+    # ── Exécutions enregistrées ──────────────────
+
+    def run_ids(self):
+        """Ids des exécutions, de la plus ancienne à la plus récente."""
+        if not self.runs_dir.exists():
+            return []
+        return sorted(p.name[:-len(".json.gz")] for p in self.runs_dir.glob("*.json.gz"))
+
+    def resolve(self, ref):
+        """Résout un id, un préfixe d'id, ou `latest` / `latest~N`."""
+        return resolve_ref(self.run_ids(), ref)
+
+    def manifest(self, ref):
+        run_id = ref if (self.runs_dir / f"{ref}.json.gz").exists() else self.resolve(ref)
+        with gzip.open(self.runs_dir / f"{run_id}.json.gz", 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def iter_bodies(self, ref):
+        """(relevé, corps) de chaque flux capturé d'une exécution, dans l'ordre du manifeste.
+
+        Un relevé 304 n'a pas d'en-têtes : ceux de la dernière capture du
+        même corps, dans une exécution antérieure, sont repris.
+        """
+        manifest = self.manifest(ref)
+        missing = {feed["body"] for feed in manifest["feeds"] if feed["body"] and not feed["headers"]}
+        known = self.known_headers(missing, before=manifest["id"]) if missing else {}
+        for feed in manifest["feeds"]:
+            if feed["body"] and self.has_body(feed["body"]):
+                if not feed["headers"]:
+                    feed["headers"] = known.get(feed["body"], {})
+                yield feed, self.get_body(feed["body"])
+
+    def known_headers(self, digests, before):
+        """En-têtes reçus avec chacun des corps `digests` dans les exécutions antérieures à `before`."""
+        found = {}
+        for run_id in reversed(self.run_ids()):
+            if run_id >= before:
+                continue
+            for feed in self.manifest(run_id)["feeds"]:
+                if feed["body"] in digests and feed["headers"] and feed["body"] not in found:
+                    found[feed["body"]] = feed["headers"]
+            if len(found) == len(digests):
+                break
+        return found
+
+    def prune(self):
+        """Ne garde que les `max_runs` dernières exécutions et les corps qu'elles citent.
+
+        Retourne le nombre de corps supprimés.
+        """
+        ids = self.run_ids()
+        if not self.max_runs or len(ids) <= self.max_runs:
+            return 0
+        for run_id in ids[:-self.max_runs]:
+            (self.runs_dir / f"{run_id}.json.gz").unlink()
+        referenced = {
+            feed["body"]
+            for run_id in ids[-self.max_runs:]
+            for feed in self.manifest(run_id)["feeds"]
+            if feed["body"]
+        }
+        removed = 0
+        for path in self.objects_dir.glob("*/*"):
+            if path.name.startswith("."):
+                continue
+            if path.parent.name + path.name not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Interface en ligne de commande de la veille
+===========================================
+Analyse les arguments, configure le logging (fichier veille.log et sortie
+standard) puis délègue au pipeline. Le pipeline n'est importé qu'après
+l'analyse des arguments : --help ne charge rien d'autre que la
+configuration, et importer le package ne touche pas au logging.
+
+Usage:
+    python3 rss.py [OPTIONS]
+    python3 -m veille [OPTIONS]
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+from .config import (
+    CAPTURE_DIR, DAEMON_MAX_INTERVAL, DAEMON_MIN_INTERVAL, LOG_FILE, MAX_AGE_DAYS, RUN_DEADLINE,
+    SOURCES_FILE, VEILLE_JSON,
+)
+
+
+def setup_logging(verbose=False, log_file=LOG_FILE):
+    """Logs vers `log_file` et la sortie standard (niveau DEBUG avec --verbose)."""
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        handlers=[
+            logging.FileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Système de veille automatique RSS - Cybersécurité",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Exemples:
+  python3 rss.py                    # Cree un fichier date (versions/)
+  python3 rss.py --dry-run          # Apercu sans rien ecrire
+  python3 rss.py --apply            # Ecrase veille.json
+  python3 rss.py --topic MFA        # Filtrer uniquement MFA
+  python3 rss.py --topic ZTNA SIEM  # Filtrer ZTNA et SIEM
+  python3 rss.py --max-articles 5   # Max 5 articles par topic
+  python3 rss.py --export-csv       # Exporter aussi en CSV
+  python3 rss.py --engine async     # Fetch asyncio (pip install aiohttp)
+  python3 rss.py --parse-processes  # Parsing sur tous les coeurs
+  python3 rss.py --incremental      # Versionner seulement les nouveaux articles
+  python3 rss.py --apply-delta versions/deltas/<date>-delta.json
+  python3 rss.py --list-versions    # Lister les versions
+  python3 rss.py --export-shards    # Regénérer public/veille/ depuis veille.json
+  python3 rss.py --diff-versions latest~1 latest
+  python3 rss.py --restore-version <id>
+  python3 rss.py --sources /tmp/sources.json  # Flux du serveur local (feed_server.py)
+  python3 rss.py --dry-run --profile          # Profils par phase dans profiles/<date>/
+  python3 rss.py --daemon --incremental       # Relevés continus, intervalle adapté à chaque flux
+  python3 rss.py --watch                      # Idem, état gardé en mémoire, sources rechargées à chaud
+  python3 rss.py --list-captures              # Exécutions capturées (corps bruts des flux)
+  python3 rss.py --replay latest --dry-run    # Rejouer la dernière capture, sans réseau
+  python3 -m veille --dry-run                 # Équivalent, depuis scripts/veille
+        """
+    )
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Afficher les resultats sans rien ecrire')
+    parser.add_argument('--apply', action='store_true',
+                        help='Ecraser veille.json (sinon cree un fichier date)')
+    parser.add_argument('--topic', nargs='+', choices=['MFA', 'ZTNA', 'SIEM'],
+                        help='Filtrer par topic(s) spécifique(s)')
+    parser.add_argument('--max-articles', type=int, default=None,
+                        help='Nombre max d\'articles à ajouter par topic')
+    parser.add_argument('--export-csv', action='store_true',
+                        help='Exporter les résultats en CSV')
+    parser.add_argument('--max-age', type=int, default=MAX_AGE_DAYS,
+                        help=f'Âge max des articles en jours, 0 pour tout garder (défaut: {MAX_AGE_DAYS})')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                        help='Moteur de fetch : threads (défaut) ou async (aiohttp, connexions mutualisées)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Versionner uniquement les nouveaux articles (delta) au lieu du document complet')
+    parser.add_argument('--apply-delta', metavar='FICHIER',
+                        help='Appliquer un delta de versions/ à veille.json puis quitter')
+    parser.add_argument('--export-shards', nargs='?', const=VEILLE_JSON, type=Path, metavar='FICHIER',
+                        help='Exporter veille.json (ou FICHIER) en fragments pour le site puis quitter')
+    parser.add_argument('--list-versions', action='store_true',
+                        help='Lister les versions enregistrées puis quitter')
+    parser.add_argument('--diff-versions', nargs=2, metavar=('A', 'B'),
+                        help='Comparer deux versions (id, préfixe, latest, latest~N)')
+    parser.add_argument('--restore-version', metavar='VERSION',
+                        help='Restaurer veille.json depuis une version puis quitter')
+    parser.add_argument('--parse-processes', type=int, nargs='?', const=os.cpu_count(), default=0,
+                        metavar='N',
+                        help='Parser les flux dans N processus (défaut sans N: nombre de coeurs)')
+    parser.add_argument('--sources', type=Path, metavar='FICHIER',
+                        help=f'Configuration des sources (défaut: {SOURCES_FILE.name})')
+    parser.add_argument('--deadline', type=int, default=RUN_DEADLINE, metavar='SECONDES',
+                        help=f'Échéance globale des téléchargements, 0 pour aucune (défaut: {RUN_DEADLINE} s)')
+    parser.add_argument('--force-fetch', action='store_true',
+                        help='Ignorer le cache HTTP et retélécharger tous les flux')
+    parser.add_argument('--replay', metavar='RUN',
+                        help='Rejouer les corps capturés d\'une exécution (id, préfixe, latest, latest~N) '
+                             'au lieu de relever les flux')
+    parser.add_argument('--no-capture', action='store_true',
+                        help=f'Ne pas enregistrer les corps des flux dans {CAPTURE_DIR.name}/')
+    parser.add_argument('--list-captures', action='store_true',
+                        help='Lister les exécutions capturées puis quitter')
+    parser.add_argument('--profile', nargs='?', const=True, type=Path, metavar='DOSSIER',
+                        help='Profiler chaque phase (cProfile) et écrire .pstats / .collapsed '
+                             '(défaut: profiles/<date>/ ; en --daemon/--watch, écrits à l\'arrêt)')
+    parser.add_argument('--metrics-textfile', type=Path, metavar='FICHIER',
+                        help='Écrire aussi les métriques au format Prometheus (textfile collector de node_exporter)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Tourner en continu, chaque flux relevé selon son rythme de publication')
+    parser.add_argument('--watch', action='store_true',
+                        help='Mode démon résident : état en mémoire entre les cycles, deltas seulement, '
+                             'sources rechargées à chaque modification')
+    parser.add_argument('--min-interval', type=int, default=DAEMON_MIN_INTERVAL, metavar='MIN',
+                        help=f'Mode démon : intervalle min entre deux relevés d\'un flux (défaut: {DAEMON_MIN_INTERVAL} min)')
+    parser.add_argument('--max-interval', type=int, default=DAEMON_MAX_INTERVAL, metavar='MIN',
+                        help=f'Mode démon : intervalle max entre deux relevés d\'un flux (défaut: {DAEMON_MAX_INTERVAL} min)')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Mode verbeux')
+    
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    setup_logging(args.verbose)
+    
+    from .pipeline import run
+    return run(args)
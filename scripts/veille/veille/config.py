@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Configuration de la veille (chemins et réglages)
+================================================
+Module sans dépendance lourde : la CLI y lit ses valeurs par défaut sans
+charger le pipeline (--help, commandes sur les versions).
+
+Les fichiers d'état restent dans le répertoire des scripts (scripts/veille),
+au-dessus du package.
+"""
+
+from pathlib import Path
+
+# ─────────────────────────────────────────────
+# Chemins
+# ─────────────────────────────────────────────
+
+SCRIPT_DIR = Path(__file__).resolve().parents[1]
+ROOT_DIR = SCRIPT_DIR.parents[2]
+SOURCES_FILE = SCRIPT_DIR / "sources.json"
+VEILLE_JSON = ROOT_DIR / "veille.json"
+# Anciens historiques JSON (rss.py, fetch.py), importés dans HISTORY_DB
+HISTORY_FILES = (SCRIPT_DIR / "veille_history.json", SCRIPT_DIR / "history.json")
+HISTORY_DB = SCRIPT_DIR / "veille_history.db"
+NEARDUP_DB = SCRIPT_DIR / "veille_neardup.db"
+SEEN_FILTER_FILE = SCRIPT_DIR / "veille_seen.bloom"
+FEED_STATE_FILE = SCRIPT_DIR / "veille_feed_state.json"
+SCHEDULE_FILE = SCRIPT_DIR / "veille_schedule.json"
+BREAKER_FILE = SCRIPT_DIR / "veille_breaker.json"
+TAG_CACHE_FILE = SCRIPT_DIR / "veille_tag_cache.json"
+LOG_FILE = SCRIPT_DIR / "veille.log"
+RUN_SUMMARY_FILE = SCRIPT_DIR / "veille_run.json"
+EXPORT_DIR = SCRIPT_DIR / "exports"
+VERSION_DIR = SCRIPT_DIR / "versions"
+DELTA_DIR = VERSION_DIR / "deltas"
+PROFILE_DIR = SCRIPT_DIR / "profiles"
+# Corps bruts des flux et manifestes d'exécution (--replay)
+CAPTURE_DIR = SCRIPT_DIR / "captures"
+# Fragments servis statiquement par la page Next.js (public/veille/)
+SHARD_DIR = SCRIPT_DIR.parents[1] / "public" / "veille"
+
+# ─────────────────────────────────────────────
+# Réglages
+# ─────────────────────────────────────────────
+
+# Nombre max de jours pour considérer un article comme récent
+MAX_AGE_DAYS = 30
+
+# Longueur max des descriptions (points de suspension compris)
+DESCRIPTION_MAX_LEN = 500
+
+# Rétention de l'historique de déduplication (jours, nombre d'entrées)
+HISTORY_TTL_DAYS = 365
+HISTORY_MAX_ENTRIES = 500000
+
+# Préfiltre de Bloom : capacité min (URL) et taux de faux positifs visé
+SEEN_FILTER_CAPACITY = 2 * HISTORY_MAX_ENTRIES
+SEEN_FILTER_ERROR_RATE = 0.01
+
+# Quasi-doublons : similarité min (Jaccard estimée) et rétention de l'index
+NEARDUP_THRESHOLD = 0.6
+NEARDUP_TTL_DAYS = 30
+NEARDUP_MAX_ENTRIES = 200000
+
+# Nombre max de workers pour le fetch parallèle
+MAX_WORKERS = 8
+
+# Échéance globale des téléchargements d'une exécution (secondes) ;
+# délais par requête, taille max et disjoncteur : voir resilience.py
+RUN_DEADLINE = 300
+
+# Limites du moteur asyncio (--engine async) : connexions totales et par hôte
+ASYNC_MAX_CONNECTIONS = 64
+ASYNC_MAX_PER_HOST = 4
+
+# Nombre d'articles par page de fragment (page /veille)
+SHARD_PAGE_SIZE = 24
+
+# Nombre max de flux parsés en attente de catégorisation (backpressure)
+STREAM_QUEUE_SIZE = 16
+
+# Nombre d'exécutions capturées conservées (les corps non cités sont supprimés)
+CAPTURE_MAX_RUNS = 30
+
+# Nombre de fonctions affichées dans le rapport en mode --profile
+PROFILE_TOP = 15
+
+# Mode --daemon : bornes des intervalles de relevé (minutes), attente max entre deux réveils (s)
+DAEMON_MIN_INTERVAL = 5
+DAEMON_MAX_INTERVAL = 24 * 60
+DAEMON_MAX_SLEEP = 60
+# Les flux dus dans les N secondes sont relevés dans le même cycle
+DAEMON_BATCH_WINDOW = 15
+# Mode --watch : délai max avant la prise en compte d'une modification des sources (s)
+WATCH_RELOAD_CHECK = 5
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Historique de déduplication (SQLite)
+====================================
+Stocke les identifiants d'articles déjà traités dans une table indexée :
+test d'appartenance indexé, écritures incrémentales (seules les nouvelles
+lignes sont écrites) et éviction par ancienneté (TTL) et par taille.
+
+Les ajouts ne sont persistés qu'à l'appel de `commit()` ; fermer le store
+sans commit les annule (mode --dry-run).
+"""
+
+import sqlite3
+import time
+
+
+class HistoryStore:
+    """Ensemble persistant d'identifiants d'articles déjà traités."""
+
+    def __init__(self, path, ttl_days=None, max_entries=None):
+        self.path = path
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS processed (
+                id TEXT PRIMARY KEY,
+                seen_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS processed_seen_at ON processed (seen_at);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+
+    def __contains__(self, item_id):
+        row = self.conn.execute(
+            "SELECT 1 FROM processed WHERE id = ?", (item_id,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM processed").fetchone()[0]
+
+    def __iter__(self):
+        """Parcourt les identifiants sans les charger tous en mémoire."""
+        for (item_id,) in self.conn.execute("SELECT id FROM processed"):
+            yield item_id
+
+    def add(self, item_id):
+        """Marque un identifiant comme traité (visible avant le commit)."""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO processed (id, seen_at) VALUES (?, ?)",
+            (item_id, time.time())
+        )
+
+    def add_many(self, item_ids, seen_at=None):
+        """Importe un lot d'identifiants (migration de l'ancien historique)."""
+        seen_at = seen_at or time.time()
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO processed (id, seen_at) VALUES (?, ?)",
+            ((item_id, seen_at) for item_id in item_ids)
+        )
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def evict(self):
+        """Supprime les entrées expirées puis les plus anciennes au-delà de la taille max.
+
+        Retourne le nombre d'entrées supprimées.
+        """
+        removed = 0
+        if self.ttl_days:
+            cutoff = time.time() - self.ttl_days * 86400
+            removed += self.conn.execute(
+                "DELETE FROM processed WHERE seen_at < ?", (cutoff,)
+            ).rowcount
+        if self.max_entries:
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                removed += self.conn.execute(
+                    "DELETE FROM processed WHERE id IN "
+                    "(SELECT id FROM processed ORDER BY seen_at LIMIT ?)",
+                    (excess,)
+                ).rowcount
+        return removed
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        """Ferme la base ; les ajouts non commités sont annulés."""
+        self.conn.close()
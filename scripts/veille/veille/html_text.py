@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conversion HTML -> texte en une passe
+=====================================
+Retire les balises, ignore commentaires, <script> et <style>, décode toutes
+les entités HTML (html.unescape) et replie les espaces, en un seul parcours
+du document. Avec une longueur maximale, le parcours s'arrête dès que la
+limite est dépassée : un résumé de 100 Ko dont on ne garde que 500
+caractères n'est pas nettoyé en entier.
+
+Le même parcours relève la première image (src, data-src et variantes des
+images chargées à la demande, srcset), ce qui évite de rescanner le HTML.
+"""
+
+import re
+from html import unescape
+from urllib.parse import urljoin, urlparse
+
+# Balises, commentaires, doctype / instructions de traitement
+TAG_RE = re.compile(r'<!--.*?(?:-->|$)|<(/?)([a-zA-Z][\w:-]*)[^>]*>|<[!?][^>]*>', re.S)
+
+# Attributs d'une balise : nom, valeur entre guillemets, apostrophes ou nue
+ATTR_RE = re.compile(r'''([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?''')
+
+# Nom de balise en tête d'une balise ouvrante
+TAG_NAME_RE = re.compile(r'<[^\s>/]+')
+
+# Première balise <img> (recherche d'image après la fin du texte)
+IMG_RE = re.compile(r'<img\b[^>]*>', re.I)
+
+# Attributs portant l'URL d'une image, par ordre de préférence
+IMAGE_SRC_ATTRS = ("src", "data-src", "data-lazy-src", "data-original", "data-url")
+IMAGE_SRCSET_ATTRS = ("srcset", "data-srcset", "data-lazy-srcset")
+
+# Mots (suites de caractères non blancs)
+WORD_RE = re.compile(r'\S+')
+
+# Balises dont le contenu n'est pas du texte (et motif de leur fermeture)
+SKIP_CONTENT = {
+    name: re.compile(rf"</{name}\b", re.I)
+    for name in ("script", "style", "noscript", "template")
+}
+
+# Balises de bloc : leur frontière sépare deux mots
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "ol", "p", "pre", "section", "table", "td", "th",
+    "tr", "ul",
+}
+
+
+class TextBuilder:
+    """Accumule des mots en repliant les espaces, jusqu'à `max_len` caractères."""
+
+    def __init__(self, max_len=None):
+        self.max_len = max_len
+        self.parts = []
+        self.length = 0
+        self.need_space = False
+
+    @property
+    def full(self):
+        return self.max_len is not None and self.length > self.max_len
+
+    def separate(self):
+        self.need_space = True
+
+    def append(self, word):
+        if self.need_space and self.parts:
+            self.parts.append(" ")
+            self.length += 1
+        self.parts.append(word)
+        self.length += len(word)
+
+    def add(self, text):
+        """Ajoute un fragment de texte brut (entités non décodées), mot par mot."""
+        for match in WORD_RE.finditer(text):
+            # Les mots sont maximaux : tout écart avant l'un d'eux est un blanc
+            if match.start() > 0:
+                self.need_space = True
+            word = match.group()
+            if "&" in word:
+                # Une entité peut être un blanc (&nbsp;) : redécouper après décodage
+                word = unescape(word)
+                if word[0].isspace():
+                    self.need_space = True
+                for piece in word.split():
+                    self.append(piece)
+                    self.need_space = True
+                self.need_space = word[-1].isspace()
+            else:
+                self.append(word)
+                self.need_space = False
+            if self.full:
+                return
+        if text and text[-1].isspace():
+            self.need_space = True
+
+    def text(self, ellipsis="..."):
+        text = "".join(self.parts)
+        if self.full:
+            return text[:self.max_len - len(ellipsis)] + ellipsis
+        return text
+
+
+def tag_attributes(tag):
+    """Attributs d'une balise ouvrante (noms en minuscules, valeurs décodées)."""
+    attrs = {}
+    name_end = TAG_NAME_RE.match(tag)
+    for match in ATTR_RE.finditer(tag, name_end.end() if name_end else 0):
+        name = match.group(1).lower()
+        value = next((v for v in match.group(2, 3, 4) if v is not None), "")
+        attrs.setdefault(name, unescape(value) if "&" in value else value)
+    return attrs
+
+
+def srcset_best(srcset):
+    """URL de la plus grande image d'un srcset (« url 640w, url 2x »)."""
+    best, best_size = "", -1.0
+    for candidate in srcset.split(","):
+        parts = candidate.split()
+        if not parts:
+            continue
+        size = 0.0
+        if len(parts) > 1 and parts[1][:-1].replace(".", "", 1).isdigit():
+            size = float(parts[1][:-1])
+        if size > best_size:
+            best, best_size = parts[0], size
+    return best
+
+
+def image_url(tag, base_url=None):
+    """URL de l'image d'une balise <img>, chargement différé compris ("" sinon)."""
+    attrs = tag_attributes(tag)
+    url = ""
+    for name in IMAGE_SRC_ATTRS:
+        value = attrs.get(name, "").strip()
+        # Les images différées ont souvent un src de remplacement (data:, pixel)
+        if value and not value.startswith("data:"):
+            url = value
+            break
+    if not url:
+        for name in IMAGE_SRCSET_ATTRS:
+            if attrs.get(name):
+                url = srcset_best(attrs[name])
+                break
+    try:
+        if url and base_url:
+            url = urljoin(base_url, url)
+        scheme = urlparse(url).scheme
+    except ValueError:
+        # URL mal formée ("http://[bad/a.png") : image ignorée, pas le flux
+        return ""
+    # Pas de javascript: ni d'autre schéma exotique dans le veille.json
+    if scheme not in ("", "http", "https"):
+        return ""
+    return url
+
+
+def first_image(html, base_url=None):
+    """Première image exploitable d'un fragment HTML ("" sinon)."""
+    for match in IMG_RE.finditer(html):
+        url = image_url(match.group(), base_url)
+        if url:
+            return url
+    return ""
+
+
+def extract_html(html, max_len=None, ellipsis="...", base_url=None, with_image=True):
+    """Texte brut et première image d'un fragment HTML, en un seul parcours.
+
+    Le texte est tronqué comme par html_to_text ; si la limite est atteinte
+    avant la première image, la suite du document n'est parcourue que pour
+    trouver une balise <img>. Les URL relatives sont résolues sur `base_url`.
+    Retourne (texte, url_image).
+    """
+    builder = TextBuilder(max_len)
+    image = ""
+    pos = 0
+    while not builder.full:
+        match = TAG_RE.search(html, pos)
+        if match is None:
+            builder.add(html[pos:])
+            pos = len(html)
+            break
+        builder.add(html[pos:match.start()])
+        pos = match.end()
+
+        name = (match.group(2) or "").lower()
+        if name in BLOCK_TAGS:
+            builder.separate()
+        elif name == "img" and with_image and not image:
+            image = image_url(match.group(), base_url)
+        elif name in SKIP_CONTENT and not match.group(1):
+            end = SKIP_CONTENT[name].search(html, pos)
+            pos = end.start() if end else len(html)
+
+    if with_image and not image and pos < len(html):
+        image = first_image(html[pos:], base_url)
+    return builder.text(ellipsis), image
+
+
+def html_to_text(html, max_len=None, ellipsis="..."):
+    """Texte brut d'un fragment HTML, tronqué à `max_len` caractères.
+
+    Un texte plus long que `max_len` est coupé à `max_len - len(ellipsis)`
+    caractères suivis de `ellipsis`.
+    """
+    return extract_html(html, max_len, ellipsis, with_image=False)[0]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recherche multi-mots-clés en une passe
+======================================
+Automate d'Aho-Corasick compilé une seule fois à partir de listes de
+mots-clés étiquetées (topics, tags...). Un texte est parcouru une seule
+fois et toutes les étiquettes correspondantes sont retournées, quel que
+soit le nombre de mots-clés.
+"""
+
+
+def is_word_char(c):
+    """Équivalent de la classe \\w des regex Python."""
+    return c.isalnum() or c == "_"
+
+
+def at_word_boundary(text, pos):
+    """Équivalent de \\b à la position `pos` de `text`."""
+    before = pos > 0 and is_word_char(text[pos - 1])
+    after = pos < len(text) and is_word_char(text[pos])
+    return before != after
+
+
+class KeywordMatcher:
+    """Automate d'Aho-Corasick associant des mots-clés à des étiquettes.
+
+    Les mots-clés d'au plus `whole_word_max_len` caractères (acronymes
+    courts : MFA, SIEM...) ne correspondent qu'à des mots entiers ; les
+    autres sont recherchés comme sous-chaînes. La casse est ignorée.
+    """
+
+    def __init__(self, keywords_by_label, whole_word_max_len=4):
+        self.labels = list(keywords_by_label)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for label, keywords in keywords_by_label.items():
+            for keyword in keywords:
+                kw = keyword.lower()
+                if kw:
+                    self._add(kw, label, len(kw) <= whole_word_max_len)
+        self._build_fail_links()
+
+    def _add(self, kw, label, whole_word):
+        node = 0
+        for c in kw:
+            nxt = self._goto[node].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(kw), whole_word, label))
+
+    def _build_fail_links(self):
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for c, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and c not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(c, 0)
+                # Hériter des sorties du suffixe le plus long
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+    def match(self, text):
+        """Retourne l'ensemble des étiquettes présentes dans `text`.
+
+        `text` doit déjà être en minuscules.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        remaining = len(self.labels)
+        node = 0
+        for i, c in enumerate(text):
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            for length, whole_word, label in out[node]:
+                if label in found:
+                    continue
+                if whole_word and not (at_word_boundary(text, i + 1 - length)
+                                       and at_word_boundary(text, i + 1)):
+                    continue
+                found.add(label)
+                remaining -= 1
+                if not remaining:
+                    return found
+        return found
+
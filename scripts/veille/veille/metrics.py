@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métriques d'exécution de la veille
+==================================
+Compteurs, jauges et histogrammes étiquetés (par flux, par étape), partagés
+entre les threads de fetch, puis exportés en fin d'exécution :
+- un résumé JSON lisible (par flux, par étape) ;
+- un fichier texte au format Prometheus pour le textfile collector de
+  node_exporter (écrit de façon atomique, comme le veut le collector).
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Bornes des histogrammes de durée (secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """Registre de métriques thread-safe."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.help = {}
+        self.types = {}
+        self.values = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def describe(self, name, kind, text):
+        """Déclare le type (counter, gauge, histogram) et l'aide d'une métrique."""
+        self.types[name] = kind
+        self.help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        """Incrémente un compteur."""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.values.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Fixe la valeur d'une jauge."""
+        with self.lock:
+            self.values.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        """Ajoute une observation à un histogramme."""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0, "max": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+            hist["count"] += 1
+            hist["sum"] += value
+            hist["max"] = max(hist["max"], value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Mesure la durée du bloc dans l'histogramme `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        """Vide le registre (début d'une nouvelle exécution)."""
+        with self.lock:
+            self.values.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    # ─────────────────────────────────────────
+    # Exports
+    # ─────────────────────────────────────────
+
+    def summary(self):
+        """Résumé JSON : séries regroupées par flux, par étape, puis le reste."""
+        feeds, stages, totals = {}, {}, {}
+        with self.lock:
+            entries = [(name, key, value) for name, series in self.values.items()
+                       for key, value in series.items()]
+            entries += [(name, key, {"count": h["count"], "seconds": round(h["sum"], 6),
+                                     "max": round(h["max"], 6)})
+                        for name, series in self.histograms.items()
+                        for key, h in series.items()]
+
+        for name, key, value in entries:
+            labels = dict(key)
+            if "feed" in labels:
+                target = feeds.setdefault(labels.pop("feed"), {})
+            elif "stage" in labels:
+                target = stages.setdefault(labels.pop("stage"), {})
+            else:
+                target = totals
+            suffix = "".join(f"|{k}={v}" for k, v in sorted(labels.items()))
+            target[name + suffix] = value
+
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "duration_seconds": round(time.time() - self.started, 3),
+            "totals": totals,
+            "stages": stages,
+            "feeds": feeds,
+        }
+
+    def prometheus(self):
+        """Texte au format d'exposition Prometheus."""
+        lines = []
+        with self.lock:
+            for name in sorted(set(self.values) | set(self.histograms)):
+                kind = self.types.get(name, "histogram" if name in self.histograms else "gauge")
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self.values.get(name, {}).items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+                for key, hist in sorted(self.histograms.get(name, {}).items()):
+                    for bound, count in zip(self.buckets, hist["buckets"]):
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', _format_value(float(bound)))])} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {hist['count']}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(hist['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_summary(self, path):
+        """Écrit le résumé JSON de l'exécution."""
+        _write_atomic(path, json.dumps(self.summary(), indent=2, ensure_ascii=False))
+
+    def write_textfile(self, path):
+        """Écrit le fichier .prom lu par le textfile collector de node_exporter."""
+        _write_atomic(path, self.prometheus())
+
+
+def _write_atomic(path, text):
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# Registre partagé par pipeline.py et async_fetch.py
+REGISTRY = Metrics()
+
+REGISTRY.describe("veille_feed_fetch_total", "counter", "Fetchs par flux et par statut (ok, not_modified, parse_error, error, circuit_open, deadline)")
+REGISTRY.describe("veille_feed_retries_total", "counter", "Nouvelles tentatives après une erreur transitoire, par flux")
+REGISTRY.describe("veille_feed_download_seconds", "histogram", "Durée de téléchargement d'un flux")
+REGISTRY.describe("veille_feed_parse_seconds", "histogram", "Durée de parsing d'un flux")
+REGISTRY.describe("veille_feed_bytes_total", "counter", "Octets reçus par flux (après décompression)")
+REGISTRY.describe("veille_feed_articles_total", "counter", "Articles extraits par flux")
+REGISTRY.describe("veille_feed_too_old_total", "counter", "Entrées écartées par --max-age, par flux")
+REGISTRY.describe("veille_stage_seconds", "histogram", "Durée des étapes du pipeline")
+REGISTRY.describe("veille_near_duplicates_total", "counter", "Articles ignorés comme quasi-doublons, par topic")
+REGISTRY.describe("veille_new_articles", "gauge", "Nouveaux articles ajoutés par topic")
+REGISTRY.describe("veille_run_duration_seconds", "gauge", "Durée totale de l'exécution")
+REGISTRY.describe("veille_run_timestamp_seconds", "gauge", "Horodatage de fin de la dernière exécution")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Détection des quasi-doublons (MinHash + LSH)
+============================================
+Un même communiqué repris par plusieurs sources sous des URL différentes
+échappe à la déduplication exacte sur le lien. Chaque article est réduit à
+l'ensemble des mots de son titre et de sa description (normalisés, sans
+mots vides), résumé par une signature MinHash ; deux articles sont des
+quasi-doublons si la similarité de Jaccard estimée atteint `threshold`.
+
+Recherche sous-linéaire par bandes (LSH) : la signature est découpée en
+bandes, seules les entrées partageant une bande entière sont comparées.
+Index SQLite borné (TTL, taille max), persisté au `commit()` comme
+l'historique ; sans commit, les ajouts sont annulés (--dry-run).
+"""
+
+import hashlib
+import re
+import sqlite3
+import struct
+import time
+import unicodedata
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# En dessous de ce nombre de mots distincts, la signature n'est pas assez discriminante
+MIN_TOKENS = 6
+
+STOPWORDS = set("""
+a an and are as at be by for from has have in is it its of on or that the this to was
+were will with au aux avec ce ces dans de des du en est et il la le les leur par pas
+pour qui que sa se ses son sur un une
+""".split())
+
+WORD_RE = re.compile(r"\w+")
+
+SIGNATURE = struct.Struct(f"<{NUM_PERM}I")
+
+
+def normalize_tokens(text):
+    """Mots distincts en minuscules, sans accents, ponctuation ni mots vides."""
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return {word for word in WORD_RE.findall(text) if word not in STOPWORDS}
+
+
+def minhash(text, min_tokens=MIN_TOKENS):
+    """Signature MinHash d'un texte (tuple de NUM_PERM entiers 32 bits), None si trop court.
+
+    Les NUM_PERM fonctions de hachage sont les tranches de 32 bits de la
+    sortie SHAKE-128 de chaque mot : un seul appel par mot, et des
+    signatures stables d'une exécution à l'autre.
+    """
+    tokens = normalize_tokens(text)
+    if len(tokens) < min_tokens:
+        return None
+    rows = [
+        SIGNATURE.unpack(hashlib.shake_128(token.encode()).digest(SIGNATURE.size))
+        for token in tokens
+    ]
+    return tuple(map(min, zip(*rows)))
+
+
+def similarity(sig_a, sig_b):
+    """Similarité de Jaccard estimée entre deux signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / len(sig_a)
+
+
+def band_keys(signature):
+    """Une clé par bande : hash des ROWS valeurs de la bande (entier signé 64 bits)."""
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f"<B{ROWS}I", band, *signature[band * ROWS:(band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True))
+    return keys
+
+
+class NearDuplicateIndex:
+    """Index persistant de signatures MinHash, interrogé par bandes LSH."""
+
+    def __init__(self, path, threshold=0.6, ttl_days=None, max_entries=None):
+        self.path = path
+        self.threshold = threshold
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(str(path))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                id TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                link TEXT,
+                seen_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS signatures_seen_at ON signatures (seen_at);
+            CREATE TABLE IF NOT EXISTS bands (
+                band_key INTEGER NOT NULL,
+                id TEXT NOT NULL,
+                PRIMARY KEY (band_key, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS bands_id ON bands (id);
+        """)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def find(self, signature):
+        """Entrée la plus proche au-dessus du seuil : (id, lien, similarité) ou None."""
+        keys = band_keys(signature)
+        rows = self.conn.execute(
+            f"SELECT s.id, s.signature, s.link FROM signatures s WHERE s.id IN "
+            f"(SELECT id FROM bands WHERE band_key IN ({','.join('?' * len(keys))}))",
+            keys
+        ).fetchall()
+        best = None
+        for item_id, blob, link in rows:
+            score = similarity(signature, SIGNATURE.unpack(blob))
+            if score >= self.threshold and (best is None or score > best[2]):
+                best = (item_id, link, score)
+        return best
+
+    def add(self, item_id, signature, link=""):
+        """Indexe une signature (visible avant le commit)."""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO signatures (id, signature, link, seen_at) VALUES (?, ?, ?, ?)",
+            (item_id, SIGNATURE.pack(*signature), link, time.time())
+        )
+        if cursor.rowcount:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO bands (band_key, id) VALUES (?, ?)",
+                ((key, item_id) for key in band_keys(signature))
+            )
+
+    def evict(self):
+        """Supprime les signatures expirées puis les plus anciennes au-delà de la taille max.
+
+        Retourne le nombre de signatures supprimées.
+        """
+        stale = set()
+        if self.ttl_days:
+            cutoff = time.time() - self.ttl_days * 86400
+            stale.update(row[0] for row in self.conn.execute(
+                "SELECT id FROM signatures WHERE seen_at < ?", (cutoff,)
+            ))
+        if self.max_entries:
+            excess = len(self) - len(stale) - self.max_entries
+            if excess > 0:
+                for (item_id,) in self.conn.execute("SELECT id FROM signatures ORDER BY seen_at"):
+                    if excess <= 0:
+                        break
+                    if item_id not in stale:
+                        stale.add(item_id)
+                        excess -= 1
+        stale = list(stale)
+        for start in range(0, len(stale), 500):
+            chunk = stale[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            self.conn.execute(f"DELETE FROM bands WHERE id IN ({marks})", chunk)
+            self.conn.execute(f"DELETE FROM signatures WHERE id IN ({marks})", chunk)
+        return len(stale)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        """Ferme l'index ; les ajouts non commités sont annulés."""
+        self.conn.close()
@@ -0,0 +1,1795 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline de veille par flux RSS
+===============================
+Récupère les articles depuis des flux RSS de sites cybersécurité,
+filtre par thématique (MFA, ZTNA, SIEM), et met à jour veille.json.
+
+Les fonctions de ce module sont appelées par la CLI (cli.py) et par l'API
+du package (api.py). Aucune configuration de logging ni dépendance lourde
+au chargement : feedparser, csv, urllib.request et le pool de processus ne
+sont importés qu'au premier usage.
+"""
+
+import json
+import os
+import shutil
+import re
+import hashlib
+import calendar
+import logging
+import queue
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from time import mktime, sleep
+
+from .config import (
+    ASYNC_MAX_CONNECTIONS, ASYNC_MAX_PER_HOST, BREAKER_FILE, CAPTURE_DIR, CAPTURE_MAX_RUNS,
+    DAEMON_BATCH_WINDOW, DAEMON_MAX_SLEEP, DELTA_DIR, DESCRIPTION_MAX_LEN,
+    EXPORT_DIR, FEED_STATE_FILE, HISTORY_DB, HISTORY_FILES, HISTORY_MAX_ENTRIES,
+    HISTORY_TTL_DAYS, MAX_WORKERS, NEARDUP_DB, NEARDUP_MAX_ENTRIES, NEARDUP_THRESHOLD,
+    NEARDUP_TTL_DAYS, PROFILE_DIR, PROFILE_TOP, RUN_SUMMARY_FILE, SCHEDULE_FILE,
+    SEEN_FILTER_CAPACITY, SEEN_FILTER_ERROR_RATE, SEEN_FILTER_FILE, SHARD_DIR,
+    SHARD_PAGE_SIZE, SOURCES_FILE, STREAM_QUEUE_SIZE, TAG_CACHE_FILE, VEILLE_JSON,
+    VERSION_DIR, WATCH_RELOAD_CHECK,
+)
+from .matcher import KeywordMatcher
+from .tagger import TagEngine, empty_tag_cache
+from .history_store import HistoryStore
+from .version_store import VersionStore
+from .capture_store import CaptureStore
+from .metrics import REGISTRY
+from .profiling import PROFILER, top_functions
+from .html_text import extract_html, first_image, html_to_text
+from .near_dup import NearDuplicateIndex, minhash
+from .url_filter import BloomFilter, canonical_url
+from .scheduler import FeedScheduler, feed_hints, mean_gap
+from .resilience import (CircuitBreaker, FetchGuard, decompress_limited, read_limited,
+                         set_read_timeout)
+
+logger = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────
+# Historique (déduplication)
+# ─────────────────────────────────────────────
+
+def load_history(dry_run=False):
+    """Ouvre l'historique des articles déjà traités (SQLite indexé).
+
+    Les anciens historiques JSON sont importés tant qu'un enregistrement n'a
+    pas eu lieu (ils sont renommés par save_history), ce qui préserve le
+    --dry-run. En --dry-run, une base absente n'est pas créée : l'historique
+    (vide) reste en mémoire.
+    """
+    path = HISTORY_DB if HISTORY_DB.exists() or not dry_run else ":memory:"
+    history = HistoryStore(path, ttl_days=HISTORY_TTL_DAYS,
+                           max_entries=HISTORY_MAX_ENTRIES)
+    for history_file in HISTORY_FILES:
+        if not history_file.exists():
+            continue
+        with open(history_file, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        history.add_many(legacy.get("processed_urls", []))
+        if legacy.get("last_run") and legacy["last_run"] > (history.get_meta("last_run") or ""):
+            history.set_meta("last_run", legacy["last_run"])
+        logger.info(f"📥 Historique JSON importé ({history_file.name})")
+    return history
+
+
+def load_seen_filter(history, veille_data):
+    """Préfiltre de Bloom des identifiants de l'historique.
+
+    Le filtre n'est réutilisé que s'il a été écrit avec le dernier commit de
+    l'historique (même génération) et n'est pas saturé ; sinon il est
+    reconstruit en parcourant l'historique. Au premier passage aux
+    identifiants canoniques, les articles du veille.json y sont importés.
+    """
+    generation = history.get_meta("seen_filter_generation")
+    seen = BloomFilter.load(SEEN_FILTER_FILE)
+    if (seen is not None and generation and seen.generation.decode() == generation
+            and seen.count <= seen.capacity):
+        return seen
+
+    if generation is None:
+        history.add_many(
+            article_id(article)
+            for veille in veille_data.get("veilles", [])
+            for article in veille.get("articles", [])
+            if article.get("link")
+        )
+    seen = BloomFilter.for_capacity(max(SEEN_FILTER_CAPACITY, 2 * len(history)),
+                                    SEEN_FILTER_ERROR_RATE)
+    for item_id in history:
+        seen.add(item_id)
+    logger.info(f"🔎 Préfiltre de déduplication reconstruit ({seen.count} URL, "
+                f"{len(seen.bits) // 1024} Ko)")
+    return seen
+
+
+def save_seen_filter(history, seen):
+    """Écrit le préfiltre et le rattache à l'historique (avant le commit de celui-ci)."""
+    generation = os.urandom(8).hex()
+    seen.generation = generation.encode()
+    seen.save(SEEN_FILTER_FILE)
+    history.set_meta("seen_filter_generation", generation)
+
+
+def save_history(history, seen=None, defer_seen=False):
+    """Persiste les nouveaux identifiants et applique la rétention.
+
+    Le préfiltre n'est écrit que s'il a reçu des identifiants, avant le
+    commit : s'il manque ou s'il ne correspond pas à l'historique commité,
+    il sera reconstruit. Avec `defer_seen` (processus résident), il n'est
+    pas réécrit à chaque cycle mais seulement invalidé, jusqu'à l'arrêt.
+    """
+    history.set_meta("last_run", datetime.now().isoformat())
+    removed = history.evict()
+    if removed:
+        logger.info(f"🧹 {removed} entrées expirées retirées de l'historique")
+    if seen is not None and seen.dirty:
+        if defer_seen:
+            history.set_meta("seen_filter_generation", "")
+        else:
+            save_seen_filter(history, seen)
+    history.commit()
+    for history_file in HISTORY_FILES:
+        if history_file.exists():
+            history_file.rename(history_file.with_suffix('.json.migrated'))
+            logger.info(f"📥 Historique {history_file.name} migré dans {HISTORY_DB.name}")
+
+
+def url_hash(url):
+    """Génère un hash court d'une URL pour la déduplication."""
+    return hashlib.md5(url.encode()).hexdigest()[:12]
+
+
+def article_id(article):
+    """Identifiant de déduplication : hash de l'URL canonique (rel=canonical, sinon lien)."""
+    return url_hash(canonical_url(article.get("canonical") or article.get("link", "")))
+
+
+def article_signature(article):
+    """Signature MinHash du titre et de la description (None si texte trop court)."""
+    return minhash(f"{article.get('title', '')} {article.get('description', '')}")
+
+
+def load_near_duplicates(veille_data, dry_run=False):
+    """Ouvre l'index des quasi-doublons, initialisé depuis le veille.json s'il est vide.
+
+    Base distincte de l'historique : chacune garde sa propre transaction.
+    En --dry-run, rien n'est écrit (base absente gardée en mémoire).
+    """
+    path = NEARDUP_DB if NEARDUP_DB.exists() or not dry_run else ":memory:"
+    index = NearDuplicateIndex(path, threshold=NEARDUP_THRESHOLD,
+                               ttl_days=NEARDUP_TTL_DAYS, max_entries=NEARDUP_MAX_ENTRIES)
+    if len(index) == 0:
+        for veille in veille_data.get("veilles", []):
+            for article in veille.get("articles", []):
+                signature = article_signature(article)
+                if signature and article.get("link"):
+                    index.add(article_id(article), signature, article["link"])
+        # Contenu déjà publié : persisté dès l'ouverture, sauf en --dry-run
+        if not dry_run:
+            index.commit()
+        logger.info(f"🪞 Index des quasi-doublons initialisé ({len(index)} articles)")
+    return index
+
+
+def save_near_duplicates(index):
+    """Persiste les nouvelles signatures et applique la rétention."""
+    removed = index.evict()
+    if removed:
+        logger.info(f"🧹 {removed} signatures expirées retirées de l'index des quasi-doublons")
+    index.commit()
+
+# ─────────────────────────────────────────────
+# Chargement des sources RSS
+# ─────────────────────────────────────────────
+
+def load_sources(path=None):
+    """Charge la configuration des sources RSS et des topics."""
+    with open(path or SOURCES_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def sources_feeds(config):
+    """Tous les flux de la configuration, toutes catégories confondues."""
+    return [feed for feeds in config["rss_feeds"].values() for feed in feeds]
+
+
+def select_topics(config, topics=None):
+    """Topics de la configuration, restreints à `topics` si fourni."""
+    if not topics:
+        return config["topics"]
+    return {k: v for k, v in config["topics"].items() if k in topics}
+
+# ─────────────────────────────────────────────
+# État HTTP des flux (GET conditionnel)
+# ─────────────────────────────────────────────
+
+def load_feed_state():
+    """Charge l'état HTTP des flux (validateurs et hash du dernier contenu)."""
+    if FEED_STATE_FILE.exists():
+        with open(FEED_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_feed_state(feed_state):
+    """Sauvegarde l'état HTTP des flux."""
+    with open(FEED_STATE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(feed_state, f, indent=2, ensure_ascii=False)
+
+
+def conditional_headers(state=None):
+    """Construit les en-têtes d'une requête conditionnelle pour un flux."""
+    import feedparser
+
+    state = state or {}
+    headers = {
+        "User-Agent": feedparser.USER_AGENT,
+        "Accept-Encoding": "gzip, deflate",
+    }
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("modified"):
+        headers["If-Modified-Since"] = state["modified"]
+    return headers
+
+
+def check_feed_body(body, headers, state=None):
+    """Compare un contenu reçu au dernier passage et calcule le nouvel état.
+
+    Retourne (contenu, nouvel état). Le contenu vaut None s'il est inchangé
+    (ou si `body` vaut déjà None, cas d'une réponse 304).
+    """
+    state = state or {}
+    new_state = dict(state, checked_at=datetime.now().isoformat())
+    if body is None:
+        return None, new_state
+
+    if headers.get("etag"):
+        new_state["etag"] = headers["etag"]
+    if headers.get("last-modified"):
+        new_state["modified"] = headers["last-modified"]
+    body_hash = hashlib.sha256(body).hexdigest()
+    if body_hash == state.get("hash"):
+        return None, new_state
+    new_state["hash"] = body_hash
+    return body, new_state
+
+
+def download_feed(url, state=None, name=None, guard=None, deadline=None):
+    """Télécharge un flux avec un GET conditionnel (ETag / Last-Modified).
+
+    Retourne (contenu, en-têtes, nouvel état). Le contenu vaut None si le
+    serveur répond 304 ou si le corps est identique au dernier passage.
+    Les octets reçus sont comptés dans les métriques du flux `name`.
+    `guard` fixe les délais de connexion et de lecture et la taille max ;
+    le téléchargement est interrompu à `deadline` (voir resilience.py).
+    """
+    import urllib.error
+    import urllib.request
+
+    guard = guard or FetchGuard()
+    deadline = deadline or guard.feed_deadline()
+    remaining = deadline.remaining()
+    connect_timeout, read_timeout = guard.connect_timeout, guard.read_timeout
+    if remaining is not None:
+        deadline.check()
+        connect_timeout, read_timeout = min(connect_timeout, remaining), min(read_timeout, remaining)
+    
+    request = urllib.request.Request(url, headers=conditional_headers(state))
+    try:
+        with urllib.request.urlopen(request, timeout=connect_timeout) as response:
+            set_read_timeout(response, read_timeout)
+            body = read_limited(response, guard.max_bytes, deadline)
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            headers["content-location"] = response.geturl()
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            _, new_state = check_feed_body(None, {}, state)
+            return None, {}, new_state
+        raise
+
+    # Décompresser nous-mêmes : feedparser ne le fait que s'il télécharge
+    body = decompress_limited(body, headers.pop("content-encoding", ""), guard.max_bytes)
+    REGISTRY.inc("veille_feed_bytes_total", len(body), feed=name or url)
+
+    body, new_state = check_feed_body(body, headers, state)
+    return body, headers, new_state
+
+# ─────────────────────────────────────────────
+# Fetch RSS
+# ─────────────────────────────────────────────
+
+def entry_timestamp(entry):
+    """Horodatage (secondes UTC) de publication ou de mise à jour d'une entrée, None sinon."""
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if not parsed:
+        return None
+    try:
+        # feedparser normalise les dates en UTC
+        return calendar.timegm(parsed)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def recent_entries(entries, cutoff):
+    """Entrées publiées depuis `cutoff` (timestamp) ; celles sans date sont conservées.
+
+    Quand les entrées sont triées de la plus récente à la plus ancienne (au
+    moins deux entrées datées dans l'ordre avant la première trop ancienne),
+    le parcours s'arrête là : les archives de centaines d'entrées ne sont
+    pas parcourues à chaque relève. La suite du flux, datée ou non, est
+    alors réputée plus ancienne et comptée comme écartée. Retourne
+    (entrées, nombre écartées).
+    """
+    kept = []
+    too_old = 0
+    previous = None
+    ordered = True
+    dated = 0
+    for position, entry in enumerate(entries):
+        stamp = entry_timestamp(entry)
+        if stamp is None:
+            kept.append(entry)
+            continue
+        if previous is not None and stamp > previous:
+            ordered = False
+        previous = stamp
+        dated += 1
+        if stamp >= cutoff:
+            kept.append(entry)
+            continue
+        too_old += 1
+        if ordered and dated > 2:
+            too_old += len(entries) - position - 1
+            break
+    return kept, too_old
+
+
+def parse_feed_bytes(body, headers, source_name, lang, cutoff=None):
+    """Parse le contenu brut d'un flux en articles standardisés.
+
+    Fonction de niveau module, exécutable dans un ProcessPoolExecutor : seuls
+    les articles (dicts compacts) reviennent au processus parent. Avec
+    `cutoff` (timestamp), les entrées plus anciennes ne sont pas converties.
+    Retourne (articles, erreur, infos) ; l'erreur vaut None si le flux est
+    exploitable. Les infos servent à la planification des relevés :
+    entrées trop anciennes, date de l'entrée la plus récente, écart moyen
+    entre entrées et intervalle annoncé (<ttl>, sy:updatePeriod).
+    """
+    import feedparser
+
+    # Sans le nettoyage HTML de feedparser, qui retire data-src et srcset :
+    # le HTML n'est jamais réutilisé tel quel, seulement converti en texte
+    feed = feedparser.parse(body, response_headers=headers, sanitize_html=False)
+    if feed.bozo and not feed.entries:
+        return [], str(feed.bozo_exception), {}
+    
+    stamps = [stamp for stamp in map(entry_timestamp, feed.entries) if stamp is not None]
+    info = {
+        "too_old": 0,
+        "newest": max(stamps, default=None),
+        "gap": mean_gap(stamps),
+        "hint": feed_hints(feed.feed),
+    }
+    entries = feed.entries
+    if cutoff is not None:
+        entries, info["too_old"] = recent_entries(entries, cutoff)
+    
+    articles = []
+    for entry in entries:
+        article = parse_entry(entry, source_name, lang)
+        if article:
+            articles.append(article)
+    return articles, None, info
+
+
+def process_feed(feed_info, body, headers, new_state, feed_state=None, parse_pool=None, cutoff=None,
+                 capture=None):
+    """Parse le contenu téléchargé d'un flux et enregistre son état.
+
+    Un contenu None (304 ou corps inchangé) ne déclenche aucun parsing. Avec
+    `parse_pool` (ProcessPoolExecutor), le parsing a lieu dans un processus
+    séparé et le thread appelant attend le résultat sans tenir le GIL.
+    `cutoff` (timestamp) écarte les entrées plus anciennes (--max-age).
+    Avec `capture` (CaptureStore), le corps brut est enregistré avant le
+    parsing, qu'il réussisse ou non.
+    """
+    name = feed_info["name"]
+    url = feed_info["url"]
+    lang = feed_info.get("lang", "en")
+
+    if capture is not None:
+        try:
+            capture.record(feed_info, body, headers, "ok" if body is not None else "not_modified",
+                           new_state.get("hash"))
+        except OSError as e:
+            logger.warning(f"⚠ Capture de {name} impossible: {e}")
+
+    if body is None:
+        if feed_state is not None:
+            new_state["poll"] = {"status": "not_modified", "at": datetime.now().timestamp()}
+            feed_state[url] = new_state
+        REGISTRY.inc("veille_feed_fetch_total", feed=name, status="not_modified")
+        logger.info(f"= {name}: inchangé, parsing ignoré")
+        return []
+
+    with REGISTRY.timer("veille_feed_parse_seconds", feed=name), PROFILER.phase("parse"):
+        if parse_pool is not None:
+            articles, error, info = PROFILER.run_in_pool(parse_pool, "parse", parse_feed_bytes,
+                                                         body, headers, name, lang, cutoff)
+        else:
+            articles, error, info = parse_feed_bytes(body, headers, name, lang, cutoff)
+    if error:
+        REGISTRY.inc("veille_feed_fetch_total", feed=name, status="parse_error")
+        logger.warning(f"⚠ Erreur feed {name}: {error}")
+        return []
+    
+    # N'enregistrer l'état qu'une fois le flux parsé avec succès
+    too_old = info.pop("too_old")
+    if feed_state is not None:
+        new_state["poll"] = dict(info, status="ok", at=datetime.now().timestamp())
+        feed_state[url] = new_state
+    
+    REGISTRY.inc("veille_feed_fetch_total", feed=name, status="ok")
+    REGISTRY.inc("veille_feed_articles_total", len(articles), feed=name)
+    if too_old:
+        REGISTRY.inc("veille_feed_too_old_total", too_old, feed=name)
+        logger.info(f"✓ {name}: {len(articles)} articles récupérés ({too_old} trop anciens ignorés)")
+    else:
+        logger.info(f"✓ {name}: {len(articles)} articles récupérés")
+    return articles
+
+
+def mark_skipped(feed_info, feed_state, status):
+    """Note dans l'état du flux un relevé non tenté (`circuit_open`, `deadline`).
+
+    La planification (scheduler.py) garde alors l'intervalle du flux au lieu
+    de le traiter comme une erreur.
+    """
+    REGISTRY.inc("veille_feed_fetch_total", feed=feed_info["name"], status=status)
+    if feed_state is not None:
+        url = feed_info["url"]
+        poll = {"status": status, "at": datetime.now().timestamp()}
+        feed_state[url] = dict(feed_state.get(url, {}), poll=poll)
+
+
+def guard_allows(feed_info, guard, feed_state=None):
+    """Vrai si le flux peut être relevé (disjoncteur fermé, échéance globale non atteinte)."""
+    name, url = feed_info["name"], feed_info["url"]
+    if not guard.breaker.allow(url):
+        until = datetime.fromtimestamp(guard.breaker.open_until(url))
+        mark_skipped(feed_info, feed_state, "circuit_open")
+        logger.info(f"⏸ {name}: ignoré, disjoncteur ouvert jusqu'à {until:%d/%m %H:%M}")
+        return False
+    if guard.run_deadline.expired:
+        mark_skipped(feed_info, feed_state, "deadline")
+        logger.warning(f"⏱ {name}: ignoré, échéance de l'exécution atteinte")
+        return False
+    return True
+
+
+def record_fetch_failure(feed_info, guard, error, feed_state=None):
+    """Compte un échec de téléchargement (métriques, log, disjoncteur).
+
+    Un flux interrompu par l'échéance globale n'est pas compté contre lui.
+    """
+    name = feed_info["name"]
+    if guard.run_deadline.expired:
+        mark_skipped(feed_info, feed_state, "deadline")
+        logger.warning(f"⏱ {name}: interrompu, échéance de l'exécution atteinte")
+        return
+    REGISTRY.inc("veille_feed_fetch_total", feed=name, status="error")
+    logger.error(f"✗ Erreur lors du fetch de {name}: {error}")
+    cooldown = guard.breaker.failure(feed_info["url"], error)
+    if cooldown:
+        logger.warning(f"⏸ {name}: échecs répétés, disjoncteur ouvert pour {cooldown / 3600:.1f} h")
+
+
+def download_with_retries(feed_info, state, guard):
+    """Télécharge un flux en reprenant les erreurs transitoires (délai exponentiel à gigue).
+
+    Les reprises partagent l'échéance du flux.
+    """
+    name = feed_info["name"]
+    deadline = guard.feed_deadline()
+    attempt = 0
+    while True:
+        try:
+            return download_feed(feed_info["url"], state, name, guard, deadline)
+        except Exception as e:
+            attempt += 1
+            delay = guard.retry_delay(attempt, e, deadline)
+            if delay is None:
+                raise
+            REGISTRY.inc("veille_feed_retries_total", feed=name)
+            logger.info(f"↻ {name}: {e}, nouvelle tentative dans {delay:.1f} s")
+            sleep(delay)
+
+
+def fetch_feed(feed_info, feed_state=None, force=False, parse_pool=None, cutoff=None, guard=None,
+               capture=None):
+    """Récupère et parse un flux RSS.
+
+    Si `feed_state` est fourni, le téléchargement est conditionnel et l'état
+    du flux y est mis à jour ; `force` ignore les validateurs enregistrés.
+    `parse_pool` délègue le parsing à un pool de processus ; les entrées
+    antérieures à `cutoff` (timestamp) sont écartées. `guard` applique
+    délais, reprises et disjoncteur (voir resilience.py) ; `capture`
+    enregistre le corps reçu (voir capture_store.py).
+    """
+    guard = guard or FetchGuard()
+    if not guard_allows(feed_info, guard, feed_state):
+        return []
+    state = None
+    if feed_state is not None and not force:
+        state = feed_state.get(feed_info["url"])
+
+    try:
+        with REGISTRY.timer("veille_feed_download_seconds", feed=feed_info["name"]), PROFILER.phase("fetch"):
+            body, headers, new_state = download_with_retries(feed_info, state, guard)
+    except Exception as e:
+        record_fetch_failure(feed_info, guard, e, feed_state)
+        return []
+    guard.breaker.success(feed_info["url"])
+    
+    try:
+        return process_feed(feed_info, body, headers, new_state, feed_state, parse_pool, cutoff, capture)
+    except Exception as e:
+        REGISTRY.inc("veille_feed_fetch_total", feed=feed_info["name"], status="parse_error")
+        logger.error(f"✗ Erreur lors du traitement de {feed_info['name']}: {e}")
+        return []
+
+
+def fetch_feeds_async(feeds, feed_state=None, force=False, sink=None, parse_pool=None, cutoff=None,
+                      guard=None, capture=None):
+    """Récupère les flux avec le moteur asyncio (voir async_fetch.py).
+
+    Les téléchargements partagent un pool de connexions keep-alive ; le
+    parsing des octets reçus est délégué à un pool de threads. Si `sink` est
+    fourni, les articles de chaque flux lui sont passés au lieu d'être cumulés.
+    """
+    from .async_fetch import fetch_all
+
+    def state_for(feed_info):
+        if feed_state is None or force:
+            return None
+        return feed_state.get(feed_info["url"])
+
+    def on_response(feed_info, body, headers):
+        try:
+            body, new_state = check_feed_body(body, headers, state_for(feed_info))
+            articles = process_feed(feed_info, body, headers, new_state, feed_state, parse_pool, cutoff,
+                                    capture)
+        except Exception as e:
+            REGISTRY.inc("veille_feed_fetch_total", feed=feed_info["name"], status="parse_error")
+            logger.error(f"✗ Erreur lors du traitement de {feed_info['name']}: {e}")
+            return []
+        if sink is None:
+            return articles
+        sink(articles)
+        return []
+
+    guard = guard or FetchGuard()
+    with PROFILER.phase("fetch"):
+        return fetch_all(
+            [feed for feed in feeds if guard_allows(feed, guard, feed_state)],
+            lambda feed_info: conditional_headers(state_for(feed_info)),
+            on_response,
+            max_connections=ASYNC_MAX_CONNECTIONS,
+            max_per_host=ASYNC_MAX_PER_HOST,
+            parse_workers=MAX_WORKERS,
+            guard=guard,
+            on_error=lambda feed_info, error: record_fetch_failure(feed_info, guard, error, feed_state),
+        )
+
+
+def stream_feeds(feeds, feed_state=None, force=False, engine='threads', queue_size=None,
+                 parse_pool=None, cutoff=None, guard=None, capture=None):
+    """Génère les articles flux par flux, dès que chaque flux est parsé.
+
+    Les workers de fetch déposent leurs résultats dans une file bornée : quand
+    elle est pleine, ils attendent que le consommateur avance (backpressure).
+    """
+    results = queue.Queue(maxsize=queue_size or STREAM_QUEUE_SIZE)
+    done = object()
+    errors = []
+
+    def fetch_into_queue(feed_info):
+        results.put(fetch_feed(feed_info, feed_state, force, parse_pool, cutoff, guard, capture))
+
+    def produce():
+        try:
+            if engine == 'async':
+                fetch_feeds_async(feeds, feed_state, force, sink=results.put,
+                                  parse_pool=parse_pool, cutoff=cutoff, guard=guard, capture=capture)
+            else:
+                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                    for feed in feeds:
+                        executor.submit(fetch_into_queue, feed)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            results.put(done)
+
+    threading.Thread(target=produce, name="veille-fetch", daemon=True).start()
+    while True:
+        articles = results.get()
+        if articles is done:
+            break
+        yield articles
+    if errors:
+        raise errors[0]
+
+# ─────────────────────────────────────────────
+# Captures (rejeu hors ligne)
+# ─────────────────────────────────────────────
+
+def open_capture_store(max_runs=None):
+    return CaptureStore(CAPTURE_DIR, max_runs=max_runs)
+
+
+def replay_feeds(store, ref, parse_pool=None, cutoff=None):
+    """Génère les articles des corps capturés d'une exécution, flux par flux, sans réseau.
+
+    Chaque corps passe par process_feed comme un flux téléchargé, y compris
+    ceux qui n'avaient pas changé lors de la capture ; l'état HTTP des flux
+    n'est pas modifié.
+    """
+    for feed, body in store.iter_bodies(ref):
+        try:
+            yield process_feed(feed, body, feed["headers"], {}, parse_pool=parse_pool, cutoff=cutoff)
+        except Exception as e:
+            REGISTRY.inc("veille_feed_fetch_total", feed=feed["name"], status="parse_error")
+            logger.error(f"✗ Erreur lors du traitement de {feed['name']}: {e}")
+
+
+def print_captures():
+    """Liste les exécutions capturées (--list-captures)."""
+    store = open_capture_store()
+    ids = store.run_ids()
+    if not ids:
+        print("Aucune capture enregistrée")
+        return
+    for run_id in ids:
+        feeds = store.manifest(run_id)["feeds"]
+        captured = sum(1 for feed in feeds if feed["body"])
+        changed = sum(1 for feed in feeds if feed["status"] == "ok")
+        print(f"  {run_id}  {len(feeds)} flux, {captured} corps disponibles, {changed} téléchargés")
+
+
+def parse_entry(entry, source_name, lang):
+    """Parse une entrée RSS en article standardisé."""
+    # Extraire le titre
+    title = entry.get("title", "").strip()
+    if not title:
+        return None
+    
+    # Extraire le lien
+    link = entry.get("link", "")
+    if not link:
+        return None
+    
+    # Extraire la date
+    date_str = ""
+    published = entry.get("published_parsed") or entry.get("updated_parsed")
+    if published:
+        try:
+            dt = datetime.fromtimestamp(mktime(published))
+            date_str = format_date_fr(dt)
+        except:
+            date_str = entry.get("published", entry.get("updated", ""))
+    
+    # Description et image du HTML en un seul parcours (arrêt à la longueur max)
+    html = entry.get("summary", "") or entry.get("description", "")
+    description, html_image = extract_html(html, DESCRIPTION_MAX_LEN, base_url=link)
+    
+    # Extraire l'image (médias de l'entrée d'abord)
+    image_path = extract_image(entry, html_image)
+    
+    # Tags depuis les catégories RSS
+    tags = []
+    if entry.get("tags"):
+        tags = [t.get("term", "") for t in entry.tags if t.get("term")]
+        tags = tags[:5]  # Limiter à 5 tags
+    
+    return {
+        "title": title,
+        "link": link,
+        "date": date_str,
+        "description": description,
+        "image": image_path,
+        "source": source_name,
+        "lang": lang,
+        "tags": tags,
+        "author": entry_author(entry),
+        "canonical": canonical_link(entry),
+        "fetched_at": datetime.now().isoformat()
+    }
+
+
+MOIS_FR = [
+    "", "Janvier", "Février", "Mars", "Avril", "Mai", "Juin",
+    "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"
+]
+
+
+def format_date_fr(dt):
+    """Formate une date en français."""
+    return f"{dt.day} {MOIS_FR[dt.month]} {dt.year}"
+
+
+def parse_date_fr(date_str):
+    """Relit une date au format de format_date_fr ("1er Mars 2025" accepté).
+
+    Retourne un tuple (année, mois, jour) comparable, ou None.
+    """
+    match = re.match(r'\s*(\d{1,2})(?:er)?\s+(\S+)\s+(\d{4})', date_str or "")
+    if not match:
+        return None
+    months = [m.lower() for m in MOIS_FR]
+    month = match.group(2).lower()
+    if month not in months:
+        return None
+    return int(match.group(3)), months.index(month), int(match.group(1))
+
+
+def clean_html(text):
+    """Nettoie le HTML d'un texte (balises, entités, espaces ; voir html_text.py)."""
+    return html_to_text(text)
+
+
+def extract_image(entry, html_image=None):
+    """Tente d'extraire une URL d'image depuis l'entrée RSS.
+
+    `html_image` est l'image déjà relevée dans le résumé par extract_html :
+    le HTML n'est alors pas reparcouru.
+    """
+    # Chercher dans media:content
+    if entry.get("media_content"):
+        for media in entry.media_content:
+            if media.get("medium") == "image" or "image" in media.get("type", ""):
+                return media.get("url", "")
+    
+    # Chercher dans media:thumbnail
+    if entry.get("media_thumbnail"):
+        for thumb in entry.media_thumbnail:
+            if thumb.get("url"):
+                return thumb["url"]
+    
+    # Chercher dans enclosures
+    if entry.get("enclosures"):
+        for enc in entry.enclosures:
+            if "image" in enc.get("type", ""):
+                return enc.get("href", enc.get("url", ""))
+    
+    # Chercher dans le contenu HTML (résumé, puis contenu complet)
+    if html_image is None:
+        content = entry.get("summary", "") or entry.get("description", "")
+        html_image = first_image(content, entry.get("link"))
+    if html_image:
+        return html_image
+    for content in entry.get("content", []):
+        image = first_image(content.get("value", ""), entry.get("link"))
+        if image:
+            return image
+    
+    return ""
+
+
+def entry_author(entry):
+    """Auteur de l'entrée (author, dc:creator, premier auteur Atom)."""
+    if entry.get("author"):
+        return entry.author.strip()
+    for author in entry.get("authors", []):
+        if author.get("name"):
+            return author["name"].strip()
+    return ""
+
+
+def canonical_link(entry):
+    """Lien canonique de l'entrée (rel="canonical", lien d'origine FeedBurner), "" sinon."""
+    for link in entry.get("links", []):
+        if link.get("rel") == "canonical" and link.get("href"):
+            return link["href"]
+    return entry.get("feedburner_origlink", "")
+
+# ─────────────────────────────────────────────
+# Filtrage par topic / mots-clés
+# ─────────────────────────────────────────────
+
+def searchable_text(article):
+    """Construit le texte de recherche d'un article (en minuscules)."""
+    return " ".join([
+        article.get("title", ""),
+        article.get("description", ""),
+        " ".join(article.get("tags", []))
+    ]).lower()
+
+
+def build_topic_matcher(topics_config):
+    """Compile une seule fois les mots-clés de tous les topics.
+
+    Les mots-clés de 4 caractères ou moins (MFA, SIEM, etc.) ne
+    correspondent qu'à des mots entiers.
+    """
+    return KeywordMatcher(
+        {topic: config["keywords"] for topic, config in topics_config.items()},
+        whole_word_max_len=4
+    )
+
+
+def categorize_articles(articles, topics_config, matcher=None):
+    """Classe les articles par topic, en un seul passage par article."""
+    if matcher is None:
+        matcher = build_topic_matcher(topics_config)
+    categorized = {topic: [] for topic in topics_config}
+    
+    for article in articles:
+        for topic in matcher.match(searchable_text(article)):
+            categorized[topic].append(article)
+    
+    return categorized
+
+
+# Règles utilisées si la config des sources ne définit pas `tag_rules`
+DEFAULT_TAG_RULES = {
+    "Vulnérabilité": ["vulnerability", "vulnérabilité", "cve-", "exploit", "flaw", "faille"],
+    "Sécurité": ["security", "sécurité", "secure", "sécurisé", "protection"],
+    "Entreprise": ["enterprise", "entreprise", "corporate", "business", "organization"],
+    "Infrastructure": ["infrastructure", "server", "serveur", "network", "réseau"],
+    "Innovation": ["innovation", "new", "launch", "nouveau", "announces", "annonce"],
+    "Failles": ["breach", "hack", "attack", "attaque", "compromis", "pirat"],
+    "Solutions": ["solution", "tool", "outil", "product", "produit", "platform"],
+    "Documentation": ["guide", "tutorial", "documentation", "how-to", "best practice"],
+    "Gouvernement": ["government", "gouvernement", "regulation", "réglementation", "cnil", "anssi", "nist"],
+    "Cloud": ["cloud", "aws", "azure", "gcp", "saas", "iaas"],
+    "2AF": ["2fa", "a2f", "two-factor", "deux facteurs"],
+    "Biométrie": ["biometric", "biométrie", "fingerprint", "facial", "empreinte"],
+    "Statistiques": ["report", "rapport", "survey", "étude", "market", "marché", "statistics"]
+}
+
+_default_tagger = None
+
+
+def load_tag_cache():
+    """Charge le cache des tags automatiques."""
+    if TAG_CACHE_FILE.exists():
+        with open(TAG_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return empty_tag_cache()
+
+
+def save_tag_cache(tagger):
+    """Sauvegarde le cache des tags automatiques."""
+    with open(TAG_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(tagger.export_cache(), f, ensure_ascii=False, separators=(',', ':'))
+
+
+def build_tagger(config, cache=None):
+    """Compile les règles de tags de la config (une fois par exécution)."""
+    return TagEngine(config.get("tag_rules", DEFAULT_TAG_RULES), cache)
+
+
+def auto_tag_article(article, topic_name, tagger=None):
+    """Génère des tags automatiques basés sur le contenu."""
+    global _default_tagger
+    if tagger is None:
+        if _default_tagger is None:
+            _default_tagger = TagEngine(DEFAULT_TAG_RULES)
+        tagger = _default_tagger
+    
+    tags = list(article.get("tags", []))
+    
+    # Tags basés sur le topic
+    title_lower = article["title"].lower()
+    desc_lower = article.get("description", "").lower()
+    combined = title_lower + " " + desc_lower
+    
+    for tag in tagger.match(combined):
+        if tag not in tags:
+            tags.append(tag)
+    
+    # Assurer au moins un tag
+    if not tags:
+        tags = [topic_name]
+    
+    # Dédupliquer et limiter
+    seen = set()
+    unique_tags = []
+    for t in tags:
+        if t.lower() not in seen:
+            seen.add(t.lower())
+            unique_tags.append(t)
+    
+    return unique_tags[:6]
+
+# ─────────────────────────────────────────────
+# Conversion au format veille.json
+# ─────────────────────────────────────────────
+
+def article_to_veille_format(article, topic_name, tagger=None):
+    """Convertit un article au format du veille.json."""
+    tags = auto_tag_article(article, topic_name, tagger)
+    # Construire l'objet en n'incluant que les clés avec des valeurs non vides
+    veille_obj = {}
+    if article.get("date"):
+        veille_obj["date"] = article.get("date")
+    if article.get("title"):
+        veille_obj["title"] = article.get("title")
+    # Ne pas ajouter de valeur par défaut pour l'image : n'ajouter que si présente
+    if article.get("image"):
+        veille_obj["image"] = article.get("image")
+    if article.get("link"):
+        veille_obj["link"] = article.get("link")
+    if tags:
+        veille_obj["tags"] = tags
+    if article.get("description"):
+        veille_obj["description"] = article.get("description")
+    if article.get("source"):
+        veille_obj["source"] = article.get("source")
+
+    return veille_obj
+
+# ─────────────────────────────────────────────
+# Mise à jour du veille.json
+# ─────────────────────────────────────────────
+
+def load_veille_json():
+    """Charge le fichier veille.json existant."""
+    with open(VEILLE_JSON, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json_atomic(path, data, indent=4):
+    """Écrit un JSON de façon atomique (fichier temporaire puis rename)."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def backup_file(path, backup_path):
+    """Sauvegarde un fichier par lien physique, sans recopier son contenu.
+
+    Le fichier principal étant ensuite remplacé par rename, l'ancien contenu
+    reste accessible via le lien. Repli sur une copie si le système de
+    fichiers ne gère pas les liens physiques.
+    """
+    if backup_path.exists():
+        backup_path.unlink()
+    try:
+        os.link(path, backup_path)
+    except OSError:
+        shutil.copy2(path, backup_path)
+
+
+def save_versioned_json(data):
+    """Enregistre une version du fichier veille dans le store de versions.
+
+    Seuls les articles jamais vus sont écrits (blobs) ; la version elle-même
+    est un manifeste compressé de hashes.
+    """
+    version_id, manifest_path = VersionStore(VERSION_DIR).save(data)
+    logger.info(f"💾 Version créée: {version_id}")
+    return manifest_path
+
+
+def save_delta_json(new_articles):
+    """Sauvegarde uniquement les nouveaux articles (delta) par topic.
+
+    `new_articles` associe à chaque topic {"veille_index", "articles"}.
+    """
+    DELTA_DIR.mkdir(parents=True, exist_ok=True)
+    version_path = DELTA_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-delta.json"
+    delta = {"created_at": datetime.now().isoformat(), "topics": new_articles}
+    write_json_atomic(version_path, delta, indent=None)
+    logger.info(f"💾 Delta créé: {version_path}")
+    return version_path
+
+
+def apply_delta(veille_data, delta):
+    """Ajoute les articles d'un delta absents du document ; retourne leur nombre."""
+    existing_urls = get_existing_urls(veille_data)
+    added = 0
+    for topic_name, entry in delta.get("topics", {}).items():
+        veille_index = entry["veille_index"]
+        if veille_index >= len(veille_data["veilles"]):
+            logger.warning(f"⚠ Index {veille_index} hors limites pour {topic_name}, ignoré")
+            continue
+        for article in entry["articles"]:
+            url = canonical_url(article.get("link", ""))
+            if url in existing_urls:
+                continue
+            veille_data["veilles"][veille_index]["articles"].append(article)
+            existing_urls.add(url)
+            added += 1
+    return added
+
+
+def apply_delta_file(delta_path):
+    """Applique un fichier delta à veille.json ; retourne le nombre d'articles ajoutés."""
+    with open(delta_path, 'r', encoding='utf-8') as f:
+        delta = json.load(f)
+    veille_data = load_veille_json()
+    added = apply_delta(veille_data, delta)
+    if added:
+        save_veille_json(veille_data)
+    return added
+
+
+def save_veille_json(data):
+    """Sauvegarde le fichier veille.json principal (écrase, de façon atomique)."""
+    # Créer une sauvegarde d'abord
+    backup_path = VEILLE_JSON.with_suffix('.json.bak')
+    if VEILLE_JSON.exists():
+        backup_file(VEILLE_JSON, backup_path)
+        logger.info(f"📦 Backup créé: {backup_path}")
+    
+    write_json_atomic(VEILLE_JSON, data)
+    logger.info(f"💾 veille.json mis à jour")
+
+
+def get_existing_urls(veille_data):
+    """Récupère toutes les URLs (canoniques) déjà présentes dans le veille.json."""
+    urls = set()
+    for veille in veille_data.get("veilles", []):
+        for article in veille.get("articles", []):
+            link = article.get("link", "")
+            if link:
+                urls.add(canonical_url(link))
+    return urls
+
+
+class VeilleUpdater:
+    """Mise à jour incrémentale du veille.json.
+
+    Les articles sont dédupliqués, tagués et ajoutés topic par topic au fur
+    et à mesure de leur arrivée (`add`) ; l'écriture a lieu dans `finish`.
+    """
+
+    def __init__(self, topics_config, dry_run=False, apply=False, max_articles=None, tagger=None,
+                 incremental=False, resident=False):
+        self.topics_config = topics_config
+        self.dry_run = dry_run
+        self.apply = apply
+        self.incremental = incremental
+        self.max_articles = max_articles
+        self.tagger = tagger
+        # Processus résident (--watch) : préfiltre écrit à la fermeture seulement
+        self.resident = resident
+        self.veille_data = load_veille_json()
+        self.existing_urls = get_existing_urls(self.veille_data)
+        self.history = load_history(dry_run)
+        self.seen = load_seen_filter(self.history, self.veille_data)
+        self.near_duplicates = load_near_duplicates(self.veille_data, dry_run)
+        self.summary = {}
+        self.total_new = 0
+        self.skipped_near_duplicates = 0
+        self.new_articles = {}
+        self.set_topics(topics_config)
+
+    def set_topics(self, topics_config):
+        """Fixe les topics suivis (au démarrage, puis à chaque rechargement des sources)."""
+        self.topics_config = topics_config
+        self.summary = {}
+        for topic_name, config in topics_config.items():
+            if config["veille_index"] >= len(self.veille_data["veilles"]):
+                logger.warning(f"⚠ Index {config['veille_index']} hors limites pour {topic_name}, ignoré")
+            else:
+                self.summary[topic_name] = 0
+
+    def begin(self):
+        """Remet à zéro les compteurs pour un nouveau cycle (mode --watch).
+
+        Document, historique, préfiltre et index restent chargés ; les ajouts
+        d'un cycle en --dry-run restent visibles des cycles suivants.
+        """
+        self.summary = dict.fromkeys(self.summary, 0)
+        self.total_new = 0
+        self.skipped_near_duplicates = 0
+        self.new_articles = {}
+
+    def add(self, topic_name, articles):
+        """Ajoute les articles nouveaux d'un topic ; retourne leur nombre."""
+        if topic_name not in self.summary:
+            return 0
+        veille_index = self.topics_config[topic_name]["veille_index"]
+        
+        new_articles = []
+        for article in articles:
+            # Limiter si demandé (les articles en trop restent non traités)
+            if self.max_articles and self.summary[topic_name] + len(new_articles) >= self.max_articles:
+                break
+            
+            link = article.get("link", "")
+            link_id = article_id(article)
+            url = canonical_url(link)
+            
+            # Ignorer les doublons : URL déjà dans le veille.json (indépendant de
+            # la rétention de l'historique), puis historique
+            if url in self.existing_urls or self.already_processed(link_id, link):
+                continue
+            
+            # Ignorer les reprises d'un même article sous une autre URL
+            signature = article_signature(article)
+            if signature:
+                match = self.near_duplicates.find(signature)
+                if match:
+                    logger.debug(f"🪞 Quasi-doublon ({match[2]:.2f}) : {link} ~ {match[1]}")
+                    REGISTRY.inc("veille_near_duplicates_total", topic=topic_name)
+                    self.skipped_near_duplicates += 1
+                    self.history.add(link_id)
+                    self.seen.add(link_id)
+                    continue
+                self.near_duplicates.add(link_id, signature, link)
+            
+            # Convertir au format veille
+            with REGISTRY.timer("veille_stage_seconds", stage="tag"):
+                veille_article = article_to_veille_format(article, topic_name, self.tagger)
+            new_articles.append(veille_article)
+            
+            # Marquer comme traité
+            self.history.add(link_id)
+            self.seen.add(link_id)
+            self.existing_urls.add(url)
+        
+        self.summary[topic_name] += len(new_articles)
+        self.total_new += len(new_articles)
+        
+        if not self.dry_run and new_articles:
+            # Ajouter les nouveaux articles à la veille
+            self.veille_data["veilles"][veille_index]["articles"].extend(new_articles)
+            self.new_articles.setdefault(
+                topic_name, {"veille_index": veille_index, "articles": []}
+            )["articles"].extend(new_articles)
+        return len(new_articles)
+
+    def already_processed(self, link_id, link):
+        """Identifiant dans l'historique ; l'historique n'est interrogé que si
+        le préfiltre ne peut pas garantir que l'URL est nouvelle.
+
+        Les historiques antérieurs aux URL canoniques contiennent le hash du
+        lien brut, qui ne peut pas être recalculé : il est testé aussi.
+        """
+        if link_id in self.seen and link_id in self.history:
+            return True
+        legacy_id = url_hash(link)
+        return legacy_id != link_id and legacy_id in self.seen and legacy_id in self.history
+
+    def finish(self):
+        """Écrit les résultats et retourne (summary, total_new, version_path)."""
+        version_path = None
+        if not self.dry_run and self.total_new > 0:
+            # Toujours créer une version datée (complète, ou delta en mode incrémental)
+            if self.incremental:
+                with REGISTRY.timer("veille_stage_seconds", stage="write_delta"):
+                    version_path = save_delta_json(self.new_articles)
+            else:
+                with REGISTRY.timer("veille_stage_seconds", stage="write_version"):
+                    version_path = save_versioned_json(self.veille_data)
+            
+            # Si --apply, écraser aussi le fichier principal et les fragments du site
+            if self.apply:
+                with REGISTRY.timer("veille_stage_seconds", stage="write_veille_json"):
+                    save_veille_json(self.veille_data)
+                with REGISTRY.timer("veille_stage_seconds", stage="write_shards"):
+                    export_shards(self.veille_data)
+            
+            with REGISTRY.timer("veille_stage_seconds", stage="write_history"):
+                save_history(self.history, self.seen, defer_seen=self.resident)
+                save_near_duplicates(self.near_duplicates)
+        
+        if self.skipped_near_duplicates:
+            logger.info(f"🪞 {self.skipped_near_duplicates} quasi-doublons ignorés")
+        for topic_name, count in self.summary.items():
+            REGISTRY.set("veille_new_articles", count, topic=topic_name)
+        return self.summary, self.total_new, version_path
+
+    def close(self):
+        """Libère l'historique ; sans save_history, les ajouts sont annulés.
+
+        En mode résident, le préfiltre différé est écrit ici s'il a changé.
+        """
+        if self.resident and not self.dry_run and self.seen.dirty:
+            save_seen_filter(self.history, self.seen)
+            self.history.commit()
+        self.history.close()
+        self.near_duplicates.close()
+
+
+def update_veille_json(categorized_articles, topics_config, dry_run=False, apply=False, max_articles=None,
+                       tagger=None, incremental=False):
+    """Met à jour le veille.json avec les nouveaux articles.
+    
+    Par défaut: crée un fichier daté dans versions/
+    --apply: écrase veille.json
+    --dry-run: affiche seulement, n'écrit rien
+    incremental: la version datée ne contient que les nouveaux articles
+    """
+    updater = VeilleUpdater(topics_config, dry_run=dry_run, apply=apply,
+                            max_articles=max_articles, tagger=tagger,
+                            incremental=incremental)
+    try:
+        for topic_name, articles in categorized_articles.items():
+            updater.add(topic_name, articles)
+        return updater.finish()
+    finally:
+        updater.close()
+
+# ─────────────────────────────────────────────
+# Export en fragments pour le site
+# ─────────────────────────────────────────────
+
+def build_topic_index(articles):
+    """Index précalculé d'un topic, pour que le client fasse des lectures et non des parcours.
+
+    Les positions renvoient à l'ordre des articles dans les pages du topic ;
+    les postings suivent l'ordre chronologique de `by_date`.
+    """
+    # Plus récents d'abord ; les articles sans date lisible en dernier
+    by_date = sorted(
+        range(len(articles)),
+        key=lambda p: parse_date_fr(articles[p].get("date")) or (0, 0, 0),
+        reverse=True
+    )
+    postings = {}
+    sources = {}
+    for position in by_date:
+        article = articles[position]
+        for tag in article.get("tags", []):
+            postings.setdefault(tag, []).append(position)
+        source = article.get("source", "")
+        sources[source] = sources.get(source, 0) + 1
+    
+    return {
+        "tags": sorted(postings),
+        "postings": postings,
+        "facets": {
+            "tags": {tag: len(positions) for tag, positions in postings.items()},
+            "sources": sources,
+        },
+        "by_date": by_date,
+    }
+
+
+def export_shards(veille_data, shard_dir=None, page_size=None):
+    """Exporte veille.json en fragments pour la page Next.js.
+
+    manifest.json liste les topics ; chaque topic a un en-tête
+    (topics/<i>/topic.json), un index précalculé (topics/<i>/index.json :
+    tags, postings, facettes, ordre chronologique) et des pages d'articles
+    de taille fixe (topics/<i>/page-<n>.json) chargées à la demande.
+    """
+    shard_dir = shard_dir or SHARD_DIR
+    page_size = page_size or SHARD_PAGE_SIZE
+    manifest = {
+        "generated_at": datetime.now().isoformat(),
+        "page_size": page_size,
+        "topics": [],
+    }
+    
+    for index, veille in enumerate(veille_data.get("veilles", [])):
+        # Mêmes articles que ceux affichés par la page (titre ou description)
+        articles = [
+            a for a in veille.get("articles", [])
+            if a.get("title") or a.get("description")
+        ]
+        pages = max(1, -(-len(articles) // page_size))
+        topic_dir = shard_dir / "topics" / str(index)
+        topic_dir.mkdir(parents=True, exist_ok=True)
+        
+        header = {k: v for k, v in veille.items() if k != "articles"}
+        header.update({"index": index, "articles": len(articles), "pages": pages})
+        write_json_atomic(topic_dir / "topic.json", header, indent=None)
+        write_json_atomic(topic_dir / "index.json", build_topic_index(articles), indent=None)
+        
+        for page in range(1, pages + 1):
+            chunk = articles[(page - 1) * page_size:page * page_size]
+            write_json_atomic(topic_dir / f"page-{page}.json",
+                              {"page": page, "articles": chunk}, indent=None)
+        
+        # Supprimer les pages devenues inutiles
+        for stale in topic_dir.glob("page-*.json"):
+            if int(stale.stem.split("-")[1]) > pages:
+                stale.unlink()
+        
+        manifest["topics"].append({
+            "index": index,
+            "title": veille.get("title", ""),
+            "sub-title": veille.get("sub-title", ""),
+            "articles": len(articles),
+            "pages": pages,
+        })
+    
+    write_json_atomic(shard_dir / "manifest.json", manifest, indent=None)
+    logger.info(f"🧩 Fragments exportés: {shard_dir}")
+    return manifest
+
+# ─────────────────────────────────────────────
+# Commandes sur les versions
+# ─────────────────────────────────────────────
+
+def print_versions():
+    """Liste les versions enregistrées."""
+    versions = VersionStore(VERSION_DIR).list()
+    if not versions:
+        print("Aucune version enregistrée")
+        return
+    for manifest in versions:
+        counts = " / ".join(str(len(t["articles"])) for t in manifest["topics"])
+        print(f"  {manifest['id']}  {manifest['created_at'][:19]}  articles: {counts}")
+
+
+def print_version_diff(ref_a, ref_b):
+    """Affiche les articles ajoutés / retirés entre deux versions."""
+    changes = VersionStore(VERSION_DIR).diff(ref_a, ref_b)
+    if not changes:
+        print("Aucune différence")
+    for change in changes:
+        print(f"\n{'─' * 40}")
+        print(f"  📌 Topic #{change['index']} : +{len(change['added'])} / -{len(change['removed'])}")
+        print(f"{'─' * 40}")
+        for article in change["added"]:
+            print(f"  + {article.get('title', 'Sans titre')}")
+        for article in change["removed"]:
+            print(f"  - {article.get('title', 'Sans titre')}")
+
+
+def restore_version(ref):
+    """Restaure veille.json depuis une version (avec backup de l'actuel)."""
+    store = VersionStore(VERSION_DIR)
+    save_veille_json(store.load(ref))
+    logger.info(f"⏪ veille.json restauré depuis {store.resolve(ref)}")
+
+# ─────────────────────────────────────────────
+# Export CSV
+# ─────────────────────────────────────────────
+
+def export_to_csv(categorized_articles, export_dir=None):
+    """Exporte les articles trouvés en CSV (un fichier par topic) ; retourne les chemins écrits."""
+    import csv
+
+    export_dir = export_dir or EXPORT_DIR
+    export_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    paths = []
+    
+    for topic, articles in categorized_articles.items():
+        if not articles:
+            continue
+        
+        csv_path = export_dir / f"veille_{topic}_{timestamp}.csv"
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=[
+                "date", "title", "link", "description", "source", "author", "tags"
+            ])
+            writer.writeheader()
+            for article in articles:
+                writer.writerow({
+                    "date": article.get("date", ""),
+                    "title": article.get("title", ""),
+                    "link": article.get("link", ""),
+                    "description": article.get("description", ""),
+                    "source": article.get("source", ""),
+                    "author": article.get("author", ""),
+                    "tags": ", ".join(article.get("tags", []))
+                })
+        
+        logger.info(f"📄 Export CSV: {csv_path}")
+        paths.append(csv_path)
+    return paths
+
+# ─────────────────────────────────────────────
+# Rapport
+# ─────────────────────────────────────────────
+
+def print_report(categorized_articles, summary, total_new, dry_run=False, apply=False, version_path=None,
+                 profile_top=None):
+    """Affiche un rapport de la veille (et les fonctions les plus coûteuses en --profile)."""
+    print("\n" + "=" * 60)
+    print("  RAPPORT DE VEILLE AUTOMATIQUE")
+    print(f"  {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+    if dry_run:
+        print("  [MODE APERCU - Aucune modification]")
+    elif apply:
+        print("  [MODE APPLY - veille.json ecrase]")
+    else:
+        print("  [MODE VERSION - fichier date cree]")
+    print("=" * 60)
+    
+    for topic, articles in categorized_articles.items():
+        new_count = summary.get(topic, 0)
+        print(f"\n{'─' * 40}")
+        print(f"  📌 {topic} : {len(articles)} trouvés, {new_count} nouveaux")
+        print(f"{'─' * 40}")
+        
+        for i, article in enumerate(articles[:10], 1):  # Afficher max 10
+            status = "🆕" if i <= new_count else "📰"
+            print(f"  {status} [{article.get('source', '?')}]")
+            print(f"     {article.get('title', 'Sans titre')}")
+            print(f"     📅 {article.get('date', 'Date inconnue')}")
+            if article.get("link"):
+                print(f"     🔗 {article['link'][:80]}...")
+            print()
+        
+        if len(articles) > 10:
+            print(f"  ... et {len(articles) - 10} autres articles")
+    
+    print(f"\n{'=' * 60}")
+    print(f"  TOTAL : {total_new} nouveaux articles")
+    if version_path:
+        print(f"  FICHIER : {version_path.name}")
+        print(f"  CHEMIN  : {version_path}")
+    if not dry_run and not apply and total_new > 0:
+        print(f"")
+        print(f"  Pour ecraser veille.json, relancer avec --apply")
+    print(f"{'=' * 60}\n")
+    
+    if profile_top:
+        print(f"  ⏱ PROFIL : {len(profile_top)} fonctions les plus coûteuses (temps propre)")
+        print(f"  {'phase':<11}{'appels':>9}{'propre (s)':>12}{'cumulé (s)':>12}  fonction")
+        for phase, func, calls, tottime, cumtime in profile_top:
+            print(f"  {phase:<11}{calls:>9}{tottime:>12.3f}{cumtime:>12.3f}  {func}")
+        print(f"{'=' * 60}\n")
+
+# ─────────────────────────────────────────────
+# Exécution (unique ou en démon)
+# ─────────────────────────────────────────────
+
+def run_cycle(feeds, topics_config, tagger, feed_state, args, cutoff=None, parse_pool=None,
+              updater=None, topic_matcher=None, guard=None, capture=None, batches=None):
+    """Relève des flux, catégorise et met à jour le veille.json au fil de l'eau.
+
+    `updater` et `topic_matcher` permettent de réutiliser un état déjà
+    chargé (mode --watch) ; sinon ils sont créés pour ce cycle seulement.
+    L'échéance globale de `guard` est réarmée au début du cycle. Avec
+    `capture`, les corps reçus forment une exécution enregistrée à la fin
+    du relevé. `batches` (lots d'articles, voir replay_feeds) remplace le
+    relevé des flux.
+    Retourne (articles catégorisés, résumé, nombre de nouveaux, version créée).
+    """
+    if guard is not None:
+        guard.start_run()
+    if capture is not None:
+        capture.begin()
+    if batches is None:
+        batches = stream_feeds(feeds, feed_state, args.force_fetch, args.engine,
+                               parse_pool=parse_pool, cutoff=cutoff, guard=guard, capture=capture)
+    resident = updater is not None
+    if topic_matcher is None:
+        topic_matcher = build_topic_matcher(topics_config)
+    categorized = {topic: [] for topic in topics_config}
+    total_fetched = 0
+    if resident:
+        updater.begin()
+    else:
+        updater = VeilleUpdater(
+            topics_config,
+            dry_run=args.dry_run,
+            apply=args.apply,
+            max_articles=args.max_articles,
+            tagger=tagger,
+            incremental=args.incremental
+        )
+    try:
+        # Seule l'attente du lot suivant compte pour l'étape fetch : la
+        # catégorisation et la mise à jour sont mesurées à part
+        batches = iter(batches)
+        while True:
+            with REGISTRY.timer("veille_stage_seconds", stage="fetch"):
+                articles = next(batches, None)
+            if articles is None:
+                break
+            total_fetched += len(articles)
+            with REGISTRY.timer("veille_stage_seconds", stage="categorize"), \
+                    PROFILER.phase("categorize"):
+                batch = categorize_articles(articles, topics_config, topic_matcher)
+            for topic, matched in batch.items():
+                categorized[topic].extend(matched)
+                with PROFILER.phase("update"):
+                    updater.add(topic, matched)
+        
+        logger.info(f"📊 {total_fetched} articles récupérés au total")
+        if capture is not None:
+            run_id = capture.save()
+            if run_id:
+                logger.info(f"📼 Corps des flux capturés: {run_id} (--replay {run_id})")
+        with PROFILER.phase("export"):
+            summary, total_new, version_path = updater.finish()
+    finally:
+        if not resident:
+            updater.close()
+    return categorized, summary, total_new, version_path
+
+
+def write_run_metrics(textfile=None, dry_run=False):
+    """Métriques de l'exécution (résumé JSON, textfile Prometheus).
+
+    En --dry-run, seul le textfile demandé explicitement est écrit.
+    """
+    REGISTRY.set("veille_run_duration_seconds", round(datetime.now().timestamp() - REGISTRY.started, 3))
+    REGISTRY.set("veille_run_timestamp_seconds", int(datetime.now().timestamp()))
+    if not dry_run:
+        REGISTRY.write_summary(RUN_SUMMARY_FILE)
+    if textfile:
+        REGISTRY.write_textfile(textfile)
+
+
+def write_profile(profile):
+    """Écrit les profils par phase (pstats, piles repliées pour flamegraph).
+
+    `profile` est la valeur de --profile (True : profiles/<date>/). Retourne
+    les fonctions les plus coûteuses.
+    """
+    profile_dir = PROFILE_DIR / f"{datetime.now():%Y%m%d-%H%M%S}" if profile is True else profile
+    profile_top = top_functions(PROFILER.write(profile_dir), PROFILE_TOP)
+    logger.info(f"⏱ Profils écrits dans {profile_dir}")
+    if PROFILER.skipped:
+        logger.warning(f"⚠ {PROFILER.skipped} segments non profilés (un seul profileur actif à la fois)")
+    return profile_top
+
+
+def sources_mtime(path):
+    """Date de modification du fichier des sources (None s'il est momentanément absent)."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def run_daemon(config, tagger, args, parse_pool=None, guard=None, capture=None):
+    """Modes --daemon et --watch : chaque flux est relevé à sa propre échéance (voir scheduler.py).
+
+    Un cycle ne relève que les flux dus ; l'état HTTP reste en mémoire et la
+    planification est réajustée d'après le résultat de chaque relevé. Le
+    fichier des sources est relu dès qu'il change, sans redémarrage.
+
+    Avec --watch, le processus est résident : veille.json, historique,
+    préfiltre, index des quasi-doublons et matcher des topics sont chargés
+    une seule fois, et chaque cycle n'écrit que ses nouveaux articles (delta).
+    """
+    sources_path = args.sources or SOURCES_FILE
+    mtime = sources_mtime(sources_path)
+    topics_config = select_topics(config, args.topic)
+    feeds = sources_feeds(config)
+    scheduler = FeedScheduler(SCHEDULE_FILE, min_interval=args.min_interval * 60,
+                              max_interval=args.max_interval * 60)
+    scheduler.sync(feeds)
+    feed_state = load_feed_state()
+    
+    updater = topic_matcher = None
+    max_sleep = DAEMON_MAX_SLEEP
+    if args.watch:
+        args.incremental = True
+        updater = VeilleUpdater(topics_config, dry_run=args.dry_run, apply=args.apply,
+                                max_articles=args.max_articles, tagger=tagger, incremental=True,
+                                resident=True)
+        topic_matcher = build_topic_matcher(topics_config)
+        max_sleep = WATCH_RELOAD_CHECK
+    logger.info(f"🔁 Mode {'watch' if args.watch else 'démon'} : {len(feeds)} flux planifiés "
+                f"(intervalle {args.min_interval}-{args.max_interval} min)")
+    try:
+        while True:
+            # Sources modifiées : rechargées, la configuration invalide est ignorée
+            current = sources_mtime(sources_path)
+            if current is not None and current != mtime:
+                mtime = current
+                try:
+                    config = load_sources(sources_path)
+                    new_topics, new_feeds = select_topics(config, args.topic), sources_feeds(config)
+                except (ValueError, KeyError, AttributeError, OSError) as e:
+                    logger.warning(f"⚠ Sources invalides, configuration précédente conservée: {e}")
+                else:
+                    topics_config, feeds = new_topics, new_feeds
+                    tagger = build_tagger(config, tagger.export_cache())
+                    scheduler.sync(feeds)
+                    if updater is not None:
+                        updater.set_topics(topics_config)
+                        updater.tagger = tagger
+                        topic_matcher = build_topic_matcher(topics_config)
+                    logger.info(f"♻ Sources rechargées : {len(feeds)} flux, {len(topics_config)} topics")
+            
+            due = scheduler.due(datetime.now().timestamp() + DAEMON_BATCH_WINDOW)
+            if due:
+                started = datetime.now().timestamp()
+                REGISTRY.reset()
+                cutoff = None
+                if args.max_age:
+                    cutoff = (datetime.now() - timedelta(days=args.max_age)).timestamp()
+                _, _, total_new, _ = run_cycle(due, topics_config, tagger, feed_state, args,
+                                               cutoff, parse_pool, updater, topic_matcher, guard,
+                                               capture)
+                for feed in due:
+                    scheduler.record(feed["url"], feed_state.get(feed["url"], {}).get("poll"), started)
+                # --force-fetch ne vaut que pour le premier cycle
+                args.force_fetch = False
+                
+                # En --watch, le cache de tags n'est écrit qu'à l'arrêt
+                if not args.dry_run:
+                    if updater is None:
+                        save_tag_cache(tagger)
+                    save_feed_state(feed_state)
+                    scheduler.save()
+                    if guard is not None:
+                        guard.breaker.save()
+                write_run_metrics(args.metrics_textfile, args.dry_run)
+                logger.info(f"🔁 Cycle terminé : {len(due)} flux relevés, {total_new} nouveaux articles")
+            
+            next_due = scheduler.next_due()
+            wait = max_sleep if next_due is None else next_due - datetime.now().timestamp()
+            if wait > 0:
+                logger.debug(f"💤 Prochain relevé dans {wait:.0f} s")
+                sleep(min(wait, max_sleep))
+    finally:
+        if updater is not None:
+            updater.close()
+            if not args.dry_run:
+                save_tag_cache(tagger)
+
+# ─────────────────────────────────────────────
+# Exécution depuis la CLI
+# ─────────────────────────────────────────────
+
+def run(args):
+    """Exécute la commande décrite par les arguments de la CLI (voir cli.py).
+
+    Retourne le code de sortie : 0 si de nouveaux articles ont été ajoutés,
+    1 sinon (ou en cas d'erreur de configuration), 2 pour une version ou une
+    capture inconnue.
+    """
+    if args.export_shards:
+        with open(args.export_shards, 'r', encoding='utf-8') as f:
+            export_shards(json.load(f))
+        return 0
+    
+    try:
+        if args.list_versions:
+            print_versions()
+            return 0
+        if args.diff_versions:
+            print_version_diff(*args.diff_versions)
+            return 0
+        if args.restore_version:
+            restore_version(args.restore_version)
+            return 0
+    except KeyError as e:
+        logger.error(f"Version inconnue ou ambiguë: {e}")
+        return 2
+    
+    if args.list_captures:
+        print_captures()
+        return 0
+    
+    if args.apply_delta:
+        added = apply_delta_file(Path(args.apply_delta))
+        logger.info(f"📥 {added} articles appliqués depuis {args.apply_delta}")
+        return 0 if added > 0 else 1
+    
+    logger.info("🚀 Démarrage de la veille automatique...")
+    REGISTRY.reset()
+    if args.profile:
+        PROFILER.start()
+    
+    # Charger la configuration
+    try:
+        config = load_sources(args.sources)
+    except Exception as e:
+        logger.error(f"Erreur chargement config: {e}")
+        return 1
+    
+    tagger = build_tagger(config, load_tag_cache())
+    
+    # Filtrer les topics si demandé
+    topics_config = select_topics(config, args.topic)
+    if args.topic:
+        logger.info(f"📋 Topics sélectionnés: {', '.join(args.topic)}")
+    
+    # Rassembler tous les feeds
+    all_feeds = sources_feeds(config)
+    
+    # Rejeu d'une exécution capturée : aucun téléchargement, état des flux inchangé
+    store = manifest = None
+    if args.replay:
+        store = open_capture_store()
+        try:
+            manifest = store.manifest(args.replay)
+        except KeyError as e:
+            logger.error(f"Capture inconnue ou ambiguë: {e}")
+            return 2
+        logger.info(f"📼 Rejeu de la capture {manifest['id']} ({len(manifest['feeds'])} flux)")
+    else:
+        logger.info(f"📡 {len(all_feeds)} flux RSS à scanner...")
+    
+    # Filtrer par âge (au parsing ; les articles sans date sont conservés),
+    # par rapport à la date de la capture en cas de rejeu
+    cutoff = None
+    if args.max_age:
+        reference = datetime.fromisoformat(manifest["started_at"]) if manifest else datetime.now()
+        cutoff = (reference - timedelta(days=args.max_age)).timestamp()
+    
+    if args.engine == 'async':
+        try:
+            from . import async_fetch  # noqa: F401
+        except ImportError as e:
+            logger.error(f"Moteur async indisponible ({e}) : pip install aiohttp")
+            return 1
+    
+    parse_pool = None
+    if args.parse_processes:
+        from concurrent.futures import ProcessPoolExecutor
+        parse_pool = ProcessPoolExecutor(max_workers=args.parse_processes)
+        logger.info(f"⚙ Parsing dans {args.parse_processes} processus")
+    
+    # Délais, reprises et disjoncteur des téléchargements
+    guard = FetchGuard(CircuitBreaker(BREAKER_FILE), run_seconds=args.deadline or None)
+    
+    # Corps bruts des flux (rejeu hors ligne), ou corps rejoués
+    capture = batches = None
+    if manifest is not None:
+        batches = replay_feeds(store, manifest["id"], parse_pool, cutoff)
+    elif not (args.no_capture or args.dry_run):
+        capture = open_capture_store(CAPTURE_MAX_RUNS)
+    
+    if (args.daemon or args.watch) and manifest is None:
+        try:
+            run_daemon(config, tagger, args, parse_pool, guard, capture)
+        except KeyboardInterrupt:
+            logger.info("⏹ Arrêt du mode démon")
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown()
+            # Un seul profil pour toute la durée du démon, écrit à l'arrêt
+            if args.profile:
+                write_profile(args.profile)
+        return 0
+    
+    # Fetch en parallèle, catégorisation et dédup au fil de l'eau
+    feed_state = load_feed_state()
+    try:
+        categorized, summary, total_new, version_path = run_cycle(
+            all_feeds, topics_config, tagger, feed_state, args, cutoff, parse_pool, guard=guard,
+            capture=capture, batches=batches
+        )
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+    
+    # Un --dry-run n'écrit rien : cache de tags, cache HTTP, disjoncteurs ;
+    # ces deux derniers ne sont mis à jour que si les articles ont été traités
+    logger.debug(f"🏷 Cache de tags: {tagger.hits} hits, {tagger.misses} calculs")
+    if not args.dry_run:
+        save_tag_cache(tagger)
+        if manifest is None:
+            save_feed_state(feed_state)
+            guard.breaker.save()
+    
+    # Export CSV si demande
+    if args.export_csv:
+        with PROFILER.phase("export"):
+            export_to_csv(categorized)
+    
+    # Profils par phase (pstats, piles repliées pour flamegraph)
+    profile_top = write_profile(args.profile) if args.profile else None
+    
+    # Rapport
+    print_report(categorized, summary, total_new,
+                 dry_run=args.dry_run, apply=args.apply,
+                 version_path=version_path, profile_top=profile_top)
+    
+    # Métriques de l'exécution (résumé JSON, textfile Prometheus) ; un rejeu
+    # ne remplace pas celles du dernier relevé
+    if manifest is None:
+        write_run_metrics(args.metrics_textfile, args.dry_run)
+        if args.metrics_textfile:
+            logger.info(f"📈 Métriques Prometheus: {args.metrics_textfile}")
+    
+    return 0 if total_new > 0 else 1
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profilage par phase de la veille (--profile)
+============================================
+Un cProfile par phase (fetch, parse, categorize, update, export) et par
+thread : les phases imbriquées dans un même thread (parse pendant un fetch)
+se relaient, et les processus de parsing renvoient leurs statistiques au
+processus parent. En fin d'exécution, chaque phase est écrite en :
+- <phase>.pstats (python -m pstats, snakeviz...) ;
+- <phase>.collapsed, piles repliées pour flamegraph.pl / speedscope,
+  reconstruites depuis le graphe d'appels de cProfile ;
+- all.collapsed, toutes les phases sous une racine par phase.
+
+Depuis Python 3.12, cProfile repose sur sys.monitoring, commun à tout
+l'interpréteur : un seul profileur peut être actif à la fois, les segments
+qui n'ont pas pu être profilés sont comptés et signalés.
+"""
+
+import cProfile
+import threading
+from contextlib import contextmanager
+
+# Profondeur max des piles reconstruites (appels récursifs, graphes cycliques)
+MAX_STACK_DEPTH = 64
+# Chemins ignorés en dessous de ce temps cumulé (secondes)
+MIN_PATH_SECONDS = 1e-5
+
+
+class _StatsHolder:
+    """Statistiques déjà calculées, au format attendu par pstats.Stats."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def profiled_call(fn, *args):
+    """Exécute fn sous cProfile (dans un processus du pool) ; retourne (résultat, stats)."""
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        result = fn(*args)
+    finally:
+        profile.disable()
+    profile.create_stats()
+    return result, profile.stats
+
+
+def func_label(func):
+    filename, line, name = func
+    if filename == "~":
+        return name.strip("<>") or "builtin"
+    short = filename.replace("\\", "/").rsplit("/", 1)[-1]
+    return f"{name} ({short}:{line})"
+
+
+def collapsed_stacks(stats):
+    """Piles repliées (« a;b;c microsecondes ») depuis un pstats.Stats.
+
+    cProfile ne garde que les arcs appelant -> appelé : le temps propre de
+    chaque fonction est réparti sur ses chemins au prorata du temps cumulé
+    de chaque arc, ce qui suffit pour repérer les fonctions dominantes.
+    """
+    children = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    lines = {}
+
+    def walk(func, stack, share):
+        _, _, tt, ct, _ = stats.stats[func]
+        stack = stack + [func_label(func)]
+        self_time = tt * share
+        if self_time > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0) + self_time
+        if len(stack) >= MAX_STACK_DEPTH or ct * share < MIN_PATH_SECONDS:
+            return
+        for child, edge_ct in children.get(func, []):
+            child_ct = stats.stats[child][3]
+            if child_ct <= 0 or func_label(child) in stack:
+                continue
+            walk(child, stack, share * min(1.0, edge_ct / child_ct))
+
+    for root in roots:
+        walk(root, [], 1.0)
+    return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in lines.items()
+            if round(seconds * 1e6) > 0]
+
+
+class Profiler:
+    """Profileurs par phase et par thread ; inactif tant que `enabled` est faux."""
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.profiles = {}
+        self.skipped = 0
+
+    def start(self):
+        """Active le profilage (à appeler avant le démarrage des phases)."""
+        self.local = threading.local()
+        self.profiles = {}
+        self.skipped = 0
+        self.enabled = True
+
+    def _profile_for(self, name):
+        profiles = getattr(self.local, "profiles", None)
+        if profiles is None:
+            profiles = self.local.profiles = {}
+        profile = profiles.get(name)
+        if profile is None:
+            profile = profiles[name] = cProfile.Profile()
+            with self.lock:
+                self.profiles.setdefault(name, []).append(profile)
+        return profile
+
+    @contextmanager
+    def phase(self, name):
+        """Profile le bloc dans la phase `name` pour le thread courant."""
+        if not self.enabled:
+            yield
+            return
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        if stack and stack[-1] is not None:
+            stack[-1].disable()
+        profile = self._profile_for(name)
+        try:
+            profile.enable()
+        except ValueError:
+            # Un autre thread profile déjà (Python 3.12+, sys.monitoring)
+            profile = None
+            with self.lock:
+                self.skipped += 1
+        stack.append(profile)
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            stack.pop()
+            if stack and stack[-1] is not None:
+                try:
+                    stack[-1].enable()
+                except ValueError:
+                    stack[-1] = None
+
+    @contextmanager
+    def suspended(self):
+        """Suspend le profil actif du thread courant pendant le bloc (attente d'un autre processus)."""
+        stack = getattr(self.local, "stack", None) if self.enabled else None
+        profile = stack[-1] if stack else None
+        if profile is not None:
+            profile.disable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError:
+                    stack[-1] = None
+                    with self.lock:
+                        self.skipped += 1
+
+    def run_in_pool(self, pool, name, fn, *args):
+        """Exécute fn dans un pool de processus, en rapatriant ses statistiques.
+
+        L'attente du résultat n'est pas comptée dans la phase du thread
+        appelant : seul le profil du processus de parsing est fusionné.
+        """
+        if not self.enabled:
+            return pool.submit(fn, *args).result()
+        future = pool.submit(profiled_call, fn, *args)
+        with self.suspended():
+            result, stats = future.result()
+        with self.lock:
+            self.profiles.setdefault(name, []).append(_StatsHolder(stats))
+        return result
+
+    def stats(self):
+        """pstats.Stats fusionnés par phase."""
+        # pstats n'est chargé que si un rapport est demandé (--profile)
+        import pstats
+
+        self.enabled = False
+        merged = {}
+        for name, profiles in self.profiles.items():
+            for profile in profiles:
+                if isinstance(profile, cProfile.Profile):
+                    profile.create_stats()
+                    if not profile.stats:
+                        continue
+                if name in merged:
+                    merged[name].add(profile)
+                else:
+                    merged[name] = pstats.Stats(profile)
+        return merged
+
+    def write(self, out_dir):
+        """Écrit les .pstats et .collapsed de chaque phase ; retourne les stats."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        merged = self.stats()
+        all_lines = []
+        for name, stats in merged.items():
+            stats.dump_stats(out_dir / f"{name}.pstats")
+            lines = collapsed_stacks(stats)
+            (out_dir / f"{name}.collapsed").write_text("\n".join(lines) + "\n", encoding="utf-8")
+            all_lines.extend(f"{name};{line}" for line in lines)
+        (out_dir / "all.collapsed").write_text("\n".join(all_lines) + "\n", encoding="utf-8")
+        return merged
+
+
+def top_functions(merged, limit=15):
+    """Fonctions les plus coûteuses (temps propre), toutes phases confondues.
+
+    Retourne des tuples (phase, fonction, appels, temps propre, temps cumulé).
+    """
+    rows = []
+    for name, stats in merged.items():
+        for func, (_, nc, tt, ct, _) in stats.stats.items():
+            rows.append((name, func_label(func), nc, tt, ct))
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return rows[:limit]
+
+
+# Profileur partagé par pipeline.py (threads de fetch, pool de parsing)
+PROFILER = Profiler()
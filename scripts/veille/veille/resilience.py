@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Délais, reprises et disjoncteur des téléchargements
+===================================================
+Un flux lent ou défaillant ne doit pas fixer la durée de l'exécution :
+- délais de connexion et de lecture par requête, et échéance par flux
+  (un serveur qui envoie quelques octets par seconde est coupé) ;
+- échéance globale de l'exécution : les flux non commencés sont sautés
+  et les téléchargements en cours raccourcis ;
+- taille maximale des réponses, après décompression comprise ;
+- reprises des erreurs transitoires (réseau, 5xx, 429) avec un délai
+  exponentiel à gigue complète ;
+- disjoncteur par flux, persisté : après plusieurs exécutions en échec
+  consécutives, le flux est ignoré pendant une période de refroidissement
+  qui double à chaque nouvel échec (un essai est retenté à son terme).
+"""
+
+import json
+import os
+import random
+import socket
+import threading
+import time
+import zlib
+
+# Délais par requête (secondes)
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+# Durée max du téléchargement d'un flux, reprises comprises
+FEED_DEADLINE = 60
+# Taille max d'une réponse (octets, après décompression)
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+
+# Reprises des erreurs transitoires : nombre, délai de base et plafond (secondes)
+RETRIES = 2
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 15.0
+
+# Disjoncteur : échecs consécutifs avant ouverture, refroidissement initial et max (secondes)
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 3600
+BREAKER_MAX_COOLDOWN = 7 * 86400
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class FeedTooLarge(Exception):
+    """Réponse plus grande que la taille maximale autorisée."""
+
+
+class DeadlineExceeded(Exception):
+    """Échéance du flux ou de l'exécution dépassée."""
+
+
+class Deadline:
+    """Échéance absolue (horloge monotone) ; None = pas d'échéance."""
+
+    def __init__(self, seconds=None):
+        self.expires = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        if self.expires is None:
+            return None
+        return self.expires - time.monotonic()
+
+    @property
+    def expired(self):
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def sooner(self, seconds):
+        """Échéance dans `seconds`, sans dépasser celle-ci."""
+        deadline = Deadline(seconds)
+        if self.expires is not None and (deadline.expires is None or self.expires < deadline.expires):
+            deadline.expires = self.expires
+        return deadline
+
+    def check(self, what="flux"):
+        if self.expired:
+            raise DeadlineExceeded(f"échéance dépassée ({what})")
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX, rng=random):
+    """Délai avant la reprise n° `attempt` (1, 2...) : gigue complète sur un exponentiel borné."""
+    return rng.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def is_transient(error):
+    """Erreur qui vaut une reprise : réseau, délai, 5xx ou 429 (pas les 4xx ni les tailles)."""
+    # Déjà chargés par le téléchargement qui a échoué
+    import http.client
+    import urllib.error
+
+    if isinstance(error, (FeedTooLarge, DeadlineExceeded)):
+        return False
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code >= 500 or error.code == 429
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        # aiohttp.ClientResponseError
+        return status >= 500 or status == 429
+    return isinstance(error, (urllib.error.URLError, socket.timeout, TimeoutError,
+                              ConnectionError, http.client.HTTPException, OSError))
+
+
+def set_read_timeout(response, timeout):
+    """Applique un délai de lecture distinct du délai de connexion.
+
+    urllib n'a qu'un délai, utilisé pour la connexion ; celui de la socket
+    est changé une fois la réponse reçue (sans effet si elle est inaccessible).
+    """
+    sock = getattr(getattr(getattr(response, "fp", None), "raw", None), "_sock", None)
+    if sock is not None:
+        sock.settimeout(timeout)
+
+
+def read_limited(response, max_bytes=MAX_RESPONSE_BYTES, deadline=None):
+    """Lit le corps d'une réponse urllib sans dépasser la taille max ni l'échéance."""
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise FeedTooLarge(f"{length} octets annoncés (max {max_bytes})")
+    chunks = []
+    size = 0
+    while True:
+        # read1 rend ce qui est disponible : l'échéance est vérifiée même au goutte-à-goutte
+        chunk = response.read1(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise FeedTooLarge(f"plus de {max_bytes} octets reçus")
+        chunks.append(chunk)
+        if deadline is not None:
+            deadline.check()
+    return b"".join(chunks)
+
+
+def decompress_limited(body, encoding, max_bytes=MAX_RESPONSE_BYTES):
+    """Décompresse un corps gzip / deflate sans dépasser la taille max (bombes de compression)."""
+    if "gzip" in encoding:
+        decoders = [zlib.decompressobj(16 + zlib.MAX_WBITS)]
+    elif "deflate" in encoding:
+        # deflate est tantôt zlib, tantôt brut selon les serveurs
+        decoders = [zlib.decompressobj(zlib.MAX_WBITS), zlib.decompressobj(-zlib.MAX_WBITS)]
+    else:
+        return body
+    for i, decoder in enumerate(decoders):
+        try:
+            data = decoder.decompress(body, max_bytes + 1)
+        except zlib.error:
+            if i == len(decoders) - 1:
+                raise
+            continue
+        if not decoder.unconsumed_tail:
+            data += decoder.flush()
+        if len(data) > max_bytes or decoder.unconsumed_tail:
+            raise FeedTooLarge(f"plus de {max_bytes} octets après décompression")
+        return data
+
+
+class CircuitBreaker:
+    """Disjoncteur par flux (URL), persisté dans un fichier JSON."""
+
+    def __init__(self, path=None, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN,
+                 max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.path = path
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.states = {}
+        if path is not None and path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.states = json.load(f)
+
+    def allow(self, url):
+        """Vrai si le flux peut être relevé (disjoncteur fermé ou refroidissement écoulé)."""
+        with self.lock:
+            state = self.states.get(url)
+        return state is None or state.get("open_until", 0) <= time.time()
+
+    def open_until(self, url):
+        with self.lock:
+            return self.states.get(url, {}).get("open_until", 0)
+
+    def success(self, url):
+        with self.lock:
+            self.states.pop(url, None)
+
+    def failure(self, url, error=""):
+        """Compte un échec ; retourne la durée d'ouverture du disjoncteur (0 s'il reste fermé)."""
+        with self.lock:
+            state = self.states.setdefault(url, {"failures": 0})
+            state["failures"] += 1
+            state["error"] = str(error)[:200]
+            excess = state["failures"] - self.threshold
+            if excess < 0:
+                return 0
+            cooldown = min(self.cooldown * 2 ** excess, self.max_cooldown)
+            state["open_until"] = time.time() + cooldown
+            return cooldown
+
+    def save(self):
+        """Écrit l'état des disjoncteurs (écriture atomique)."""
+        with self.lock:
+            data = json.dumps(self.states, indent=2, ensure_ascii=False)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class FetchGuard:
+    """Politique de téléchargement d'une exécution : délais, échéances, reprises, disjoncteur."""
+
+    def __init__(self, breaker=None, run_seconds=None, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, feed_seconds=FEED_DEADLINE,
+                 max_bytes=MAX_RESPONSE_BYTES, retries=RETRIES, rng=None):
+        self.breaker = breaker or CircuitBreaker()
+        self.run_seconds = run_seconds
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.feed_seconds = feed_seconds
+        self.max_bytes = max_bytes
+        self.retries = retries
+        self.rng = rng or random.Random()
+        self.run_deadline = Deadline(run_seconds)
+
+    def start_run(self):
+        """Arme l'échéance globale (début d'une exécution ou d'un cycle)."""
+        self.run_deadline = Deadline(self.run_seconds)
+
+    def feed_deadline(self):
+        """Échéance d'un flux, bornée par celle de l'exécution."""
+        return self.run_deadline.sooner(self.feed_seconds)
+
+    def retry_delay(self, attempt, error, deadline):
+        """Délai avant une nouvelle tentative, None s'il ne faut pas réessayer."""
+        if attempt > self.retries or not is_transient(error):
+            return None
+        delay = backoff_delay(attempt, rng=self.rng)
+        remaining = deadline.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
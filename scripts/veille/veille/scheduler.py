@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planification adaptative des relevés (mode --daemon)
+====================================================
+Chaque flux a sa propre prochaine échéance. L'intervalle s'adapte :
+- contenu nouveau : la moitié de l'écart moyen entre les entrées du flux
+  (un flux qui publie toutes les heures est relevé toutes les 30 min) ;
+- flux inchangé (304, corps identique, aucune entrée plus récente) :
+  l'intervalle est allongé (x1,5) ;
+- erreur : l'intervalle est doublé ;
+- relevé non tenté (disjoncteur ouvert, échéance de l'exécution atteinte) :
+  l'intervalle est conservé.
+Les indications du flux (<ttl>, sy:updatePeriod / sy:updateFrequency)
+sont respectées comme intervalle minimal. Le résultat est borné, puis
+décalé d'une gigue aléatoire pour ne pas relever tous les flux d'un même
+hôte au même instant.
+
+L'état (intervalle, échéance, entrée la plus récente) est persisté dans
+un fichier JSON pour survivre aux redémarrages.
+"""
+
+import json
+import os
+import random
+import time
+
+MIN_INTERVAL = 5 * 60
+MAX_INTERVAL = 24 * 3600
+DEFAULT_INTERVAL = 3600
+
+UNCHANGED_BACKOFF = 1.5
+ERROR_BACKOFF = 2.0
+# Relevés non tentés : ni succès ni échec du flux
+SKIPPED_STATUSES = ("circuit_open", "deadline")
+# Gigue relative appliquée à chaque intervalle (±10 %)
+JITTER = 0.1
+
+SY_PERIODS = {
+    "hourly": 3600,
+    "daily": 86400,
+    "weekly": 7 * 86400,
+    "monthly": 30 * 86400,
+    "yearly": 365 * 86400,
+}
+
+
+def feed_hints(feed):
+    """Intervalle minimal annoncé par un flux feedparser (secondes), None sinon."""
+    hints = []
+    try:
+        if feed.get("ttl"):
+            hints.append(int(feed["ttl"]) * 60)
+    except ValueError:
+        pass
+    period = SY_PERIODS.get(str(feed.get("sy_updateperiod", "")).strip().lower())
+    if period:
+        try:
+            frequency = max(int(feed.get("sy_updatefrequency") or 1), 1)
+        except ValueError:
+            frequency = 1
+        hints.append(period / frequency)
+    return max(hints) if hints else None
+
+
+def mean_gap(stamps, limit=10):
+    """Écart moyen (secondes) entre les `limit` entrées datées les plus récentes."""
+    stamps = sorted(stamps, reverse=True)[:limit]
+    if len(stamps) < 2 or stamps[0] == stamps[-1]:
+        return None
+    return (stamps[0] - stamps[-1]) / (len(stamps) - 1)
+
+
+def next_interval(previous, status, changed, gap=None, hint=None,
+                  min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+    """Intervalle (secondes, sans gigue) avant le prochain relevé d'un flux."""
+    if status in SKIPPED_STATUSES:
+        return previous
+    if status == "error":
+        interval = previous * ERROR_BACKOFF
+    elif not changed:
+        interval = previous * UNCHANGED_BACKOFF
+    else:
+        interval = gap / 2 if gap else previous
+    if hint:
+        interval = max(interval, hint)
+    return min(max(interval, min_interval), max_interval)
+
+
+class FeedScheduler:
+    """Échéances de relevé par flux (URL), persistées dans `path`."""
+
+    def __init__(self, path, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 jitter=JITTER, rng=None):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.feeds = {}
+        self.entries = {}
+        if path is not None and path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def sync(self, feeds):
+        """Aligne la planification sur la liste des flux (nouveaux flux dus tout de suite)."""
+        self.feeds = {feed["url"]: feed for feed in feeds}
+        for url in list(self.entries):
+            if url not in self.feeds:
+                del self.entries[url]
+        now = time.time()
+        for url in self.feeds:
+            if url not in self.entries:
+                self.entries[url] = {"interval": DEFAULT_INTERVAL, "next_poll": now, "newest": None}
+
+    def due(self, now=None):
+        """Flux dont l'échéance est passée à `now`, du plus en retard au moins en retard."""
+        now = now or time.time()
+        urls = sorted((entry["next_poll"], url) for url, entry in self.entries.items()
+                      if entry["next_poll"] <= now)
+        return [self.feeds[url] for _, url in urls]
+
+    def next_due(self):
+        """Prochaine échéance (timestamp), None sans flux."""
+        return min((entry["next_poll"] for entry in self.entries.values()), default=None)
+
+    def record(self, url, poll, started):
+        """Replanifie un flux d'après le résultat de son relevé.
+
+        `poll` est l'état enregistré par le relevé ; absent ou antérieur à
+        `started` (début du cycle), le relevé est compté comme une erreur.
+        Un relevé non tenté (SKIPPED_STATUSES) garde l'intervalle courant.
+        Retourne le nouvel intervalle (secondes, gigue comprise).
+        """
+        entry = self.entries[url]
+        if not poll or poll.get("at", 0) < started:
+            status, changed, gap, hint = "error", False, None, None
+        else:
+            status = poll.get("status", "ok")
+            newest = poll.get("newest")
+            if newest is None:
+                # Flux sans dates : seul le changement de contenu compte
+                changed = status == "ok"
+            else:
+                changed = status == "ok" and newest > (entry.get("newest") or 0)
+                if changed:
+                    entry["newest"] = newest
+            gap, hint = poll.get("gap"), poll.get("hint")
+        interval = next_interval(entry["interval"], status, changed, gap, hint,
+                                 self.min_interval, self.max_interval)
+        entry["interval"] = interval
+        entry["status"] = status
+        interval *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        entry["next_poll"] = time.time() + interval
+        return interval
+
+    def save(self):
+        """Écrit la planification (écriture atomique)."""
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
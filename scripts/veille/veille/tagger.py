@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de tags automatiques
+===========================
+Compile une seule fois les règles de tags (`tag_rules` de la config des
+sources) et mémorise le résultat par article, indexé par un hash du
+contenu. Chaque règle a sa propre empreinte : après une modification des
+règles, seules les règles ajoutées ou modifiées sont réévaluées, les
+autres résultats sont servis depuis le cache.
+"""
+
+import hashlib
+import json
+
+from .matcher import KeywordMatcher
+
+# Nombre max d'articles conservés dans le cache (les plus anciens sont évincés)
+TAG_CACHE_MAX_ENTRIES = 50000
+
+
+def rule_key(tag, keywords):
+    """Empreinte courte d'une règle (tag + mots-clés)."""
+    payload = json.dumps([tag, sorted(kw.lower() for kw in keywords)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode()).hexdigest()[:10]
+
+
+def content_key(text):
+    """Empreinte courte du texte d'un article."""
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def empty_tag_cache():
+    """Structure vide du cache de tags."""
+    return {"versions": {}, "entries": {}}
+
+
+class TagEngine:
+    """Applique des règles de tags compilées, avec cache par contenu.
+
+    Le cache est un dict sérialisable en JSON :
+      - versions : version du jeu de règles -> empreintes des règles
+      - entries  : hash du contenu -> {"v": version, "m": règles vérifiées}
+    """
+
+    def __init__(self, tag_rules, cache=None, max_entries=TAG_CACHE_MAX_ENTRIES):
+        self.rules = dict(tag_rules)
+        self.rule_keys = {tag: rule_key(tag, kws) for tag, kws in self.rules.items()}
+        self.version = hashlib.sha1(
+            " ".join(sorted(self.rule_keys.values())).encode()
+        ).hexdigest()[:10]
+        self.matcher = KeywordMatcher(self.rules, whole_word_max_len=0)
+        self.cache = cache if cache is not None else empty_tag_cache()
+        self.cache["versions"][self.version] = sorted(self.rule_keys.values())
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._partial_matchers = {}
+
+    def _matcher_for(self, tags):
+        """Matcher restreint aux règles à réévaluer (mis en cache)."""
+        key = tuple(tags)
+        if key not in self._partial_matchers:
+            self._partial_matchers[key] = KeywordMatcher(
+                {tag: self.rules[tag] for tag in tags}, whole_word_max_len=0
+            )
+        return self._partial_matchers[key]
+
+    def match(self, text):
+        """Retourne les tags dont une règle correspond à `text` (en minuscules).
+
+        Les tags sont retournés dans l'ordre des règles.
+        """
+        entries = self.cache["entries"]
+        key = content_key(text)
+        entry = entries.pop(key, None)
+        current = set(self.rule_keys.values())
+
+        if entry and entry["v"] == self.version:
+            self.hits += 1
+            matched = set(entry["m"])
+        elif entry and entry["v"] in self.cache["versions"]:
+            # Règles modifiées : ne réévaluer que celles inconnues de l'entrée
+            self.misses += 1
+            known = set(self.cache["versions"][entry["v"]])
+            matched = set(entry["m"]) & current
+            stale = [tag for tag, k in self.rule_keys.items() if k not in known]
+            if stale:
+                matched |= {self.rule_keys[t] for t in self._matcher_for(stale).match(text)}
+        else:
+            self.misses += 1
+            matched = {self.rule_keys[t] for t in self.matcher.match(text)}
+
+        # Réinsérer en fin de dict pour une éviction des moins récemment utilisés
+        entries[key] = {"v": self.version, "m": sorted(matched)}
+        if len(entries) > self.max_entries:
+            del entries[next(iter(entries))]
+
+        return [tag for tag, k in self.rule_keys.items() if k in matched]
+
+    def export_cache(self):
+        """Retourne le cache, en oubliant les versions qui ne sont plus référencées."""
+        used = {entry["v"] for entry in self.cache["entries"].values()}
+        used.add(self.version)
+        self.cache["versions"] = {
+            v: keys for v, keys in self.cache["versions"].items() if v in used
+        }
+        return self.cache
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+URL canoniques et préfiltre de Bloom (déduplication)
+====================================================
+Un même article circule sous plusieurs formes de lien : paramètres de
+suivi (?utm_source=rss), http/https, www., slash final, fragment, ordre
+des paramètres. `canonical_url` ramène ces variantes à une seule forme,
+dont le hash sert d'identifiant dans l'historique.
+
+Le filtre de Bloom répond « certainement nouveau » sans toucher à
+l'historique SQLite ; seul un « peut-être déjà vu » (ou un faux positif,
+1 % par défaut) est vérifié dans le store exact. Sa taille est fixée à la
+création (environ 1,2 Mo par million d'URL à 1 %) : la mémoire de la
+déduplication ne dépend pas de la taille de l'historique.
+"""
+
+import hashlib
+import math
+import os
+import struct
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Paramètres de suivi retirés des URL (préfixes et noms exacts)
+TRACKING_PREFIXES = ("utm_", "mtm_", "pk_", "_hs")
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "yclid", "xtor", "cmpid", "ref_src", "ncid", "sr_share",
+}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# En-tête du fichier : magic, version, nombre de bits, fonctions de hachage, éléments, génération
+HEADER = struct.Struct("<4sBQBQ16s")
+MAGIC = b"VBLF"
+VERSION = 1
+
+
+def canonical_url(url):
+    """Forme canonique d'une URL d'article ("" si l'URL est vide).
+
+    Schéma https, hôte en minuscules sans www. ni port par défaut, sans
+    fragment ni paramètres de suivi, paramètres restants triés, sans slash
+    final (hors racine). Les URL non http(s) sont seulement débarrassées
+    des blancs.
+    """
+    url = url.strip()
+    if not url:
+        return ""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return url
+    host = (parts.hostname or "").rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    query = ""
+    if parts.query:
+        params = [
+            (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+        ]
+        query = urlencode(sorted(params))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+class BloomFilter:
+    """Filtre de Bloom de taille fixe, persisté dans un fichier binaire."""
+
+    def __init__(self, num_bits, num_hashes, count=0, bits=None, generation=b""):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.generation = generation
+        # Ajouts non écrits depuis le chargement ou le dernier save()
+        self.dirty = False
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=0.01):
+        """Filtre dimensionné pour `capacity` éléments au taux de faux positifs visé."""
+        capacity = max(capacity, 1)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    @property
+    def capacity(self):
+        """Nombre d'éléments au-delà duquel le taux de faux positifs dépasse la cible."""
+        return int(self.num_bits * math.log(2) ** 2 / -math.log(0.01))
+
+    def _positions(self, item):
+        # Double hachage (Kirsch-Mitzenmacher) : deux hash de 64 bits suffisent
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        bits = self.bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+        self.dirty = True
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def save(self, path):
+        """Écrit le filtre (écriture atomique)."""
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.num_bits, self.num_hashes,
+                                self.count, self.generation.ljust(16, b"\0")))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        """Relit un filtre ; None si le fichier est absent ou illisible."""
+        try:
+            with open(path, 'rb') as f:
+                magic, version, num_bits, num_hashes, count, generation = HEADER.unpack(f.read(HEADER.size))
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or version != VERSION or len(bits) != (num_bits + 7) // 8:
+            return None
+        return cls(num_bits, num_hashes, count, bits, generation.rstrip(b"\0"))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stockage des versions de veille.json
+====================================
+Stockage adressé par contenu : chaque article (et l'en-tête de chaque
+topic) est enregistré une seule fois sous forme de blob compressé, nommé
+par son hash. Une version n'est qu'un manifeste compressé listant ces
+hashes ; deux versions se comparent donc sans recharger les documents.
+
+Arborescence :
+    objects/ab/cdef...   blobs zlib (JSON d'un article ou d'un en-tête)
+    manifests/<id>.json.gz
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from datetime import datetime
+
+
+def resolve_ref(ids, ref):
+    """Résout `ref` parmi des ids triés : id, préfixe d'id, ou `latest` / `latest~N`.
+
+    Lève KeyError si la référence est inconnue, ambiguë ou mal formée.
+    """
+    if ref == "latest" or ref.startswith("latest~"):
+        back = ref[len("latest~"):] if "~" in ref else "0"
+        if not back.isdigit() or int(back) >= len(ids):
+            raise KeyError(ref)
+        return ids[-1 - int(back)]
+    matches = [i for i in ids if i.startswith(ref)]
+    if len(matches) != 1:
+        raise KeyError(ref)
+    return matches[0]
+
+
+class VersionStore:
+    """Versions de veille.json, dédupliquées par article."""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.manifests_dir = root / "manifests"
+
+    # ── Blobs ────────────────────────────────────
+
+    def _object_path(self, digest):
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def put_blob(self, obj):
+        """Enregistre un objet JSON s'il est absent ; retourne son hash."""
+        raw = json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(raw, 9))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get_blob(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return json.loads(zlib.decompress(f.read()).decode('utf-8'))
+
+    # ── Manifestes ───────────────────────────────
+
+    def save(self, data):
+        """Enregistre une version du document ; retourne (id, chemin du manifeste)."""
+        topics = []
+        for veille in data.get("veilles", []):
+            header = {k: v for k, v in veille.items() if k != "articles"}
+            topics.append({
+                "header": self.put_blob(header),
+                "articles": [self.put_blob(a) for a in veille.get("articles", [])],
+            })
+        extra = {k: v for k, v in data.items() if k != "veilles"}
+
+        now = datetime.now()
+        body = json.dumps({"topics": topics, "extra": extra}, sort_keys=True).encode()
+        # Microsecondes dans l'id : l'ordre des noms est celui des enregistrements
+        version_id = f"{now:%Y%m%d-%H%M%S.%f}-{hashlib.sha256(body).hexdigest()[:8]}"
+        manifest = {"id": version_id, "created_at": now.isoformat(),
+                    "topics": topics, "extra": extra}
+
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        path = self.manifests_dir / f"{version_id}.json.gz"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        return version_id, path
+
+    def ids(self):
+        """Ids des versions, du plus ancien au plus récent (noms des manifestes seulement)."""
+        if not self.manifests_dir.exists():
+            return []
+        return sorted(p.name[:-len(".json.gz")] for p in self.manifests_dir.glob("*.json.gz"))
+
+    def list(self):
+        """Retourne les manifestes (sans les blobs), du plus ancien au plus récent."""
+        return [self.manifest(version_id) for version_id in self.ids()]
+
+    def resolve(self, ref):
+        """Résout un id, un préfixe d'id, ou `latest` / `latest~N`."""
+        return resolve_ref(self.ids(), ref)
+
+    def manifest(self, ref):
+        version_id = ref if (self.manifests_dir / f"{ref}.json.gz").exists() else self.resolve(ref)
+        with gzip.open(self.manifests_dir / f"{version_id}.json.gz", 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load(self, ref):
+        """Reconstruit le document complet d'une version."""
+        manifest = self.manifest(ref)
+        veilles = []
+        for topic in manifest["topics"]:
+            veille = self.get_blob(topic["header"])
+            veille["articles"] = [self.get_blob(h) for h in topic["articles"]]
+            veilles.append(veille)
+        return dict(manifest.get("extra", {}), veilles=veilles)
+
+    def diff(self, ref_a, ref_b):
+        """Compare deux versions topic par topic.
+
+        Retourne une liste de {"index", "added", "removed"} où seuls les
+        articles qui diffèrent sont chargés.
+        """
+        topics_a = self.manifest(ref_a)["topics"]
+        topics_b = self.manifest(ref_b)["topics"]
+        changes = []
+        for index in range(max(len(topics_a), len(topics_b))):
+            hashes_a = topics_a[index]["articles"] if index < len(topics_a) else []
+            hashes_b = topics_b[index]["articles"] if index < len(topics_b) else []
+            set_a, set_b = set(hashes_a), set(hashes_b)
+            added = [self.get_blob(h) for h in hashes_b if h not in set_a]
+            removed = [self.get_blob(h) for h in hashes_a if h not in set_b]
+            if added or removed:
+                changes.append({"index": index, "added": added, "removed": removed})
+        return changes
@@ -1,35 +1,134 @@
 "use client";
 
-import { useState, useMemo } from "react";
+import { useState, useMemo, useEffect } from "react";
 import { motion } from "framer-motion";
 import TerminalWindow from "@/components/terminal/TerminalWindow";
 import ArticleCard from "@/components/veille/ArticleCard";
 import PostIt from "@/components/veille/PostIt";
-import veilleData from "@/data/veille.json";
+import type {
+    ShardArticle,
+    VeilleManifest,
+    VeillePageShard,
+    VeilleTopicIndex,
+    VeilleTopicShard,
+} from "@/types/veille-shards";
 
-type Veille = (typeof veilleData.veilles)[number];
+// Shards generated by scripts/veille/rss.py --export-shards
+const SHARD_BASE = "/veille";
+
+async function fetchShard<T>(path: string): Promise<T> {
+    const res = await fetch(`${SHARD_BASE}/${path}`);
+    if (!res.ok) throw new Error(`${path}: ${res.status}`);
+    return res.json() as Promise<T>;
+}
 
 export default function VeillePage() {
+    const [manifest, setManifest] = useState<VeilleManifest | null>(null);
     const [activeTopicIndex, setActiveTopicIndex] = useState(0);
     const [activeTag, setActiveTag] = useState<string | null>(null);
+    const [activeTopic, setActiveTopic] = useState<VeilleTopicShard | null>(null);
+    const [topicIndex, setTopicIndex] = useState<VeilleTopicIndex | null>(null);
+    const [pages, setPages] = useState<Record<number, ShardArticle[]>>({});
+    const [visibleCount, setVisibleCount] = useState(0);
+    const [loadError, setLoadError] = useState(false);
+
+    const pageSize = manifest?.page_size ?? 0;
+
+    useEffect(() => {
+        fetchShard<VeilleManifest>("manifest.json")
+            .then((data) => {
+                setManifest(data);
+                setVisibleCount(data.page_size);
+            })
+            .catch(() => setLoadError(true));
+    }, []);
+
+    // Only the active topic (header + precomputed index) is downloaded
+    useEffect(() => {
+        let cancelled = false;
+        Promise.all([
+            fetchShard<VeilleTopicShard>(`topics/${activeTopicIndex}/topic.json`),
+            fetchShard<VeilleTopicIndex>(`topics/${activeTopicIndex}/index.json`),
+        ])
+            .then(([topic, index]) => {
+                if (cancelled) return;
+                setActiveTopic(topic);
+                setTopicIndex(index);
+            })
+            .catch(() => {
+                if (!cancelled) setLoadError(true);
+            });
+        return () => {
+            cancelled = true;
+        };
+    }, [activeTopicIndex]);
+
+    const selectTopic = (index: number) => {
+        setActiveTopicIndex(index);
+        setActiveTag(null);
+        setActiveTopic(null);
+        setTopicIndex(null);
+        setPages({});
+        setVisibleCount(pageSize);
+        setLoadError(false);
+    };
+
+    const selectTag = (tag: string | null) => {
+        setActiveTag(tag);
+        setVisibleCount(pageSize);
+    };
+
+    // Article positions to show: tag postings, or most recent first
+    const order = useMemo(() => {
+        if (!topicIndex) return [];
+        if (activeTag) return topicIndex.postings[activeTag] ?? [];
+        return topicIndex.by_date;
+    }, [topicIndex, activeTag]);
+
+    const visiblePositions = useMemo(() => order.slice(0, visibleCount), [order, visibleCount]);
 
-    const activeTopic: Veille = veilleData.veilles[activeTopicIndex];
+    // Pages holding the visible positions (1-based page files)
+    const neededPages = useMemo(() => {
+        if (!pageSize) return [];
+        return Array.from(new Set(visiblePositions.map((p) => Math.floor(p / pageSize) + 1)));
+    }, [visiblePositions, pageSize]);
 
-    // Get all unique tags for current topic
-    const allTags = useMemo(() => {
-        const tags = new Set<string>();
-        activeTopic.articles.forEach((a) => a.tags.forEach((t) => tags.add(t)));
-        return Array.from(tags).sort();
-    }, [activeTopic]);
+    useEffect(() => {
+        const missing = neededPages.filter((page) => !(page in pages));
+        if (missing.length === 0) return;
+        let cancelled = false;
+        Promise.all(
+            missing.map((page) =>
+                fetchShard<VeillePageShard>(`topics/${activeTopicIndex}/page-${page}.json`)
+            )
+        )
+            .then((shards) => {
+                if (cancelled) return;
+                setPages((prev) => {
+                    const next = { ...prev };
+                    for (const shard of shards) next[shard.page] = shard.articles;
+                    return next;
+                });
+            })
+            .catch(() => {
+                if (!cancelled) setLoadError(true);
+            });
+        return () => {
+            cancelled = true;
+        };
+    }, [neededPages, pages, activeTopicIndex]);
 
-    // Filter articles
-    const filteredArticles = useMemo(() => {
-        return activeTopic.articles.filter((a) => {
-            if (!a.title && !a.description) return false;
-            if (!activeTag) return true;
-            return a.tags.includes(activeTag);
-        });
-    }, [activeTopic, activeTag]);
+    const visibleArticles = useMemo(() => {
+        const result: { position: number; article: ShardArticle }[] = [];
+        for (const position of visiblePositions) {
+            const page = pages[Math.floor(position / pageSize) + 1];
+            if (page) result.push({ position, article: page[position % pageSize] });
+        }
+        return result;
+    }, [visiblePositions, pages, pageSize]);
+
+    const loadingPages = neededPages.some((page) => !(page in pages));
+    const hasMore = visibleCount < order.length;
 
     return (
         <div className="max-w-[1200px] mx-auto px-6 py-12">
@@ -49,13 +148,10 @@ export default function VeillePage() {
 
             {/* Topic nav */}
             <div className="sticky top-0 z-60 py-4 px-2 flex gap-2 justify-center flex-wrap">
-                {veilleData.veilles.map((v, i) => (
+                {manifest?.topics.map((v, i) => (
                     <button
                         key={i}
-                        onClick={() => {
-                            setActiveTopicIndex(i);
-                            setActiveTag(null);
-                        }}
+                        onClick={() => selectTopic(i)}
                         className={`px-4 py-2 rounded-md text-sm font-mono transition-all ${
                             i === activeTopicIndex
                                 ? "bg-[var(--color-accent)] text-[var(--color-bg-primary)] font-semibold"
@@ -68,98 +164,130 @@ export default function VeillePage() {
                 ))}
             </div>
 
-            {/* Definition terminal */}
-            <motion.div
-                key={activeTopicIndex}
-                initial={{ opacity: 0, y: 10 }}
-                animate={{ opacity: 1, y: 0 }}
-                transition={{ duration: 0.3 }}
-                className="mb-10"
-            >
-                <TerminalWindow title={`${activeTopic["sub-title"].toLowerCase()}_definition.md`}>
-                    <h2 className="text-lg font-bold text-[var(--color-accent)] mb-3">
-                        {activeTopic.title}
-                    </h2>
-                    <p className="text-sm text-[var(--color-text-secondary)] mb-4 leading-relaxed">
-                        {activeTopic.definition}
-                    </p>
-                    <h3 className="text-sm font-semibold text-[var(--color-text-primary)] mb-2">
-                        {"> Fonctionnement"}
-                    </h3>
-                    <p className="text-xs text-[var(--color-text-secondary)] leading-relaxed">
-                        {activeTopic.fonctionnement}
-                    </p>
-                </TerminalWindow>
-            </motion.div>
+            {activeTopic ? (
+                <>
+                    {/* Definition terminal */}
+                    <motion.div
+                        key={activeTopicIndex}
+                        initial={{ opacity: 0, y: 10 }}
+                        animate={{ opacity: 1, y: 0 }}
+                        transition={{ duration: 0.3 }}
+                        className="mb-10"
+                    >
+                        <TerminalWindow
+                            title={`${activeTopic["sub-title"].toLowerCase()}_definition.md`}
+                        >
+                            <h2 className="text-lg font-bold text-[var(--color-accent)] mb-3">
+                                {activeTopic.title}
+                            </h2>
+                            <p className="text-sm text-[var(--color-text-secondary)] mb-4 leading-relaxed">
+                                {activeTopic.definition}
+                            </p>
+                            <h3 className="text-sm font-semibold text-[var(--color-text-primary)] mb-2">
+                                {"> Fonctionnement"}
+                            </h3>
+                            <p className="text-xs text-[var(--color-text-secondary)] leading-relaxed">
+                                {activeTopic.fonctionnement}
+                            </p>
+                        </TerminalWindow>
+                    </motion.div>
 
-            {/* Prerequisites (post-its) */}
-            {activeTopic.prerequis &&
-                activeTopic.prerequis.length > 0 &&
-                activeTopic.prerequis[0].title !== "Prerequis 1" && (
-                    <div className="mb-12">
-                        <h2 className="text-xl font-bold text-[var(--color-text-primary)] mb-6 font-mono">
-                            {"// Prérequis & Méthodes"}
-                        </h2>
-                        <div className="grid grid-cols-2 sm:grid-cols-3 md:grid-cols-4 lg:grid-cols-5 gap-4">
-                            {activeTopic.prerequis.map((p, i) => (
-                                <PostIt
-                                    key={i}
-                                    title={p.title}
-                                    content={p.fonctionnement.substring(0, 120) + "..."}
-                                    index={i}
-                                />
+                    {/* Prerequisites (post-its) */}
+                    {activeTopic.prerequis &&
+                        activeTopic.prerequis.length > 0 &&
+                        activeTopic.prerequis[0].title !== "Prerequis 1" && (
+                            <div className="mb-12">
+                                <h2 className="text-xl font-bold text-[var(--color-text-primary)] mb-6 font-mono">
+                                    {"// Prérequis & Méthodes"}
+                                </h2>
+                                <div className="grid grid-cols-2 sm:grid-cols-3 md:grid-cols-4 lg:grid-cols-5 gap-4">
+                                    {activeTopic.prerequis.map((p, i) => (
+                                        <PostIt
+                                            key={i}
+                                            title={p.title}
+                                            content={p.fonctionnement.substring(0, 120) + "..."}
+                                            index={i}
+                                        />
+                                    ))}
+                                </div>
+                            </div>
+                        )}
+
+                    {/* Tag filter */}
+                    <div className="mb-6 flex flex-wrap gap-2">
+                        <button
+                            onClick={() => selectTag(null)}
+                            className={`text-xs font-mono px-3 py-1 rounded-full border transition-all ${
+                                !activeTag
+                                    ? "bg-[var(--color-accent)] text-[var(--color-bg-primary)] border-[var(--color-accent)]"
+                                    : "border-[var(--color-border)] text-[var(--color-text-secondary)] hover:border-[var(--color-accent)]"
+                            }`}
+                            data-hoverable
+                        >
+                            Tous ({activeTopic.articles})
+                        </button>
+                        {topicIndex &&
+                            topicIndex.tags.map((tag) => (
+                                <button
+                                    key={tag}
+                                    onClick={() => selectTag(tag === activeTag ? null : tag)}
+                                    className={`text-xs font-mono px-3 py-1 rounded-full border transition-all ${
+                                        tag === activeTag
+                                            ? "bg-[var(--color-accent)] text-[var(--color-bg-primary)] border-[var(--color-accent)]"
+                                            : "border-[var(--color-border)] text-[var(--color-text-secondary)] hover:border-[var(--color-accent)]"
+                                    }`}
+                                    data-hoverable
+                                >
+                                    {tag} ({topicIndex.facets.tags[tag]})
+                                </button>
                             ))}
-                        </div>
                     </div>
-                )}
-
-            {/* Tag filter */}
-            <div className="mb-6 flex flex-wrap gap-2">
-                <button
-                    onClick={() => setActiveTag(null)}
-                    className={`text-xs font-mono px-3 py-1 rounded-full border transition-all ${
-                        !activeTag
-                            ? "bg-[var(--color-accent)] text-[var(--color-bg-primary)] border-[var(--color-accent)]"
-                            : "border-[var(--color-border)] text-[var(--color-text-secondary)] hover:border-[var(--color-accent)]"
-                    }`}
-                    data-hoverable
-                >
-                    Tous ({filteredArticles.length})
-                </button>
-                {allTags.map((tag) => (
-                    <button
-                        key={tag}
-                        onClick={() => setActiveTag(tag === activeTag ? null : tag)}
-                        className={`text-xs font-mono px-3 py-1 rounded-full border transition-all ${
-                            tag === activeTag
-                                ? "bg-[var(--color-accent)] text-[var(--color-bg-primary)] border-[var(--color-accent)]"
-                                : "border-[var(--color-border)] text-[var(--color-text-secondary)] hover:border-[var(--color-accent)]"
-                        }`}
-                        data-hoverable
-                    >
-                        {tag}
-                    </button>
-                ))}
-            </div>
 
-            {/* Articles grid */}
-            <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-4">
-                {filteredArticles.map((article, i) => (
-                    <ArticleCard
-                        key={`${activeTopicIndex}-${i}`}
-                        title={article.title}
-                        description={article.description}
-                        date={article.date}
-                        source={article.source}
-                        tags={article.tags}
-                        link={article["link"]}
-                    />
-                ))}
-            </div>
+                    {/* Articles grid */}
+                    <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-4">
+                        {visibleArticles.map(({ position, article }) => (
+                            <ArticleCard
+                                key={`${activeTopicIndex}-${position}`}
+                                title={article.title}
+                                description={article.description ?? ""}
+                                date={article.date ?? ""}
+                                source={article.source}
+                                tags={article.tags}
+                                link={article["link"]}
+                            />
+                        ))}
+                    </div>
+
+                    {hasMore && (
+                        <div className="mt-8 text-center">
+                            <button
+                                onClick={() => setVisibleCount((count) => count + pageSize)}
+                                disabled={loadingPages}
+                                className="text-xs font-mono px-4 py-2 rounded-md border border-[var(--color-border)] text-[var(--color-text-secondary)] hover:border-[var(--color-accent)] hover:text-[var(--color-accent)] transition-all disabled:opacity-50"
+                                data-hoverable
+                            >
+                                {loadError
+                                    ? "// Erreur de chargement"
+                                    : loadingPages
+                                    ? "// Chargement..."
+                                    : `Charger plus (${visibleArticles.length}/${order.length})`}
+                            </button>
+                        </div>
+                    )}
 
-            {filteredArticles.length === 0 && (
+                    {order.length === 0 && (
+                        <div className="text-center py-12 text-[var(--color-text-muted)] font-mono text-sm">
+                            {"// Aucun article trouvé pour ce filtre"}
+                        </div>
+                    )}
+                </>
+            ) : loadError ? (
+                <div className="text-center py-12 text-[var(--color-text-muted)] font-mono text-sm">
+                    {"// Impossible de charger la veille"}
+                </div>
+            ) : (
                 <div className="text-center py-12 text-[var(--color-text-muted)] font-mono text-sm">
-                    {"// Aucun article trouvé pour ce filtre"}
+                    {"// Chargement..."}
                 </div>
             )}
         </div>
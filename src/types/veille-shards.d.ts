@@ -0,0 +1,60 @@
+// Types of the per-topic shards generated by scripts/veille/rss.py (--export-shards)
+// and served statically from public/veille/
+export interface ShardArticle {
+    date?: string;
+    title: string;
+    image?: string;
+    link: string;
+    tags: string[];
+    description?: string;
+    source: string;
+}
+
+export interface ShardPrerequis {
+    title: string;
+    fonctionnement: string;
+    protocole: string;
+    environnement: string;
+    link: string;
+}
+
+export interface VeilleManifestTopic {
+    index: number;
+    title: string;
+    "sub-title": string;
+    articles: number;
+    pages: number;
+}
+
+export interface VeilleManifest {
+    generated_at: string;
+    page_size: number;
+    topics: VeilleManifestTopic[];
+}
+
+export interface VeilleTopicShard {
+    index: number;
+    title: string;
+    "sub-title": string;
+    definition: string;
+    fonctionnement: string;
+    prerequis: ShardPrerequis[];
+    articles: number;
+    pages: number;
+}
+
+// Precomputed per-topic index; positions refer to the order of articles across pages
+export interface VeilleTopicIndex {
+    tags: string[];
+    postings: Record<string, number[]>;
+    facets: {
+        tags: Record<string, number>;
+        sources: Record<string, number>;
+    };
+    by_date: number[];
+}
+
+export interface VeillePageShard {
+    page: number;
+    articles: ShardArticle[];
+}
\ No newline at end of file